@@ -33,7 +33,7 @@ run_pre_install_checks() {
     # Test 3: Package manager availability
     ((total_checks++))
     # Extract just the command name from PKG_INSTALL (remove arguments)
-    pkg_command=$(echo "$PKG_INSTALL" | awk '{print $1}')
+    pkg_command="${PKG_INSTALL%% *}"
     if command -v "$pkg_command" >/dev/null 2>&1; then
         log_success "✓ Package manager available: $PKG_INSTALL"
         ((checks_passed++))
@@ -53,7 +53,7 @@ run_pre_install_checks() {
     # Test 5: Disk space check
     ((total_checks++))
     local available_space
-    available_space=$(df / | tail -1 | awk '{print $4}')
+    { read -r _; read -r _ _ _ available_space _; } < <(df -P / 2>/dev/null)
     if [ "$available_space" -gt 1048576 ]; then  # 1GB in KB
         log_success "✓ Sufficient disk space available"
         ((checks_passed++))
@@ -82,30 +82,43 @@ fi
 
 # LinuxInstaller v1.0 - Main installation script
 
-# Show LinuxInstaller ASCII art banner (distribution-specific colors)
-show_linuxinstaller_ascii() {
-    clear
-
-    # Set color based on detected distribution
-    local ascii_color="${CYAN}"  # Default cyan
-    if [ "${DISTRO_ID:-}" = "fedora" ] || [ "${DISTRO_ID:-}" = "arch" ]; then
-        ascii_color="${BLUE}"  # Blue for Fedora and Arch
-    elif [ "${DISTRO_ID:-}" = "debian" ]; then
-        ascii_color="${RED}"   # Red for Debian
-    elif [ "${DISTRO_ID:-}" = "ubuntu" ]; then
-        ascii_color="\033[38;5;208m"  # Orange for Ubuntu (ANSI 208)
-    fi
-
-    echo -e "${ascii_color}"
-    cat << "EOF"
+# ASCII art for the banner, read once at startup instead of spawning cat each time
+IFS= read -r -d '' LINUXINSTALLER_ASCII_ART << "EOF" || true
       _     _                  ___           _        _ _
      | |   (_)_ __  _   ___  _|_ _|_ __  ___| |_ __ _| | | ___ _ __
      | |   | | '_ \| | | \ \/ /| || '_ \/ __| __/ _` | | |/ _ \ '__|
      | |___| | | | | |_| |>  < | || | | \__ \ || (_| | | |  __/ |
      |_____|_|_| |_|\__,_/_/\_\___|_| |_|___/\__\__,_|_|_|\___|_|
 EOF
-    echo -e "${LIGHT_CYAN}           Cross-Distribution Linux Post-Installation Script${RESET}"
-    echo ""
+
+# Fully rendered banner, built on first use for the current distribution
+LINUXINSTALLER_BANNER=""
+LINUXINSTALLER_BANNER_DISTRO=""
+
+# Show LinuxInstaller ASCII art banner (distribution-specific colors)
+show_linuxinstaller_ascii() {
+    # Unattended and piped runs get plain output, without terminal escapes
+    if is_interactive && [ -t 1 ]; then
+        clear
+    fi
+
+    if [ -z "$LINUXINSTALLER_BANNER" ] || [ "$LINUXINSTALLER_BANNER_DISTRO" != "${DISTRO_ID:-}" ]; then
+        # Set color based on detected distribution
+        local ascii_color="${CYAN}"  # Default cyan
+        if [ "${DISTRO_ID:-}" = "fedora" ] || [ "${DISTRO_ID:-}" = "arch" ]; then
+            ascii_color="${BLUE}"  # Blue for Fedora and Arch
+        elif [ "${DISTRO_ID:-}" = "debian" ]; then
+            ascii_color="${RED}"   # Red for Debian
+        elif [ "${DISTRO_ID:-}" = "ubuntu" ]; then
+            ascii_color="\033[38;5;208m"  # Orange for Ubuntu (ANSI 208)
+        fi
+
+        printf -v LINUXINSTALLER_BANNER '%b\n%s%b\n\n' "$ascii_color" "$LINUXINSTALLER_ASCII_ART" \
+            "${LIGHT_CYAN}           Cross-Distribution Linux Post-Installation Script${RESET}"
+        LINUXINSTALLER_BANNER_DISTRO="${DISTRO_ID:-}"
+    fi
+
+    printf '%s' "$LINUXINSTALLER_BANNER"
 }
 
 # Menu selection logic (always shown)
@@ -176,7 +189,7 @@ show_menu_selection() {
                 return
             }
 
-            choice=$(echo "$choice" | sed 's/^[[:space:]]*//;s/[[:space:]]*$//')
+            trim_var choice
 
             case "$choice" in
                 1|"1"|"")
@@ -234,10 +247,10 @@ show_menu() {
 }
 
 # Color variables (cyan theme)
-CYAN='\033[0;36m'
-LIGHT_CYAN='\033[1;36m'
-BLUE='\033[0;34m'
-RESET='\033[0m'
+CYAN=$'\033[0;36m'
+LIGHT_CYAN=$'\033[1;36m'
+BLUE=$'\033[0;34m'
+RESET=$'\033[0m'
 
 # --- Configuration & Paths ---
 # Determine script location and derive important directories
@@ -280,10 +293,6 @@ if [ "${NO_ONELINER:-}" != "true" ] && ([ ! -f "$SCRIPT_PATH" ] || [ ! -d "$SCRI
     exit 1
 fi
 
-SCRIPT_DIR="$(cd "$(dirname "$SCRIPT_PATH")" && pwd)"  # Directory containing this script
-CONFIGS_DIR="$SCRIPT_DIR/configs"    # Distribution-specific configuration files
-SCRIPTS_DIR="$SCRIPT_DIR/scripts"    # Modular script components
-
 # Verify we have the required directory structure
 if [ ! -d "$SCRIPTS_DIR" ]; then
     echo "FATAL ERROR: Scripts directory not found in $SCRIPT_DIR"
@@ -315,25 +324,22 @@ else
     exit 1
 fi
 
-# Optional Wake-on-LAN integration (sourced if present).
-# The module integrates the wakeonlan helper so LinuxInstaller can auto-configure WoL.
-if [ -f "$SCRIPTS_DIR/wakeonlan_config.sh" ]; then
-  source "$SCRIPTS_DIR/wakeonlan_config.sh"
-fi
-
-# Optional power management helper (detection + configuration).
-# This module provides `detect_system_info`, `show_system_info`, and
-# `configure_power_management` to auto-detect CPU/GPU/RAM and configure
-# power-profiles-daemon / cpupower / tuned as appropriate.
-if [ -f "$SCRIPTS_DIR/power_config.sh" ]; then
-  source "$SCRIPTS_DIR/power_config.sh"
-fi
+# Optional modules (wakeonlan_config.sh, power_config.sh) are sourced lazily
+# right before the step that uses them, so early exits don't pay for them.
 
 # --- Configuration Validation ---
 # Validate configuration files now that helpers are sourced
+# A stamp file marks the last fully successful pass; modules not modified since
+# then are skipped instead of being re-parsed by `bash -n` on every run
+VALIDATION_STAMP="/var/cache/linuxinstaller/modules.validated"
 config_valid=true
+config_checked=false
 for config_file in "$SCRIPTS_DIR"/*.sh; do
     if [ -f "$config_file" ]; then
+        if [ -f "$VALIDATION_STAMP" ] && [ ! "$config_file" -nt "$VALIDATION_STAMP" ]; then
+            continue
+        fi
+        config_checked=true
         if ! validate_config "$config_file" "bash"; then
             config_valid=false
             break
@@ -346,10 +352,17 @@ if [ "${config_valid:-true}" = false ]; then
     exit 1
 fi
 
+if [ "$config_checked" = true ]; then
+    { mkdir -p "${VALIDATION_STAMP%/*}" && touch "$VALIDATION_STAMP"; } 2>/dev/null || true
+fi
+
 # --- Global Variables ---
 # Runtime flags and configuration
 VERBOSE=false           # Enable detailed logging output
 DRY_RUN=false          # Preview mode - show what would be done without changes
+PREFETCH=true          # Download Flatpak packages in the background during the AUR/COPR steps
+FORCE_STEPS=false      # Re-run configuration steps even if already applied with the same settings
+ASSUME_YES=false       # Non-interactive: default answers, no menu, plain output
 TOTAL_STEPS=0          # Total number of installation steps
 CURRENT_STEP=0         # Current step counter for progress tracking
 INSTALL_MODE="standard" # Installation mode: standard, minimal, or server
@@ -357,6 +370,7 @@ IS_VIRTUAL_MACHINE=false # Whether we're running in a virtual machine
 
 # Helper tracking
 GUM_INSTALLED_BY_SCRIPT=false  # Track if we installed gum to clean it up later
+declare -A HANDLED_PACKAGES    # "type:package" keys an earlier install group installed or found installed
 
 # --- State Management ---
 # Track installation progress and state for rollback capabilities
@@ -372,23 +386,6 @@ PROGRESS_CURRENT=0
 # --- Helper Functions ---
 # Utility functions for script operation and user interaction
 
-# Detect if running in a virtual machine
-detect_virtual_machine() {
-    if [ -f /proc/cpuinfo ]; then
-        grep -qi "hypervisor\|vmware\|virtualbox\|kvm\|qemu\|xen" /proc/cpuinfo && return 0
-    fi
-    if [ -f /sys/class/dmi/id/product_name ]; then
-        grep -qi "virtual\|vmware\|virtualbox\|kvm\|qemu\|xen" /sys/class/dmi/id/product_name && return 0
-    fi
-    if [ -f /sys/class/dmi/id/sys_vendor ]; then
-        grep -qi "vmware\|virtualbox\|kvm\|qemu\|xen\|innotek" /sys/class/dmi/id/sys_vendor && return 0
-    fi
-    if command -v systemd-detect-virt >/dev/null 2>&1; then
-        systemd-detect-virt --quiet && return 0
-    fi
-    return 1
-}
-
 # Display help message and usage information
 # Shows command-line options, installation modes, and examples
 show_help() {
@@ -402,6 +399,9 @@ OPTIONS:
     -h, --help      Show this help message
     -v, --verbose   Show detailed output
     -d, --dry-run   Simulate installation (no changes made)
+    -y, --yes       Run unattended with default answers and plain output
+    --no-prefetch   Don't download Flatpak packages ahead of their install step
+    --force         Re-run configuration steps that were already applied
 
  DESCRIPTION:
      A smart, cross-distribution installer that configures your system,
@@ -428,7 +428,8 @@ bootstrap_tools() {
     log_info "Bootstrapping installer tools..."
 
     # Verify internet connectivity before attempting installations
-    if ! ping -c 1 -W 5 8.8.8.8 >/dev/null 2>&1; then
+    # (answered from the pre-install check's cached result when it ran)
+    if ! check_internet; then
         log_error "No internet connection detected!"
         log_error "Internet access is required for package installation."
         log_error "Please connect to the internet and try again."
@@ -437,9 +438,16 @@ bootstrap_tools() {
         fi
     fi
 
+    # Enable pacman ParallelDownloads before the first pacman transaction, so the
+    # gum bootstrap and the full system upgrade download in parallel too
+    if [ "$DISTRO_ID" = "arch" ] && [ "$DRY_RUN" = false ] && declare -f arch_tune_pacman_conf >/dev/null 2>&1; then
+        arch_tune_pacman_conf
+    fi
+
     # Install gum UI helper for enhanced terminal interface
-    # Gum provides beautiful menus, progress bars, and styled output
-    if ! supports_gum; then
+    # Gum provides beautiful menus, progress bars, and styled output; unattended
+    # (--yes) runs don't use it, so it isn't installed for them
+    if [ "$ASSUME_YES" = false ] && ! supports_gum; then
         if [ "$DRY_RUN" = true ]; then
             log_info "DRY RUN: Would install gum UI helper"
             return
@@ -451,13 +459,14 @@ bootstrap_tools() {
         if [ "$DISTRO_ID" = "arch" ]; then
             if pacman -S --noconfirm gum >/dev/null 2>&1; then
                 GUM_INSTALLED_BY_SCRIPT=true
+                reset_lookup_caches
                 supports_gum >/dev/null 2>&1 || true
                 log_success "Gum UI helper installed successfully"
             else
                 log_warn "Failed to install gum via pacman"
             fi
         else
-            if install_pkg gum >/dev/null 2>&1; then
+            if install_pkg_quiet gum; then
                 GUM_INSTALLED_BY_SCRIPT=true
                 supports_gum >/dev/null 2>&1 || true
                 log_success "Gum UI helper installed successfully"
@@ -508,27 +517,39 @@ get_packages_for_type() {
     fi
 }
 
-# Remove duplicate packages while preserving order
+# Remove duplicate packages in place while preserving order
+# Packages an earlier group of the same type already installed are dropped too,
+# so lists that overlap across base/essential/DE groups reach the package manager
+# once; packages that failed are kept, so a later group retries them
 deduplicate_packages() {
-    local -a packages=("$@")
-    if [ ${#packages[@]} -gt 1 ]; then
-        declare -A _seen_pkgs
-        local _deduped=()
-        for pkg in "${packages[@]}"; do
-            if [ -n "$pkg" ] && [ -z "${_seen_pkgs[$pkg]:-}" ]; then
-                _deduped+=("$pkg")
-                _seen_pkgs[$pkg]=1
-            fi
-        done
-        # Replace packages with deduplicated list
-        printf "%s\n" "${_deduped[@]}"
-        unset _seen_pkgs
-    else
-        printf "%s\n" "${packages[@]}"
-    fi
+    local -n dedup_ref="$1"
+    local package_type="$2"
+    local _deduped=() pkg
+    local -A _seen_pkgs=()
+
+    for pkg in "${dedup_ref[@]}"; do
+        trim_var pkg
+        if [ -n "$pkg" ] && [ -z "${_seen_pkgs[$pkg]:-}" ] && [ -z "${HANDLED_PACKAGES[$package_type:$pkg]:-}" ]; then
+            _deduped+=("$pkg")
+            _seen_pkgs["$pkg"]=1
+        fi
+    done
+
+    dedup_ref=("${_deduped[@]}")
+}
+
+# Record packages that are now present, so later groups skip them
+mark_packages_handled() {
+    local package_type="$1"
+    shift
+    local pkg
+    for pkg in "$@"; do
+        HANDLED_PACKAGES["$package_type:$pkg"]=1
+    done
 }
 
 # Install a group of packages based on mode and package type (native, aur, flatpak, snap)
+# group_name may list several space-separated groups; their packages are installed together
 install_package_group() {
     local group_name="$1"
     local description="$2"
@@ -541,15 +562,24 @@ install_package_group() {
 
     log_info "Installing $description..."
 
-    # Get packages for this group and type
-    local packages
-    mapfile -t packages < <(distro_get_packages "$group_name" "$package_type")
+    # Get packages for every requested group and type
+    local packages=() group
+    for group in $group_name; do
+        mapfile -t -O "${#packages[@]}" packages < <(distro_get_packages "$group" "$package_type")
+    done
 
     if [ ${#packages[@]} -eq 0 ]; then
         log_info "No packages to install for $group_name ($package_type)"
         return 0
     fi
 
+    # Deduplicate package list while preserving order
+    deduplicate_packages packages "$package_type"
+    if [ ${#packages[@]} -eq 0 ]; then
+        log_info "All $group_name ($package_type) packages were already installed by an earlier group"
+        return 0
+    fi
+
     # Check dependencies before installation (for native packages)
     if [ "$package_type" = "native" ]; then
         if ! check_dependencies "${packages[@]}"; then
@@ -557,10 +587,6 @@ install_package_group() {
         fi
     fi
 
-    # Deduplicate package list while preserving order
-    packages_str=$(deduplicate_packages "${packages[@]}")
-    mapfile -t packages <<< "$packages_str"
-
     if [ "$DRY_RUN" = true ]; then
         return 0
     fi
@@ -586,25 +612,49 @@ install_package_group() {
             ;;
     esac
 
+    mark_packages_handled "$package_type" "${installed[@]}" "${skipped[@]}"
+
     # Show installation summary for this package type
     show_package_summary "$description ($package_type)" installed failed
 }
 
-# Install Flatpak packages with individual tracking
+# Install Flatpak packages in one transaction with individual tracking
 install_flatpak_packages() {
     local install_cmd="$1"
     local -n packages_ref="$2" installed_ref="$3" skipped_ref="$4" failed_ref="$5"
 
+    # Snapshot installed application IDs once instead of listing per package
+    local -A installed_apps=()
+    local app_ids=() app_id
+    mapfile -t app_ids < <(flatpak list --app --columns=application 2>/dev/null || true)
+    for app_id in "${app_ids[@]}"; do
+        [ -n "$app_id" ] && installed_apps["$app_id"]=1
+    done
+
+    local pending=()
     for pkg in "${packages_ref[@]}"; do
-        pkg="$(echo "$pkg" | xargs)"
+        trim_var pkg
+        [ -n "$pkg" ] || continue
 
         # Check if flatpak is already installed
-        if flatpak list 2>/dev/null | grep -q "^${pkg}\s"; then
+        if [ -n "${installed_apps[$pkg]:-}" ]; then
             skipped_ref+=("$pkg")
             continue
         fi
 
         echo "• Installing $pkg"
+        pending+=("$pkg")
+    done
+
+    [ ${#pending[@]} -eq 0 ] && return 0
+
+    if $install_cmd "${pending[@]}" >/dev/null 2>&1; then
+        installed_ref+=("${pending[@]}")
+        return 0
+    fi
+
+    # The batch failed as a whole; retry individually to find the failing ones
+    for pkg in "${pending[@]}"; do
         if $install_cmd "$pkg" >/dev/null 2>&1; then
             installed_ref+=("$pkg")
         else
@@ -613,6 +663,35 @@ install_flatpak_packages() {
     done
 }
 
+# Download the Flatpak packages of the given groups in the background with
+# --no-deploy, so the transfer overlaps with the AUR builds and COPR step; the
+# later install then deploys from the local repository
+FLATPAK_PREFETCH_PID=""
+start_flatpak_prefetch() {
+    [ "$DRY_RUN" = false ] && [ "$PREFETCH" = true ] || return 0
+    command_exists flatpak || return 0
+
+    local packages=() group pkg
+    for group in $1; do
+        while read -r pkg; do
+            [ -n "$pkg" ] && packages+=("$pkg")
+        done < <(distro_get_packages "$group" "flatpak")
+    done
+    [ ${#packages[@]} -gt 0 ] || return 0
+
+    flatpak remote-add --if-not-exists flathub https://flathub.org/repo/flathub.flatpakrepo >/dev/null 2>&1 || true
+    flatpak install flathub -y --noninteractive --no-deploy "${packages[@]}" >/dev/null 2>&1 &
+    FLATPAK_PREFETCH_PID=$!
+}
+
+# Wait for the background Flatpak download; its result doesn't matter since
+# the real install fetches anything that is still missing
+finish_flatpak_prefetch() {
+    [ -n "$FLATPAK_PREFETCH_PID" ] || return 0
+    wait "$FLATPAK_PREFETCH_PID" 2>/dev/null || true
+    FLATPAK_PREFETCH_PID=""
+}
+
 # Get installation command for specific package type
 get_install_command() {
     local type="$1"
@@ -627,7 +706,7 @@ get_install_command() {
             fi
             ;;
         aur)
-            if command -v yay >/dev/null 2>&1; then
+            if command_exists yay; then
                 install_cmd="yay -S --noconfirm"
             else
                 log_error "yay not found. Please install yay first."
@@ -635,7 +714,7 @@ get_install_command() {
             fi
             ;;
         flatpak)
-            if ! command -v flatpak >/dev/null 2>&1; then
+            if ! command_exists flatpak; then
                 if [ "$DISTRO_ID" = "debian" ] || [ "$DISTRO_ID" = "ubuntu" ]; then
                     DEBIAN_FRONTEND=noninteractive $PKG_INSTALL $PKG_NOCONFIRM flatpak >/dev/null 2>&1 || true
                 else
@@ -643,10 +722,10 @@ get_install_command() {
                 fi
             fi
             # Add Flathub remote if not exists
-            if command -v flatpak >/dev/null 2>&1; then
+            if command_exists flatpak; then
                 flatpak remote-add --if-not-exists flathub https://flathub.org/repo/flathub.flatpakrepo >/dev/null 2>&1 || true
             fi
-            install_cmd="flatpak install flathub -y"
+            install_cmd="flatpak install flathub -y --noninteractive"
             ;;
         snap)
             install_cmd="snap install"
@@ -715,75 +794,48 @@ enable_password_feedback() {
 }
 
 # Smart service enabling for installed packages
+# Services are collected first and handed to enable_services, which enables
+# them with a single systemctl call (units without a unit file are skipped)
 enable_installed_services() {
     step "Enabling Services for Installed Packages"
 
-    local services_enabled=0
+    local services=()
     local services_skipped=0
 
     # Bluetooth service
     if is_package_installed "bluez" 2>/dev/null || is_package_installed "bluez-utils" 2>/dev/null; then
-        if systemctl enable --now bluetooth >/dev/null 2>&1; then
-            log_success "Bluetooth service enabled"
-            ((services_enabled++))
-        else
-            log_warn "Failed to enable bluetooth service"
-        fi
+        services+=(bluetooth)
     else
         ((services_skipped++))
     fi
 
     # SSH service
     if is_package_installed "openssh" 2>/dev/null; then
-        if systemctl enable --now sshd >/dev/null 2>&1; then
-            log_success "SSH service enabled"
-            ((services_enabled++))
-        elif systemctl enable --now ssh >/dev/null 2>&1; then
-            log_success "SSH service enabled"
-            ((services_enabled++))
-        else
-            log_warn "Failed to enable SSH service"
-        fi
+        services+=(sshd)
     else
         ((services_skipped++))
     fi
 
     # KDE Connect service
     if is_package_installed "kdeconnect" 2>/dev/null; then
-        if systemctl enable --now kdeconnectd >/dev/null 2>&1; then
-            log_success "KDE Connect service enabled"
-            ((services_enabled++))
-        else
-            log_warn "Failed to enable KDE Connect service"
-        fi
+        services+=(kdeconnectd)
     else
         ((services_skipped++))
     fi
 
-    # RustDesk service (if installed)
+    # RustDesk service (if installed; it might not ship a systemd unit)
     if is_package_installed "rustdesk" 2>/dev/null; then
-        # RustDesk might not have a systemd service, check for it
-        if systemctl list-unit-files | grep -q rustdesk; then
-            if systemctl enable --now rustdesk >/dev/null 2>&1; then
-                log_success "RustDesk service enabled"
-                ((services_enabled++))
-            else
-                log_warn "Failed to enable RustDesk service"
-            fi
-        else
-            log_info "RustDesk installed but no systemd service found"
-            ((services_skipped++))
-        fi
+        services+=(rustdesk)
     else
         ((services_skipped++))
     fi
 
     # NetworkManager (if installed and not already enabled)
+    # Enabled without --now so an active network setup isn't disturbed
     if is_package_installed "networkmanager" 2>/dev/null || is_package_installed "network-manager" 2>/dev/null; then
         if ! systemctl is-enabled NetworkManager >/dev/null 2>&1; then
             if systemctl enable NetworkManager >/dev/null 2>&1; then
                 log_success "NetworkManager service enabled"
-                ((services_enabled++))
             else
                 log_warn "Failed to enable NetworkManager service"
             fi
@@ -792,41 +844,23 @@ enable_installed_services() {
         fi
     fi
 
-    # Snap service (for Ubuntu/Snap packages)
+    # Snap service and socket (for Ubuntu/Snap packages)
     if is_package_installed "snapd" 2>/dev/null; then
-        if systemctl enable --now snapd >/dev/null 2>&1; then
-            log_success "Snap service enabled"
-            ((services_enabled++))
-        fi
-        if systemctl enable --now snapd.socket >/dev/null 2>&1; then
-            log_success "Snap socket enabled"
-        fi
+        services+=(snapd snapd.socket)
     fi
 
     # Docker service
     if is_package_installed "docker" 2>/dev/null || is_package_installed "docker.io" 2>/dev/null; then
-        if systemctl enable --now docker >/dev/null 2>&1; then
-            log_success "Docker service enabled"
-            ((services_enabled++))
-        else
-            log_warn "Failed to enable Docker service"
-        fi
+        services+=(docker)
     fi
 
-    # Flatpak service (if available)
-    if command -v flatpak >/dev/null 2>&1; then
-        # Flatpak doesn't typically need systemd services, but check for any
-        if systemctl list-unit-files | grep -q flatpak; then
-            if systemctl enable --now flatpak >/dev/null 2>&1; then
-                log_success "Flatpak service enabled"
-                ((services_enabled++))
-            fi
-        fi
+    # Flatpak doesn't typically need a systemd service, but enable one if present
+    if command_exists flatpak; then
+        services+=(flatpak)
     fi
 
-    # Report results
-    if [ $services_enabled -gt 0 ]; then
-        log_success "Enabled $services_enabled services for installed packages"
+    if [ ${#services[@]} -gt 0 ]; then
+        enable_services "${services[@]}"
     fi
 
     if [ $services_skipped -gt 0 ]; then
@@ -836,16 +870,35 @@ enable_installed_services() {
     return 0
 }
 
-# Install native packages individually for clean output
+# Run a package install command for one or more packages, quietly
+run_install_command() {
+    local install_cmd="$1"
+    shift
+
+    local install_status=0
+    if [ "$DISTRO_ID" = "debian" ] || [ "$DISTRO_ID" = "ubuntu" ]; then
+        DEBIAN_FRONTEND=noninteractive $PKG_INSTALL $PKG_NOCONFIRM "$@" >/dev/null 2>&1 || install_status=$?
+    else
+        $install_cmd "$@" >/dev/null 2>&1 || install_status=$?
+    fi
+
+    reset_lookup_caches
+    return $install_status
+}
+
+# Install native packages in one transaction with per-package output
 install_native_packages() {
     local install_cmd="$1"
     local -n packages_ref="$2" installed_ref="$3" skipped_ref="$4" failed_ref="$5"
 
+    # Resolve every package name first so installed state is checked in one
+    # query (a single pacman -T on Arch) instead of per package
+    local names=() resolved_names=() all_resolved=()
+    local resolved_pkg
     for pkg in "${packages_ref[@]}"; do
-        pkg="$(echo "$pkg" | xargs)"
+        trim_var pkg
 
         # Resolve package name for current distro
-        local resolved_pkg
         resolved_pkg="$(resolve_package_name "$pkg")"
 
         # If resolved_pkg is empty, skip this package (removed for this distro)
@@ -853,11 +906,28 @@ install_native_packages() {
             continue
         fi
 
+        names+=("$pkg")
+        resolved_names+=("$resolved_pkg")
+        all_resolved+=($resolved_pkg)
+    done
+
+    local missing=() missing_pkg
+    local -A missing_set=()
+    collect_missing_packages missing "${all_resolved[@]}"
+    for missing_pkg in "${missing[@]}"; do
+        missing_set["$missing_pkg"]=1
+    done
+
+    local pending=() pending_resolved=() i
+    for i in "${!names[@]}"; do
+        pkg="${names[$i]}"
+        resolved_pkg="${resolved_names[$i]}"
+
         # Check if all resolved packages are installed
         local all_installed=true
         local check_pkg
         for check_pkg in $resolved_pkg; do
-            if ! is_package_installed "$check_pkg"; then
+            if [ -n "${missing_set[$check_pkg]:-}" ]; then
                 all_installed=false
                 break
             fi
@@ -870,18 +940,31 @@ install_native_packages() {
 
         # Show individual installation
         echo "• Installing $pkg"
-        if [ "$DISTRO_ID" = "debian" ] || [ "$DISTRO_ID" = "ubuntu" ]; then
-            if DEBIAN_FRONTEND=noninteractive $PKG_INSTALL $PKG_NOCONFIRM "$resolved_pkg" >/dev/null 2>&1; then
-                installed_ref+=("$pkg")
-            else
-                failed_ref+=("$pkg")
-            fi
+        pending+=("$pkg")
+        pending_resolved+=("$resolved_pkg")
+    done
+
+    [ ${#pending[@]} -eq 0 ] && return 0
+
+    # Install everything in a single package manager transaction
+    local batch=() resolved_words=()
+    for i in "${!pending_resolved[@]}"; do
+        read -ra resolved_words <<< "${pending_resolved[$i]}"
+        batch+=("${resolved_words[@]}")
+    done
+
+    if run_install_command "$install_cmd" "${batch[@]}"; then
+        installed_ref+=("${pending[@]}")
+        return 0
+    fi
+
+    # One unavailable package aborts the whole transaction; retry individually
+    for i in "${!pending[@]}"; do
+        read -ra resolved_words <<< "${pending_resolved[$i]}"
+        if run_install_command "$install_cmd" "${resolved_words[@]}"; then
+            installed_ref+=("${pending[$i]}")
         else
-            if $install_cmd "$resolved_pkg" >/dev/null 2>&1; then
-                installed_ref+=("$pkg")
-            else
-                failed_ref+=("$pkg")
-            fi
+            failed_ref+=("${pending[$i]}")
         fi
     done
 }
@@ -894,27 +977,32 @@ install_other_packages() {
     # Handle AUR packages with proper user context
     if [[ "$install_cmd" == yay* ]]; then
         # Determine which user to run yay as (never as root)
-        local yay_user=""
-        if [ "$EUID" -eq 0 ]; then
-            if [ -n "${SUDO_USER:-}" ]; then
-                yay_user="$SUDO_USER"
-            else
-                # Fallback to first real user if SUDO_USER not set
-                yay_user=$(getent passwd 1000 | cut -d: -f1)
-            fi
-            if [ -z "${yay_user:-}" ]; then
-                log_error "Cannot determine user for AUR package installation"
-                return 1
-            fi
-        else
-            yay_user="$USER"
+        if ! detect_build_user; then
+            log_error "Cannot determine user for AUR package installation"
+            return 1
         fi
+        local yay_user="$BUILD_USER"
 
+        local pending=()
         for pkg in "${packages_ref[@]}"; do
-            pkg="$(echo "$pkg" | xargs)"
+            trim_var pkg
+            [ -n "$pkg" ] || continue
 
             echo "• Installing $pkg"
-            if sudo -u "$yay_user" bash -c "$install_cmd $pkg" >/dev/null 2>&1; then
+            pending+=("$pkg")
+        done
+
+        [ ${#pending[@]} -eq 0 ] && return 0
+
+        # Run yay directly (no intermediate bash -c) with the names as separate arguments
+        if sudo -u "$yay_user" $install_cmd "${pending[@]}" >/dev/null 2>&1; then
+            installed_ref+=("${pending[@]}")
+            return 0
+        fi
+
+        # Batch failed; retry individually to find the failing packages
+        for pkg in "${pending[@]}"; do
+            if sudo -u "$yay_user" $install_cmd "$pkg" >/dev/null 2>&1; then
                 installed_ref+=("$pkg")
             else
                 failed_ref+=("$pkg")
@@ -923,7 +1011,7 @@ install_other_packages() {
     else
         # Handle other package types (Snap, etc.)
         for pkg in "${packages_ref[@]}"; do
-            pkg="$(echo "$pkg" | xargs)"
+            trim_var pkg
 
             echo "• Installing $pkg"
             if $install_cmd "$pkg" >/dev/null 2>&1; then
@@ -972,15 +1060,11 @@ configure_user_shell_and_configs() {
     done
 
     # Determine target user and their home directory
-    local target_user="${SUDO_USER:-$USER}"
-    local home_dir
+    detect_target_user
+    local target_user="$TARGET_USER"
+    local home_dir="$TARGET_HOME"
 
-    # Safely get user's home directory without using eval
-    if [ "$target_user" = "root" ]; then
-        home_dir="/root"
-    else
-        # Use getent to safely get user information
-        home_dir=$(getent passwd "$target_user" 2>/dev/null | cut -d: -f6)
+    if [ "$target_user" != "root" ]; then
         if [ -z "$home_dir" ] || [ ! -d "$home_dir" ]; then
             # Fallback: try to get home from environment
             home_dir="${HOME:-/home/$target_user}"
@@ -1016,7 +1100,7 @@ configure_user_shell_and_configs() {
                 failed+=("$pkg")
             fi
         else
-            if install_pkg "$pkg" >/dev/null 2>&1; then
+            if install_pkg_quiet "$pkg"; then
                 installed+=("$pkg")
             else
                 failed+=("$pkg")
@@ -1026,7 +1110,9 @@ configure_user_shell_and_configs() {
 
     # Deploy configuration files with proper ownership
     # .zshrc - Zsh shell configuration with aliases, functions, and settings
-    if [ -f "$cfg_dir/.zshrc" ]; then
+    if [ -f "$cfg_dir/.zshrc" ] && config_is_current "$cfg_dir/.zshrc" "$home_dir/.zshrc"; then
+        log_info "Zsh configuration already up to date"
+    elif [ -f "$cfg_dir/.zshrc" ]; then
         log_info "Installing .zshrc configuration..."
         cp -a "$cfg_dir/.zshrc" "$home_dir/.zshrc" || {
             log_warn "Failed to copy .zshrc"
@@ -1039,7 +1125,9 @@ configure_user_shell_and_configs() {
     fi
 
     # starship.toml - Modern, fast, and customizable prompt
-    if [ -f "$cfg_dir/starship.toml" ]; then
+    if [ -f "$cfg_dir/starship.toml" ] && config_is_current "$cfg_dir/starship.toml" "$home_dir/.config/starship.toml"; then
+        log_info "Starship prompt configuration already up to date"
+    elif [ -f "$cfg_dir/starship.toml" ]; then
         log_info "Installing Starship prompt configuration..."
         mkdir -p "$home_dir/.config"
         cp -a "$cfg_dir/starship.toml" "$home_dir/.config/starship.toml" || {
@@ -1053,7 +1141,9 @@ configure_user_shell_and_configs() {
     fi
 
     # config.jsonc - Fastfetch system information display configuration
-    if [ -f "$cfg_dir/config.jsonc" ]; then
+    if [ -f "$cfg_dir/config.jsonc" ] && config_is_current "$cfg_dir/config.jsonc" "$home_dir/.config/fastfetch/config.jsonc"; then
+        log_info "Fastfetch configuration already up to date"
+    elif [ -f "$cfg_dir/config.jsonc" ]; then
         log_info "Installing Fastfetch configuration..."
         mkdir -p "$home_dir/.config/fastfetch"
         cp -a "$cfg_dir/config.jsonc" "$home_dir/.config/fastfetch/config.jsonc" || {
@@ -1089,8 +1179,11 @@ final_cleanup() {
         return
     fi
 
-    # Prompt the user whether to remove them (interactive)
-    if supports_gum; then
+    # Prompt the user whether to remove them (interactive); unattended runs
+    # keep them, matching the prompt's default
+    if ! is_interactive; then
+        log_info "Keeping helper packages: ${remove_list[*]}"
+    elif supports_gum; then
         display_info "Temporary helper packages detected: ${remove_list[*]}"
             if gum confirm --default=false "Remove these helper packages now?"; then
             for pkg in "${remove_list[@]}"; do
@@ -1157,8 +1250,51 @@ cleanup_on_exit() {
     fi
 }
 
+# Trap function for Ctrl+C / termination: stop child jobs with a bounded wait
+# instead of leaving package managers or background lookups running orphaned.
+# Background jobs of a non-interactive shell ignore SIGINT, so they are sent
+# TERM and only killed if still running after the grace period.
+# Usage: handle_interrupt <INT|TERM>
+handle_interrupt() {
+    local signal="${1:-INT}"
+    local child_pids=() pid
+    mapfile -t child_pids < <(jobs -p)
+
+    echo ""
+    log_warn "Installation interrupted, stopping running tasks..."
+
+    if [ ${#child_pids[@]} -gt 0 ]; then
+        kill -TERM "${child_pids[@]}" 2>/dev/null || true
+
+        # Give children up to 2 seconds to exit, checking each one, then
+        # force the ones still running
+        local waited=0 running=()
+        while [ $waited -lt 20 ]; do
+            running=()
+            for pid in "${child_pids[@]}"; do
+                kill -0 "$pid" 2>/dev/null && running+=("$pid")
+            done
+            [ ${#running[@]} -eq 0 ] && break
+            child_pids=("${running[@]}")
+            sleep 0.1
+            waited=$((waited + 1))
+        done
+        if [ ${#running[@]} -gt 0 ]; then
+            kill -KILL "${running[@]}" 2>/dev/null || true
+        fi
+    fi
+
+    # 128 + signal number, as the shell reports it
+    if [ "$signal" = "TERM" ]; then
+        exit 143
+    fi
+    exit 130
+}
+
 # Set trap for cleanup
 trap cleanup_on_exit EXIT
+trap 'handle_interrupt INT' INT
+trap 'handle_interrupt TERM' TERM
 
 # The main installation workflow with clear phases
 
@@ -1168,12 +1304,18 @@ while [[ "$#" -gt 0 ]]; do
     -h|--help) show_help ;;
     -v|--verbose) VERBOSE=true ;;
     -d|--dry-run) DRY_RUN=true ;;
+    -y|--yes) ASSUME_YES=true ;;
+    --no-prefetch) PREFETCH=false ;;
+    --force) FORCE_STEPS=true ;;
     *) echo "Unknown option: $1"; exit 1 ;;
   esac
   shift
 done
 
 # 2. Environment Setup
+# Connectivity is probed in the background while the environment is detected
+start_internet_check
+
 # We must detect distro first to know how to install prerequisites
 # Detect distribution and desktop environment with error handling
 if ! detect_distro; then
@@ -1243,31 +1385,35 @@ update_distro_theme
 # Initialize state management
 state_init
 
-# Bootstrap UI tools
-bootstrap_tools
-
 # Phase 2.5: Pre-Installation Validation
+# Run before bootstrapping UI tools so a failing environment exits early
 if [ "$DRY_RUN" = false ]; then
     if ! run_pre_install_checks; then
-        if supports_gum; then
-            display_error "Pre-installation checks failed" "Please resolve the issues above and try again"
-        fi
+        display_error "Pre-installation checks failed" "Please resolve the issues above and try again"
         exit 1
     fi
 fi
 
+# Bootstrap UI tools
+bootstrap_tools
+
+# Package metadata is refreshed while the user picks an installation mode
+start_db_refresh
+
 # Phase 3: Installation Mode Selection
 # Determine installation mode based on user interaction or defaults
-clear
-if [ -t 1 ] && [ "$DRY_RUN" = false ]; then
+if is_interactive && [ -t 1 ]; then
+    clear
+fi
+if [ -t 1 ] && [ "$ASSUME_YES" = false ] && [ "$DRY_RUN" = false ]; then
     # Interactive terminal - always show menu for user selection
     show_menu
-elif [ -t 1 ] && [ "$DRY_RUN" = true ]; then
+elif [ -t 1 ] && [ "$ASSUME_YES" = false ] && [ "$DRY_RUN" = true ]; then
     log_warn "Dry-Run Mode Active: No changes will be applied."
     log_info "Showing menu for preview purposes only."
     show_menu
 else
-    # Non-interactive mode (CI, scripts, pipes)
+    # Non-interactive mode (--yes, CI, scripts, pipes)
     # Only set a default mode if none exists to avoid overriding explicit settings
     if [ -z "${INSTALL_MODE:-}" ]; then
         export INSTALL_MODE="${INSTALL_MODE:-standard}"
@@ -1282,8 +1428,21 @@ fi
 # Phase 4: Core Installation Execution
 # Execute the main installation workflow in logical steps
 
-# Initialize progress tracking (estimate total steps)
-progress_init 15
+# Initialize progress tracking with the steps the active mode runs: update,
+# password feedback, preparation, packages and Wake-on-LAN always; distro,
+# user and finalization outside dry runs; desktop, security, performance,
+# maintenance (and gaming, if selected) outside server mode
+PROGRESS_STEPS=5
+if [ "$DRY_RUN" = false ]; then
+    PROGRESS_STEPS=$((PROGRESS_STEPS + 3))
+fi
+if [ "$INSTALL_MODE" != "server" ]; then
+    PROGRESS_STEPS=$((PROGRESS_STEPS + 4))
+    if [ "${INSTALL_GAMING:-false}" = "true" ]; then
+        PROGRESS_STEPS=$((PROGRESS_STEPS + 1))
+    fi
+fi
+progress_init "$PROGRESS_STEPS"
 
 # Step: System Update
 step "Updating System Repositories"
@@ -1305,20 +1464,15 @@ progress_update "Password feedback setup"
 # Run distro-specific system preparation early so essential helpers are present
 # before package installation and mark the step complete to avoid duplication.
 # Note: For Arch, this includes pacman configuration via configure_pacman_arch
-DSTR_PREP_FUNC="${DISTRO_ID}_system_preparation"
+# The distro module was already sourced at startup for its package lists, so
+# it is not parsed again here. Ubuntu uses the Debian module's functions.
+DSTR_PREP_FUNC="${DISTRO_ID/#ubuntu/debian}_system_preparation"
 DSTR_PREP_STEP="${DSTR_PREP_FUNC}"
     step "Running system preparation for $DISTRO_ID"
 if [ "$DRY_RUN" = false ]; then
-    source "$SCRIPTS_DIR/distro_check.sh"
     if declare -f "$DSTR_PREP_FUNC" >/dev/null 2>&1; then
         time_start "distro_prep"
-        # Map ubuntu to debian config
-        config_file="${DISTRO_ID}_config.sh"
-        if [ "$DISTRO_ID" = "ubuntu" ]; then
-            config_file="debian_config.sh"
-        fi
-        source "$SCRIPTS_DIR/$config_file"
-        "$DSTR_PREP_FUNC"
+        "$DSTR_PREP_FUNC" && state_update "system_preparation" "done"
         time_end "distro_prep"
     else
         log_error "System preparation function not found for $DISTRO_ID"
@@ -1334,22 +1488,32 @@ if [ "$INSTALL_MODE" = "server" ] && [[ "$DISTRO_ID" = "debian" || "$DISTRO_ID"
     debian_setup_docker_repo
 fi
 
-# Install Base packages (native only) - Standard/Minimal/Server
-install_package_group "$INSTALL_MODE" "Base System" "native"
-
-# Install distro-provided 'essential' group (native only)
-install_package_group "essential" "Essential Packages" "native"
+# Base (Standard/Minimal/Server), distro 'essential' and Desktop Environment
+# packages are installed in one package manager transaction, so dependency
+# resolution, downloads and post-install hooks run once instead of per group
+NATIVE_GROUPS="$INSTALL_MODE essential"
+FLATPAK_GROUPS="$INSTALL_MODE"
 
-# Install Desktop Environment Specific Packages (native only)
 if [[ -n "${XDG_CURRENT_DESKTOP:-}" && "$INSTALL_MODE" != "server" ]]; then
-    DE_KEY=$(echo "$XDG_CURRENT_DESKTOP" | tr '[:upper:]' '[:lower:]')
+    DE_KEY="${XDG_CURRENT_DESKTOP,,}"
     if [[ "$DE_KEY" == *"kde"* ]]; then DE_KEY="kde"; fi
     if [[ "$DE_KEY" == *"gnome"* ]]; then DE_KEY="gnome"; fi
 
-    step "Installing Desktop Environment Packages ($DE_KEY)"
-    install_package_group "$DE_KEY" "$XDG_CURRENT_DESKTOP Environment" "native"
+    NATIVE_GROUPS+=" $DE_KEY"
+    FLATPAK_GROUPS+=" $DE_KEY"
+    step "Installing System and Desktop Environment Packages ($DE_KEY)"
+fi
+
+# Custom addons (rudimentary handling) join the same transactions; the
+# gaming lists overlap with the base ones and are deduplicated together
+if [[ "${CUSTOM_GROUPS:-}" == *"Gaming"* ]]; then
+    NATIVE_GROUPS+=" gaming"
+    FLATPAK_GROUPS+=" gaming"
 fi
 
+install_package_group "$NATIVE_GROUPS" "System Packages" "native"
+start_flatpak_prefetch "$FLATPAK_GROUPS"
+
 # Install AUR packages for Arch Linux
  if [ "$DISTRO_ID" = "arch" ]; then
     install_package_group "$INSTALL_MODE" "AUR Packages" "aur"
@@ -1359,7 +1523,7 @@ fi
  if [ "$DISTRO_ID" = "fedora" ]; then
     step "Installing COPR/eza Package"
     if [ "$DRY_RUN" = false ]; then
-        if command -v dnf >/dev/null; then
+        if command_exists dnf; then
             # Install eza from COPR
             if dnf copr enable -y eza-community/eza >/dev/null 2>&1; then
                 install_packages_with_progress "eza"
@@ -1373,18 +1537,9 @@ fi
     fi
 fi
 
-# Install Flatpak packages for all sections (Base, Desktop, Gaming)
-install_package_group "$INSTALL_MODE" "Flatpak Packages" "flatpak"
-
-if [[ -n "${XDG_CURRENT_DESKTOP:-}" && "$INSTALL_MODE" != "server" ]]; then
-    install_package_group "$DE_KEY" "Flatpak Packages" "flatpak"
-fi
-
-# Handle Custom Addons if any (rudimentary handling)
-if [[ "${CUSTOM_GROUPS:-}" == *"Gaming"* ]]; then
-    install_package_group "gaming" "Gaming Suite" "native"
-    install_package_group "gaming" "Gaming Suite" "flatpak"
-fi
+# Install Flatpak packages for the base and desktop sections in one transaction
+finish_flatpak_prefetch
+install_package_group "$FLATPAK_GROUPS" "Flatpak Packages" "flatpak"
 
 # Use to gaming decision made at menu time (if applicable)
 if [ "$INSTALL_MODE" = "standard" ] || [ "$INSTALL_MODE" = "minimal" ] && [ -z "${CUSTOM_GROUPS:-}" ]; then
@@ -1396,41 +1551,31 @@ fi
 
 time_end "package_installation"
 progress_update "Package installation"
-progress_update "Wake-on-LAN configuration"
-progress_update "Distribution configuration"
-progress_update "User configuration"
-progress_update "Desktop configuration"
-progress_update "Security configuration"
-progress_update "Performance optimization"
-progress_update "Gaming configuration"
-progress_update "Maintenance setup"
-progress_update "Finalization"
 
 # ------------------------------------------------------------------
 # Wake-on-LAN auto-configuration step
 #
-# If wakeonlan integration module was sourced above (wakeonlan_main_config),
+# If the optional wakeonlan integration module is present, source it and
 # run it now (unless we're in DRY_RUN). In DRY_RUN show status instead.
 # This keeps the step idempotent and consistent with the installer flow.
 # ------------------------------------------------------------------
+if [ "$INSTALL_MODE" != "server" ] && [ -f "$SCRIPTS_DIR/wakeonlan_config.sh" ]; then
+    source "$SCRIPTS_DIR/wakeonlan_config.sh"
+fi
 if [ "$INSTALL_MODE" != "server" ] && declare -f wakeonlan_main_config >/dev/null 2>&1; then
     step "Configuring Wake-on-LAN (Ethernet)"
 
     if [ "${DRY_RUN:-false}" = "true" ]; then
         log_info "[DRY-RUN] Would auto-configure Wake-on-LAN for wired interfaces"
 
-        # Try to show what would be done by printing helper status output (if present)
-        WOL_HELPER="$(cd "$SCRIPT_DIR/.." && pwd)/Scripts/wakeonlan.sh"
-        if [ -x "$WOL_HELPER" ]; then
-            bash "$WOL_HELPER" --status 2>&1 | sed 's/^/  /'
-        else
-            log_warn "Wake-on-LAN helper not found at $WOL_HELPER"
-        fi
+        # Show what would be done using the already-sourced status check
+        wakeonlan_status
     else
         # Non-dry run: call the integration entrypoint which handles enabling
         wakeonlan_main_config || log_warn "wakeonlan_main_config reported issues"
     fi
 fi
+progress_update "Wake-on-LAN configuration"
 
 # Step: Run Distribution-Specific Configuration
 # This replaces the numbered scripts with unified distribution-specific modules
@@ -1441,21 +1586,21 @@ if [ "$DRY_RUN" = false ]; then
     case "$DISTRO_ID" in
         "arch")
             if declare -f arch_main_config >/dev/null 2>&1; then
-                arch_main_config
+                run_config_step distro arch_main_config
             else
                 log_warn "Arch configuration module not found"
             fi
             ;;
         "fedora")
             if declare -f fedora_main_config >/dev/null 2>&1; then
-                fedora_main_config
+                run_config_step distro fedora_main_config
             else
                 log_warn "Fedora configuration module not found"
             fi
             ;;
         "debian"|"ubuntu")
             if declare -f debian_main_config >/dev/null 2>&1; then
-                debian_main_config
+                run_config_step distro debian_main_config
             else
                 log_warn "Debian/Ubuntu configuration module not found"
             fi
@@ -1464,12 +1609,14 @@ if [ "$DRY_RUN" = false ]; then
             log_warn "No specific configuration module for $DISTRO_ID"
             ;;
     esac
+    progress_update "Distribution configuration"
 
     # Step: Configure user shell and config files (universal)
     display_step "🐚" "Configuring User Shell and Configuration Files"
     if [ "$DRY_RUN" = false ]; then
         configure_user_shell_and_configs
     fi
+    progress_update "User configuration"
 fi
 
 # Step: Run Desktop Environment Configuration
@@ -1483,7 +1630,7 @@ if [ "$INSTALL_MODE" != "server" ]; then
             *"KDE"*)
                 if [ -f "$SCRIPTS_DIR/kde_config.sh" ]; then
                     source "$SCRIPTS_DIR/kde_config.sh"
-                    kde_main_config
+                    run_config_step desktop kde_main_config
                 else
                     log_warn "KDE configuration module not found"
                 fi
@@ -1491,7 +1638,7 @@ if [ "$INSTALL_MODE" != "server" ]; then
             *"GNOME"*)
                 if [ -f "$SCRIPTS_DIR/gnome_config.sh" ]; then
                     source "$SCRIPTS_DIR/gnome_config.sh"
-                    gnome_main_config
+                    run_config_step desktop gnome_main_config
                 else
                     log_warn "GNOME configuration module not found"
                 fi
@@ -1501,6 +1648,7 @@ if [ "$INSTALL_MODE" != "server" ]; then
                 ;;
         esac
     fi
+    progress_update "Desktop configuration"
 fi
 
 # Step: Run Security Configuration
@@ -1512,11 +1660,12 @@ if [ "$INSTALL_MODE" != "server" ]; then
     else
         if [ -f "$SCRIPTS_DIR/security_config.sh" ]; then
             source "$SCRIPTS_DIR/security_config.sh"
-            security_main_config
+            run_config_step security security_main_config
         else
             log_warn "Security configuration module not found"
         fi
     fi
+    progress_update "Security configuration"
 fi
 
 # Step: Run Performance Optimization
@@ -1528,11 +1677,12 @@ if [ "$INSTALL_MODE" != "server" ]; then
     else
         if [ -f "$SCRIPTS_DIR/performance_config.sh" ]; then
             source "$SCRIPTS_DIR/performance_config.sh"
-            performance_main_config
+            run_config_step performance performance_main_config
         else
             log_warn "Performance configuration module not found"
         fi
     fi
+    progress_update "Performance optimization"
 fi
 
 # Step: Run Gaming Configuration (if applicable)
@@ -1544,11 +1694,12 @@ if [ "$INSTALL_MODE" != "server" ] && [ "${INSTALL_GAMING:-false}" = "true" ]; t
     else
         if [ -f "$SCRIPTS_DIR/gaming_config.sh" ]; then
             source "$SCRIPTS_DIR/gaming_config.sh"
-            gaming_main_config
+            run_config_step gaming gaming_main_config
         else
             log_warn "Gaming configuration module not found"
         fi
     fi
+    progress_update "Gaming configuration"
 fi
 
 # Step: Run Maintenance Setup
@@ -1560,11 +1711,12 @@ if [ "$INSTALL_MODE" != "server" ]; then
     else
         if [ -f "$SCRIPTS_DIR/maintenance_config.sh" ]; then
             source "$SCRIPTS_DIR/maintenance_config.sh"
-            maintenance_main_config
+            run_config_step maintenance maintenance_main_config
         else
             log_warn "Maintenance configuration module not found"
         fi
     fi
+    progress_update "Maintenance setup"
 fi
 
 # Phase 5: Installation Finalization and Cleanup
@@ -1580,12 +1732,22 @@ if [ "$DRY_RUN" = false ]; then
     # Generate performance report
     performance_report
 
+    # Report configuration steps that failed without stopping the run
+    show_failed_steps
+    progress_update "Finalization"
+
     # Show final progress summary
     install_duration=$(( $(date +%s) - ${INSTALL_STATE["start_time"]:-$(date +%s)} ))
     progress_summary "$install_duration"
 fi
 
 # Detect system info for installation summary (if power_config available)
+# power_config.sh provides `detect_system_info`, `show_system_info`, and
+# `configure_power_management` to auto-detect CPU/GPU/RAM and configure
+# power-profiles-daemon / cpupower / tuned as appropriate.
+if [ -f "$SCRIPTS_DIR/power_config.sh" ]; then
+    source "$SCRIPTS_DIR/power_config.sh"
+fi
 if declare -f detect_system_info >/dev/null 2>&1; then
     detect_system_info
 fi
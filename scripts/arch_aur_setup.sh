@@ -4,7 +4,7 @@ set -uo pipefail
 # Arch Linux AUR Setup Script
 # Handles installation of yay AUR helper and mirror optimization with reflector
 
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+SCRIPT_DIR="${SCRIPTS_DIR:-$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)}"
 source "$SCRIPT_DIR/common.sh"
 source "$SCRIPT_DIR/distro_check.sh"
 
@@ -14,15 +14,23 @@ if [ "$DISTRO_ID" != "arch" ]; then
     exit 1
 fi
 
-# Install yay AUR helper
-arch_install_aur_helper() {
+# yay is built in the background so the CPU-bound compile overlaps with the
+# mirror ranking and database refresh; only the final pacman -U has to wait
+YAY_BUILD_PID=""
+YAY_BUILD_DIR=""
+
+# Install build dependencies and start building yay; returns non-zero if the
+# build could not be started (yay already present is not an error)
+start_yay_build() {
     display_step "📦" "Installing AUR Helper (yay)"
 
-    if command -v yay >/dev/null 2>&1; then
+    if command_exists yay; then
         return 0
     fi
 
-    if ! pacman -S --noconfirm --needed base-devel git >/dev/null 2>&1; then
+    # Install build dependencies (including yay's go makedepend) as root up front,
+    # so makepkg never has to call sudo from inside the unprivileged build
+    if ! pacman -S --noconfirm --needed base-devel git go >/dev/null 2>&1; then
         return 1
     fi
 
@@ -31,56 +39,54 @@ arch_install_aur_helper() {
     chmod 700 "$temp_dir"
 
     # Determine which user to run AUR build as (never as root)
-    local build_user=""
+    if ! detect_build_user; then
+        log_error "Cannot determine user for AUR build"
+        rm -rf "$temp_dir"
+        return 1
+    fi
+    local build_user="$BUILD_USER"
     if [ "$EUID" -eq 0 ]; then
-        if [ -n "${SUDO_USER:-}" ]; then
-            build_user="$SUDO_USER"
-        else
-            # Fallback to first real user if SUDO_USER not set
-            build_user=$(getent passwd 1000 | cut -d: -f1)
-        fi
-        if [ -z "${build_user:-}" ]; then
-            log_error "Cannot determine user for AUR build"
-            rm -rf "$temp_dir"
-            return 1
-        fi
         # Change ownership to build user while maintaining secure permissions
         chown "$build_user:$build_user" "$temp_dir"
         chmod 755 "$temp_dir"  # Allow build user to read/execute, owner full access
-    else
-        build_user="$USER"
     fi
 
-    cd "$temp_dir" || return 1
+    # Clone and build in a single unprivileged session; the package is
+    # installed directly as root later instead of letting makepkg -i re-elevate
+    # via sudo. The build directory is passed to that session, so the
+    # installer's own working directory never changes
+    sudo -u "$build_user" bash -c 'cd "$1" && git clone --depth 1 --single-branch https://aur.archlinux.org/yay.git . && makepkg --noconfirm --needed' _ "$temp_dir" >/dev/null 2>&1 &
+    YAY_BUILD_PID=$!
+    YAY_BUILD_DIR="$temp_dir"
+}
 
-    if sudo -u "$build_user" git clone https://aur.archlinux.org/yay.git . >/dev/null 2>&1; then
-        if sudo -u "$build_user" makepkg -si --noconfirm --needed >/dev/null 2>&1; then
-            if supports_gum; then
-                display_success "✓ yay installed"
-            fi
+# Wait for the background yay build and install the resulting package
+finish_yay_build() {
+    [ -n "$YAY_BUILD_PID" ] || return 0
 
-            # Clean up /tmp directory that yay uses for building
-            log_info "Cleaning up temporary build files..."
-            if [ "$EUID" -eq 0 ] && [ -n "${SUDO_USER:-}" ]; then
-                # Clean up build user's temp files if we're running as root
-                sudo -u "$build_user" rm -rf "/tmp/yay"* "/tmp/makepkg"*
-            fi
-            # Also clean any root-owned temp files
-            rm -rf /tmp/yay* /tmp/makepkg* 2>/dev/null || true
-            log_info "Temporary build files cleaned up"
-        else
-            cd - >/dev/null
-            rm -rf "$temp_dir"
-            return 1
-        fi
-    else
-        log_error "Failed to clone yay repository"
-        cd - >/dev/null
+    local temp_dir="$YAY_BUILD_DIR"
+    local build_status=0
+    wait "$YAY_BUILD_PID" || build_status=$?
+    YAY_BUILD_PID=""
+    YAY_BUILD_DIR=""
+
+    if [ $build_status -ne 0 ]; then
+        log_error "Failed to clone or build yay"
+        rm -rf "$temp_dir"
+        return 1
+    fi
+
+    local yay_pkgs=("$temp_dir"/yay-[0-9]*.pkg.tar.*)
+    if [ ! -f "${yay_pkgs[0]}" ] || ! pacman -U --noconfirm --needed "${yay_pkgs[@]}" >/dev/null 2>&1; then
+        log_error "Failed to install built yay package"
         rm -rf "$temp_dir"
         return 1
     fi
 
-    cd - >/dev/null
+    if supports_gum; then
+        display_success "✓ yay installed"
+    fi
+
     rm -rf "$temp_dir"
 }
 
@@ -99,17 +105,56 @@ uninstall_yay() {
         log_info "yay-debug not installed"
     fi
 
-    # Clean up any remaining yay temp directories
+    # Clean up any remaining yay temp directories (only fork rm if any exist)
     log_info "Cleaning up yay temporary files..."
-    rm -rf /tmp/yay* /tmp/makepkg* 2>/dev/null || true
+    local leftovers=()
+    shopt -s nullglob
+    leftovers=(/tmp/yay* /tmp/makepkg*)
+    shopt -u nullglob
+    if [ ${#leftovers[@]} -gt 0 ]; then
+        rm -rf "${leftovers[@]}" 2>/dev/null || true
+    fi
     log_success "Temporary files cleaned up"
 }
 
+# Look up the country for mirror selection in the background so the network
+# round-trip overlaps with the yay build instead of blocking reflector
+COUNTRY_LOOKUP_FILE=""
+COUNTRY_LOOKUP_PID=""
+start_country_lookup() {
+    COUNTRY_LOOKUP_FILE=$(mktemp)
+    curl -s --max-time 5 https://ipinfo.io/country 2>/dev/null | tr -d '\n\r' > "$COUNTRY_LOOKUP_FILE" &
+    COUNTRY_LOOKUP_PID=$!
+}
+
+# Collect the background country lookup into COUNTRY_LOOKUP_RESULT
+COUNTRY_LOOKUP_RESULT=""
+finish_country_lookup() {
+    [ -n "$COUNTRY_LOOKUP_PID" ] || return 1
+
+    local lookup_status=0
+    wait "$COUNTRY_LOOKUP_PID" || lookup_status=$?
+    COUNTRY_LOOKUP_RESULT=$(<"$COUNTRY_LOOKUP_FILE")
+    rm -f "$COUNTRY_LOOKUP_FILE"
+    COUNTRY_LOOKUP_PID=""
+    return $lookup_status
+}
+
+# Stop a still-pending country lookup and remove its temp file; installed as
+# the EXIT trap so every exit path of main cleans up after the lookup
+cancel_country_lookup() {
+    [ -n "$COUNTRY_LOOKUP_PID" ] || return 0
+    kill "$COUNTRY_LOOKUP_PID" 2>/dev/null
+    wait "$COUNTRY_LOOKUP_PID" 2>/dev/null
+    rm -f "$COUNTRY_LOOKUP_FILE"
+    COUNTRY_LOOKUP_PID=""
+}
+
 # Update mirrors using reflector
 update_mirrors_with_reflector() {
     display_step "🌐" "Updating mirrors with reflector"
 
-    if ! command -v reflector >/dev/null 2>&1; then
+    if ! command_exists reflector; then
         log_error "reflector not found. Cannot update mirrors."
         log_info "reflector should be installed as part of ARCH_ESSENTIALS"
         return 1
@@ -121,33 +166,43 @@ update_mirrors_with_reflector() {
     log_info "Ensuring pacman package database is up to date..."
 
     # First, try to update mirrors with reflector if internet is available
-    log_info "Checking internet connectivity for mirror optimization..."
-    if ping -c 1 -W 5 archlinux.org >/dev/null 2>&1; then
+    # Reuses the connectivity result install.sh exported at startup (probes
+    # only when run standalone); reflector reports its own network errors if
+    # the connection drops later
+    if check_internet; then
         log_info "Internet available, attempting mirror optimization..."
-        local reflector_output
+        local reflector_args=(--latest 10 --sort rate --age 24 --save /etc/pacman.d/mirrorlist --protocol https,http)
         # Detect country for better mirror selection
         local country=""
-        if country=$(curl -s --max-time 5 https://ipinfo.io/country 2>/dev/null | tr -d '\n' | tr -d '\r'); then
+        if [ -z "$COUNTRY_LOOKUP_PID" ]; then
+            start_country_lookup
+        fi
+        if finish_country_lookup; then
+            country="$COUNTRY_LOOKUP_RESULT"
             if [ -n "$country" ] && [ "$country" != "null" ]; then
                 log_info "Detected country: $country"
-                reflector_output=$(reflector --latest 10 --sort rate --age 24 --country "$country" --save /etc/pacman.d/mirrorlist --protocol https,http 2>&1)
+                reflector_args+=(--country "$country")
             else
                 log_info "Could not detect country, using global mirror selection"
-                reflector_output=$(reflector --latest 10 --sort rate --age 24 --save /etc/pacman.d/mirrorlist --protocol https,http 2>&1)
             fi
         else
             log_info "Country detection failed, using global mirror selection"
-            reflector_output=$(reflector --latest 10 --sort rate --age 24 --save /etc/pacman.d/mirrorlist --protocol https,http 2>&1)
         fi
 
-        if [ $? -eq 0 ]; then
+        # Stream reflector's output to a file instead of holding it in a
+        # command substitution; only the tail is read back on failure
+        local reflector_log
+        reflector_log=$(mktemp)
+        if reflector "${reflector_args[@]}" >"$reflector_log" 2>&1; then
             log_success "Mirrorlist updated with fastest mirrors"
         else
             log_warn "Reflector failed, using existing mirrorlist"
-            log_info "reflector output: $reflector_output"
+            log_info "reflector output: $(tail -c "$LOG_MAX_LINE_LENGTH" "$reflector_log")"
         fi
+        rm -f "$reflector_log"
     else
         log_info "No internet connectivity, using existing mirror configuration"
+        finish_country_lookup || true
     fi
 
     # Always update pacman database, even with potentially stale mirrors
@@ -173,8 +228,12 @@ update_mirrors_with_reflector() {
 
 # Main execution
 main() {
-    # Install yay first
-    if ! arch_install_aur_helper; then
+    # Start the mirror country lookup while yay builds
+    trap cancel_country_lookup EXIT
+    start_country_lookup
+
+    # Build yay in the background while the mirrors are ranked
+    if ! start_yay_build; then
         log_error "Failed to install yay AUR helper"
         exit 1
     fi
@@ -182,6 +241,19 @@ main() {
     # Update mirrors using reflector
     if ! update_mirrors_with_reflector; then
         log_error "Failed to update mirrors with reflector"
+        # yay doesn't depend on the mirrors, so it is still installed (as when
+        # it was built before the mirror update); only the setup reports failure
+        if finish_yay_build; then
+            log_info "yay was installed despite the mirror update failure"
+        else
+            log_error "Failed to install yay AUR helper"
+        fi
+        exit 1
+    fi
+
+    # Install yay once its build and the database refresh are both done
+    if ! finish_yay_build; then
+        log_error "Failed to install yay AUR helper"
         exit 1
     fi
 
@@ -10,7 +10,7 @@ var_is_set() {
 # Arch Linux Configuration Module for LinuxInstaller
 # Based on archinstaller best practices
 
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+SCRIPT_DIR="${SCRIPTS_DIR:-$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)}"
 source "$SCRIPT_DIR/common.sh"
 source "$SCRIPT_DIR/distro_check.sh"
 
@@ -322,7 +322,6 @@ distro_get_packages() {
             ;;
     esac
 }
-export -f distro_get_packages
 
 # =============================================================================
 # ARCH LINUX CONFIGURATION FUNCTIONS
@@ -359,7 +358,7 @@ arch_system_preparation() {
     fi
 
     # Configure reflector for automatic mirror updates
-    if command -v reflector >/dev/null 2>&1; then
+    if command_exists reflector; then
         log_info "Configuring reflector for automatic mirror updates..."
         mkdir -p /etc/xdg/reflector
         cat << EOF > /etc/xdg/reflector/reflector.conf
@@ -383,7 +382,10 @@ EOF
         fi
     fi
 
-    # Update system
+    # Update system. This runs even when update_system already upgraded:
+    # arch_aur_setup.sh has since re-synced the databases against the new
+    # mirrors and multilib, and installing against those without -Syu would
+    # leave a partial upgrade.
     if supports_gum; then
         display_step "🔄" "Updating system"
         if pacman -Syu --noconfirm >/dev/null 2>&1; then
@@ -396,44 +398,66 @@ EOF
     fi
 }
 
-# Configure pacman package manager settings for Arch Linux
-configure_pacman_arch() {
-    log_info "Configuring pacman for optimal performance..."
+# Apply the pacman.conf tweaks (ParallelDownloads, Color, ILoveCandy, VerbosePkgLists)
+# Called from bootstrap_tools before the first pacman transaction, and again from
+# configure_pacman_arch, where it is a no-op once the options are in place
+arch_tune_pacman_conf() {
+    # Read pacman.conf once and apply every needed edit in a single sed pass:
+    # Color, ParallelDownloads, ILoveCandy and VerbosePkgLists.
+    # Only edits that would change the file are queued, so re-runs skip sed.
+    local pacman_conf
+    pacman_conf=$(<"$ARCH_REPOS_FILE")
+
+    local sed_args=()
+    local option
+    for option in Color ILoveCandy VerbosePkgLists; do
+        if [[ "$pacman_conf" =~ (^|$'\n')#$option ]]; then
+            sed_args+=(-e "s/^#$option/$option/")
+        fi
+    done
 
-    # Enable Color output
-    if grep -q "^#Color" "$ARCH_REPOS_FILE"; then
-        sed -i 's/^#Color/Color/' "$ARCH_REPOS_FILE"
+    if ! [[ "$pacman_conf" =~ (^|$'\n')ParallelDownloads\ =\ $PARALLEL_DOWNLOADS($'\n'|$) ]]; then
+        if [[ "$pacman_conf" =~ (^|$'\n')#?ParallelDownloads ]]; then
+            sed_args+=(-e "s/^#\\?ParallelDownloads.*/ParallelDownloads = $PARALLEL_DOWNLOADS/")
+        else
+            # Add ParallelDownloads under [options] if no (commented) line exists
+            sed_args+=(-e "/^\[options\]/a ParallelDownloads = $PARALLEL_DOWNLOADS")
+        fi
     fi
 
-    # Enable ParallelDownloads
-    if grep -q "^#ParallelDownloads" "$ARCH_REPOS_FILE"; then
-        sed -i "s/^#ParallelDownloads.*/ParallelDownloads = $PARALLEL_DOWNLOADS/" "$ARCH_REPOS_FILE"
-    elif grep -q "^ParallelDownloads" "$ARCH_REPOS_FILE"; then
-        sed -i "s/^ParallelDownloads.*/ParallelDownloads = $PARALLEL_DOWNLOADS/" "$ARCH_REPOS_FILE"
-    else
-        sed -i "/^\[options\]/a ParallelDownloads = $PARALLEL_DOWNLOADS" "$ARCH_REPOS_FILE"
+    # Add ILoveCandy after Color if it isn't present at all
+    if ! [[ "$pacman_conf" =~ (^|$'\n')#?ILoveCandy ]]; then
+        sed_args+=(-e '/^#\?Color/a ILoveCandy')
     fi
 
-    # Enable ILoveCandy
-    if grep -q "^#ILoveCandy" "$ARCH_REPOS_FILE"; then
-        sed -i 's/^#ILoveCandy/ILoveCandy/' "$ARCH_REPOS_FILE"
+    if [ ${#sed_args[@]} -gt 0 ]; then
+        backup_config "$ARCH_REPOS_FILE"
+        sed -i "${sed_args[@]}" "$ARCH_REPOS_FILE"
+    else
+        log_info "pacman.conf options already configured"
     fi
+}
 
-    # Enable VerbosePkgLists
-    if grep -q "^#VerbosePkgLists" "$ARCH_REPOS_FILE"; then
-        sed -i 's/^#VerbosePkgLists/VerbosePkgLists/' "$ARCH_REPOS_FILE"
-    fi
+# Configure pacman package manager settings for Arch Linux
+configure_pacman_arch() {
+    log_info "Configuring pacman for optimal performance..."
+
+    arch_tune_pacman_conf
 
     # Clean old package cache to free up disk space
-    if [ -d "/var/cache/pacman/pkg" ]; then
-        local cache_dir="/var/cache/pacman/pkg"
-        local cache_before=0
-        local cache_after=0
+    # Cached packages are counted with a glob (one directory read) instead of
+    # du walking the cache twice, and paccache is skipped for an empty cache
+    local cache_dir="/var/cache/pacman/pkg"
+    local cached_packages=()
+    if [ -d "$cache_dir" ]; then
+        shopt -s nullglob
+        cached_packages=("$cache_dir"/*.pkg.tar.zst "$cache_dir"/*.pkg.tar.xz)
+        shopt -u nullglob
+    fi
 
-        # Calculate cache size before cleaning
-        if [ -d "$cache_dir" ]; then
-            cache_before=$(du -sh "$cache_dir" 2>/dev/null | cut -f1)
-        fi
+    if [ ${#cached_packages[@]} -gt 0 ]; then
+        local cache_before=${#cached_packages[@]}
+        local cache_after=0
 
         if supports_gum; then
             spin "Cleaning old package cache"  paccache -r -k 3 >/dev/null 2>&1
@@ -452,19 +476,22 @@ configure_pacman_arch() {
             log_success "Cache for uninstalled packages removed"
         fi
 
-        # Calculate cache size after cleaning
-        if [ -d "$cache_dir" ]; then
-            cache_after=$(du -sh "$cache_dir" 2>/dev/null | cut -f1)
-        fi
+        # Count the remaining cached packages
+        shopt -s nullglob
+        cached_packages=("$cache_dir"/*.pkg.tar.zst "$cache_dir"/*.pkg.tar.xz)
+        shopt -u nullglob
+        cache_after=${#cached_packages[@]}
 
-        # Show cache size reduction
+        # Show cache reduction
         if [ "$cache_before" != "$cache_after" ]; then
             if supports_gum; then
-                display_info "Cache size: $cache_before → $cache_after"
+                display_info "Cached packages: $cache_before → $cache_after"
             else
-                log_info "Cache size reduced from $cache_before to $cache_after"
+                log_info "Cached packages reduced from $cache_before to $cache_after"
             fi
         fi
+    else
+        log_info "Package cache is empty, skipping cache cleanup"
     fi
 
     log_success "pacman configured with optimizations"
@@ -474,13 +501,23 @@ configure_pacman_arch() {
 check_and_enable_multilib() {
     log_info "Checking and enabling multilib repository..."
 
-    if ! grep -q "^\[multilib\]" "$ARCH_REPOS_FILE"; then
-        log_info "Enabling multilib repository..."
-        sed -i '/\[options\]/a # Multilib repository\n[multilib]\nInclude = /etc/pacman.d/mirrorlist' "$ARCH_REPOS_FILE"
-        log_success "multilib repository enabled"
-    else
+    # Match only an uncommented [multilib] section header
+    local pacman_conf
+    pacman_conf=$(<"$ARCH_REPOS_FILE")
+
+    if [[ "$pacman_conf" =~ (^|$'\n')\[multilib\][[:space:]]*($'\n'|$) ]]; then
         log_info "multilib repository already enabled"
+        return 0
     fi
+
+    log_info "Enabling multilib repository..."
+    if [[ "$pacman_conf" =~ (^|$'\n')#[[:space:]]*\[multilib\] ]]; then
+        # Uncomment the stock [multilib] block and its Include line
+        sed -i '/^#[[:space:]]*\[multilib\]/,/^#[[:space:]]*Include/ s/^#[[:space:]]*//' "$ARCH_REPOS_FILE"
+    else
+        printf '\n[multilib]\nInclude = /etc/pacman.d/mirrorlist\n' >> "$ARCH_REPOS_FILE"
+    fi
+    log_success "multilib repository enabled"
 }
 
 
@@ -496,18 +533,13 @@ arch_enable_system_services() {
         sshd
     )
 
-    for service in "${services[@]}"; do
-        if systemctl list-unit-files | grep -q "^$service"; then
-            if systemctl enable --now "$service" >/dev/null 2>&1; then
-                log_success "Enabled and started $service"
-            else
-                log_warn "Failed to enable $service"
-            fi
-        fi
-    done
+    enable_services "${services[@]}"
 }
 
 # Configure system locales for Greek and US English on Arch Linux
+# locale-gen runs in the background so it overlaps with the kernel header,
+# bootloader and plymouth steps; arch_finish_locale_generation collects it
+LOCALE_GEN_PID=""
 arch_configure_locale() {
     display_step "🌍" "Configuring Arch Linux Locales (Greek and US)"
 
@@ -518,35 +550,16 @@ arch_configure_locale() {
         return 1
     fi
 
-    # Uncomment Greek locale (el_GR.UTF-8)
-    if grep -q "^#el_GR.UTF-8 UTF-8" "$locale_file"; then
-        log_info "Enabling Greek locale (el_GR.UTF-8)..."
-        sed -i 's/^#el_GR.UTF-8 UTF-8/el_GR.UTF-8 UTF-8/' "$locale_file"
-        log_success "Greek locale enabled"
-    elif grep -q "^el_GR.UTF-8 UTF-8" "$locale_file"; then
-        log_info "Greek locale already enabled"
-    else
-        log_warn "Greek locale not found in locale.gen"
-    fi
+    # Uncomment Greek (el_GR.UTF-8) and US English (en_US.UTF-8) locales
+    enable_locales "$locale_file" "el_GR.UTF-8 UTF-8|Greek" "en_US.UTF-8 UTF-8|US English"
 
-    # Uncomment US English locale (en_US.UTF-8)
-    if grep -q "^#en_US.UTF-8 UTF-8" "$locale_file"; then
-        log_info "Enabling US English locale (en_US.UTF-8)..."
-        sed -i 's/^#en_US.UTF-8 UTF-8/en_US.UTF-8 UTF-8/' "$locale_file"
-        log_success "US English locale enabled"
-    elif grep -q "^en_US.UTF-8 UTF-8" "$locale_file"; then
-        log_info "US English locale already enabled"
+    # Generate locales, unless the archive is already current
+    if locales_need_generation "$locale_file"; then
+        log_info "Generating locales in the background..."
+        locale-gen >/dev/null 2>&1 &
+        LOCALE_GEN_PID=$!
     else
-        log_warn "US English locale not found in locale.gen"
-    fi
-
-    # Generate locales
-    log_info "Generating locales..."
-    if locale-gen >/dev/null 2>&1; then
-        log_success "Locales generated successfully"
-    else
-        log_error "Failed to generate locales"
-        return 1
+        log_info "Locales already generated"
     fi
 
     # Set default locale to Greek (can be changed by user)
@@ -558,7 +571,7 @@ arch_configure_locale() {
 
     # Set LANG to Greek
     log_info "Setting default locale to Greek (el_GR.UTF-8)..."
-    if bash -c "echo 'LANG=el_GR.UTF-8' > '$locale_conf'"; then
+    if echo 'LANG=el_GR.UTF-8' > "$locale_conf"; then
         log_success "Default locale set to el_GR.UTF-8"
     else
         log_warn "Failed to set default locale"
@@ -569,6 +582,22 @@ arch_configure_locale() {
     log_info "Available locales: el_GR.UTF-8 (Greek), en_US.UTF-8 (US English)"
 }
 
+# Wait for the background locale-gen started by arch_configure_locale
+arch_finish_locale_generation() {
+    [ -n "$LOCALE_GEN_PID" ] || return 0
+
+    local gen_status=0
+    wait "$LOCALE_GEN_PID" || gen_status=$?
+    LOCALE_GEN_PID=""
+
+    if [ $gen_status -eq 0 ]; then
+        log_success "Locales generated successfully"
+    else
+        log_error "Failed to generate locales"
+        return 1
+    fi
+}
+
 # Install kernel headers for all installed kernels
 arch_install_kernel_headers() {
     display_step "🔧" "Installing kernel headers for installed kernels"
@@ -578,26 +607,28 @@ arch_install_kernel_headers() {
         return 0
     fi
 
-    # Get list of installed kernels (excluding headers, docs, firmware, etc.)
-    local installed_kernels
-    installed_kernels=$(pacman -Q | grep '^linux-' | grep -v 'headers' | grep -v 'docs' | grep -v 'firmware' | cut -d' ' -f1)
+    # Query all supported kernels in one pacman call; only installed ones are printed
+    local installed_kernels=()
+    local kernel _
+    while read -r kernel _; do
+        installed_kernels+=("$kernel")
+    done < <(pacman -Q linux linux-lts linux-zen linux-hardened 2>/dev/null)
 
-    if [ -z "$installed_kernels" ]; then
+    if [ ${#installed_kernels[@]} -eq 0 ]; then
         log_warn "No linux kernels found installed"
         return 1
     fi
 
-    local headers_to_install=""
-    for kernel in $installed_kernels; do
-        local header_pkg="${kernel}-headers"
-        if ! pacman -Q "$header_pkg" >/dev/null 2>&1; then
-            headers_to_install="$headers_to_install $header_pkg"
+    local headers_to_install=()
+    for kernel in "${installed_kernels[@]}"; do
+        if ! is_package_installed "${kernel}-headers"; then
+            headers_to_install+=("${kernel}-headers")
         fi
     done
 
-    if [ -n "$headers_to_install" ]; then
+    if [ ${#headers_to_install[@]} -gt 0 ]; then
         log_info "Installing kernel headers..."
-        install_packages_with_progress $headers_to_install
+        install_packages_with_progress "${headers_to_install[@]}"
     else
         log_info "All kernel headers are already installed"
     fi
@@ -607,12 +638,9 @@ arch_install_kernel_headers() {
 # MAIN ARCH CONFIGURATION FUNCTION
 # =============================================================================
 
-arch_main_config() {
-    log_info "Starting Arch Linux configuration..."
-
-    # System preparation already done early, proceed with configuration
-    log_info "System preparation completed, proceeding with configuration..."
-
+# Configuration steps of arch_main_config that run while locale-gen works in
+# the background
+arch_configure_system() {
     # Install kernel headers for installed kernels
     arch_install_kernel_headers
 
@@ -634,14 +662,27 @@ arch_main_config() {
     arch_setup_solaar
 
     arch_enable_system_services
+}
+
+arch_main_config() {
+    log_info "Starting Arch Linux configuration..."
 
+    # System preparation already done early, proceed with configuration
+    log_info "System preparation completed, proceeding with configuration..."
+
+    # Locale generation is independent of the other steps; start it first.
+    # Those steps run in their own function, so the background job is
+    # collected whichever way that function returns
     if [ "$INSTALL_MODE" != "server" ]; then
         arch_configure_locale
     fi
+    arch_configure_system
+    arch_finish_locale_generation
 
     # Add user to docker group if docker is installed
     if is_package_installed "docker"; then
-        local target_user="${SUDO_USER:-$USER}"
+        detect_target_user
+        local target_user="$TARGET_USER"
         if [ "$target_user" != "root" ]; then
             usermod -aG docker "$target_user" 2>/dev/null && log_info "Added $target_user to docker group"
         fi
@@ -651,11 +692,12 @@ arch_main_config() {
     if supports_gum; then
         echo ""
         display_box "Arch Linux Configuration Complete" "Your Arch Linux system has been optimized:"
-        display_success "✓ pacman: Optimized with parallel downloads and ILoveCandy"
-        display_success "✓ cache: Cleaned old packages (keeping last 3 versions)"
-        display_success "✓ mirrors: Optimized for faster downloads"
-        display_success "✓ shell: ZSH configured with starship prompt"
-        display_success "✓ locales: Greek (el_GR.UTF-8) and US English enabled"
+        display_success_list \
+            "✓ pacman: Optimized with parallel downloads and ILoveCandy" \
+            "✓ cache: Cleaned old packages (keeping last 3 versions)" \
+            "✓ mirrors: Optimized for faster downloads" \
+            "✓ shell: ZSH configured with starship prompt" \
+            "✓ locales: Greek (el_GR.UTF-8) and US English enabled"
         display_info "• Log out and back in to apply shell changes"
         echo ""
     fi
@@ -674,7 +716,8 @@ arch_setup_shell() {
     display_step "🐚" "Setting up ZSH shell environment"
 
     # Determine target user for shell change
-    local target_user="${SUDO_USER:-$USER}"
+    detect_target_user
+    local target_user="$TARGET_USER"
 
     # Set ZSH as default shell for the target user (not root)
     if [ "$target_user" != "root" ]; then
@@ -734,8 +777,8 @@ arch_setup_solaar() {
     local has_logitech=false
 
     # Check USB devices for Logitech (if lsusb available)
-    if command -v lsusb >/dev/null 2>&1; then
-        if command -v timeout >/dev/null 2>&1; then
+    if command_exists lsusb; then
+        if command_exists timeout; then
             if timeout 3s lsusb 2>/dev/null | grep -i logitech >/dev/null 2>&1; then
                 has_logitech=true
                 log_info "Logitech hardware detected via USB"
@@ -749,9 +792,9 @@ arch_setup_solaar() {
     fi
 
     # Check Bluetooth devices for Logitech (if bluetoothctl available)
-    if command -v bluetoothctl >/dev/null 2>&1; then
+    if command_exists bluetoothctl; then
         # ensure the call cannot hang by using timeout where available and redirecting stdin
-        if command -v timeout >/dev/null 2>&1; then
+        if command_exists timeout; then
             if timeout 3s bluetoothctl devices </dev/null | grep -i logitech >/dev/null 2>&1; then
                 has_logitech=true
                 log_info "Logitech Bluetooth device detected"
@@ -768,7 +811,7 @@ arch_setup_solaar() {
     for hid in /dev/hidraw*; do
         [ -e "$hid" ] || continue
         hid_base=$(basename "$hid")
-        if grep -qi logitech "/sys/class/hidraw/$hid_base/device/uevent" 2>/dev/null; then
+        if LC_ALL=C grep -aqi logitech "/sys/class/hidraw/$hid_base/device/uevent" 2>/dev/null; then
             has_logitech=true
             log_info "Logitech HID device detected: $hid"
             break
@@ -797,12 +840,12 @@ arch_configure_plymouth() {
     display_step "🎨" "Configuring Plymouth boot splash"
 
     if [ "$DRY_RUN" = true ]; then
-        log_info "[DRY-RUN] Would configure Plymouth (install package, update initramfs, adjust bootloader kernel params)"
+        log_info "[DRY-RUN] Would configure Plymouth (install package, update initramfs)"
         return 0
     fi
 
     # Ensure plymouth package is installed
-    if ! command -v plymouth >/dev/null 2>&1; then
+    if ! command_exists plymouth; then
         log_info "Installing 'plymouth' package..."
         install_packages_with_progress "plymouth"
     else
@@ -811,60 +854,36 @@ arch_configure_plymouth() {
 
     # Add plymouth hook to mkinitcpio if absent
     if [ -f /etc/mkinitcpio.conf ]; then
-        if ! grep -q 'plymouth' /etc/mkinitcpio.conf && ! grep -q 'sd-plymouth' /etc/mkinitcpio.conf; then
-            log_info "Adding 'plymouth' hook to /etc/mkinitcpio.conf"
-            sed -i '/^HOOKS=/ s/)/ plymouth)/' /etc/mkinitcpio.conf || true
+        # Only the active HOOKS=(...) line matters; it is taken from a single
+        # read, and initramfs is rebuilt only after the hook was actually added
+        local hooks_line="" line
+        while IFS= read -r line; do
+            [[ "$line" == HOOKS=* ]] && hooks_line="$line"
+        done < /etc/mkinitcpio.conf
+
+        if [[ "$hooks_line" == *plymouth* ]]; then
+            log_info "mkinitcpio already contains plymouth hook"
+        elif [[ "$hooks_line" != *")"* ]]; then
+            log_warn "No HOOKS=(...) line found in /etc/mkinitcpio.conf; add the 'plymouth' hook manually"
+        elif ! sed -i '/^HOOKS=/ s/)/ plymouth)/' /etc/mkinitcpio.conf; then
+            log_warn "Failed to add 'plymouth' hook to /etc/mkinitcpio.conf"
+        else
+            log_info "Added 'plymouth' hook to /etc/mkinitcpio.conf"
             log_info "Regenerating initramfs..."
             if mkinitcpio -P >/dev/null 2>&1; then
                 log_success "Initramfs regenerated with plymouth hook"
             else
                 log_warn "Failed to regenerate initramfs; please run 'mkinitcpio -P' manually"
             fi
-        else
-            log_info "mkinitcpio already contains plymouth hook"
-        fi
-    fi
-
-    # Configure GRUB to include splash if needed
-    if [ -f /etc/default/grub ]; then
-        if ! grep -q 'splash' /etc/default/grub; then
-            log_info "Adding 'splash' to GRUB kernel parameters"
-            sed -i 's/^GRUB_CMDLINE_LINUX_DEFAULT=.*/& splash/' /etc/default/grub || true
-            if grub-mkconfig -o /boot/grub/grub.cfg >/dev/null 2>&1; then
-                log_success "GRUB configuration updated with splash"
-            else
-                log_warn "Failed to regenerate GRUB config; please run 'grub-mkconfig -o /boot/grub/grub.cfg' manually"
-            fi
-        else
-            log_info "GRUB already contains 'splash' parameter"
         fi
     fi
 
-    # For systemd-boot, add splash to entries if applicable
-    local entries_dir=""
-    if [ -d "/boot/loader/entries" ]; then
-        entries_dir="/boot/loader/entries"
-    elif [ -d "/efi/loader/entries" ]; then
-        entries_dir="/efi/loader/entries"
-    elif [ -d "/boot/efi/loader/entries" ]; then
-        entries_dir="/boot/efi/loader/entries"
-    fi
-
-    if [ -n "$entries_dir" ]; then
-        for entry in "$entries_dir"/*.conf; do
-            [ -e "$entry" ] || continue
-            if [ -f "$entry" ] && grep -q '^options' "$entry" && ! grep -q 'splash' "$entry"; then
-                if sed -i "/^options/ s/$/ splash/" "$entry" >/dev/null 2>&1; then
-                    log_success "Added 'splash' to $entry"
-                else
-                    log_warn "Failed to add 'splash' to $entry"
-                fi
-            fi
-        done
-    fi
+    # The 'splash' kernel parameter is applied by arch_configure_bootloader
+    # together with the other boot parameters, so GRUB defaults / loader
+    # entries are edited (and grub-mkconfig run) in one pass
 
     # Optionally set a default theme if plymouth provides a helper
-    if command -v plymouth-set-default-theme >/dev/null 2>&1; then
+    if command_exists plymouth-set-default-theme; then
         log_info "Setting a default plymouth theme if not already set..."
         # Do not force a theme; only set if command succeeds and a default is known
         if plymouth-set-default-theme --list | grep -q default >/dev/null 2>&1; then
@@ -875,46 +894,19 @@ arch_configure_plymouth() {
     log_success "Plymouth configuration completed"
 }
 
- export -f arch_enable_system_services
- export -f arch_configure_plymouth
-
 # Configure systemd-boot for Arch Linux
 configure_systemd_boot_arch() {
     log_info "Configuring systemd-boot for Arch Linux..."
 
-    local entries_dir=""
-    if [ -d "/boot/loader/entries" ]; then
-        entries_dir="/boot/loader/entries"
-    elif [ -d "/efi/loader/entries" ]; then
-        entries_dir="/efi/loader/entries"
-    elif [ -d "/boot/efi/loader/entries" ]; then
-        entries_dir="/boot/efi/loader/entries"
-    fi
-
-    if [ -z "$entries_dir" ]; then
+    if ! load_loader_entries; then
         log_error "Could not find systemd-boot entries directory"
         return 1
     fi
 
     local arch_params="quiet splash loglevel=3 rd.udev.log_level=3 vt.global_cursor_default=0"
-    local updated=false
-
-    for entry in "$entries_dir"/*.conf; do
-        [ -e "$entry" ] || continue
-        if [ -f "$entry" ]; then
-            if ! grep -q "splash" "$entry"; then
-                if grep -q "^options" "$entry"; then
-                    sed -i "/^options/ s/$/ $arch_params/" "$entry"
-                    log_success "Updated $entry"
-                    updated=true
-                else
-                    echo "options $arch_params" | tee -a "$entry" >/dev/null
-                    log_success "Updated $entry (added options)"
-                    updated=true
-                fi
-            fi
-        fi
-    done
+    if ! update_loader_entries "$arch_params"; then
+        log_info "systemd-boot entries already configured"
+    fi
 
     # Fix systemd-boot random seed permissions for security (ArchWiki)
     setup_boot_permissions_fix
@@ -945,7 +937,8 @@ arch_configure_bootloader() {
     display_step "🔄" "Configuring Arch Linux Bootloader"
 
     local bootloader
-    bootloader=$(detect_bootloader)
+    detect_bootloader
+    bootloader="$DETECTED_BOOTLOADER"
 
     case "$bootloader" in
         "grub")
@@ -975,20 +968,32 @@ configure_grub_arch() {
         return 1
     fi
 
-    # Set timeout
-    sed -i 's/^GRUB_TIMEOUT=.*/GRUB_TIMEOUT=3/' /etc/default/grub
+    local changed=false
+
+    # Set timeout, skipping the rewrite when it is already in place
+    local grub_defaults
+    grub_defaults=$(</etc/default/grub)
+    # Both edits are queued and applied with a single sed pass below
+    local sed_args=()
+    if ! [[ "$grub_defaults" =~ (^|$'\n')GRUB_TIMEOUT=3($'\n'|$) ]]; then
+        sed_args+=(-e 's/^GRUB_TIMEOUT=.*/GRUB_TIMEOUT=3/')
+        changed=true
+    fi
 
     # Add Arch-specific kernel parameters including plymouth
     local arch_params="quiet splash loglevel=3 rd.udev.log_level=3 vt.global_cursor_default=0"
-    local current_line=$(grep "^GRUB_CMDLINE_LINUX_DEFAULT=" /etc/default/grub)
-    local current_params=""
-
-    if [ -n "$current_line" ]; then
-        current_params=$(echo "$current_line" | cut -d'=' -f2- | sed "s/^['\"]//;s/['\"]$//")
-    fi
+    local current_params="" line
+    # Take the current value from the copy already read, without grep/cut/sed
+    while IFS= read -r line; do
+        if [[ "$line" == GRUB_CMDLINE_LINUX_DEFAULT=* ]]; then
+            current_params="${line#*=}"
+            current_params="${current_params#[\"\']}"
+            current_params="${current_params%[\"\']}"
+            break
+        fi
+    done <<< "$grub_defaults"
 
     local new_params="$current_params"
-    local changed=false
 
     for param in $arch_params; do
         if [[ ! "$new_params" == *"$param"* ]]; then
@@ -998,15 +1003,20 @@ configure_grub_arch() {
     done
 
     if [ "$changed" = true ]; then
-        sed -i "s|^GRUB_CMDLINE_LINUX_DEFAULT=.*|GRUB_CMDLINE_LINUX_DEFAULT=\"$new_params\"|" /etc/default/grub
+        sed_args+=(-e "s|^GRUB_CMDLINE_LINUX_DEFAULT=.*|GRUB_CMDLINE_LINUX_DEFAULT=\"$new_params\"|")
+        sed -i "${sed_args[@]}" /etc/default/grub
         log_success "Updated GRUB kernel parameters"
     fi
 
-    # Regenerate GRUB config
-    log_info "Regenerating GRUB configuration..."
-    if ! grub-mkconfig -o /boot/grub/grub.cfg >/dev/null 2>&1; then
-        log_error "Failed to regenerate GRUB config"
-        return 1
+    # Regenerate GRUB config only when the defaults changed or grub.cfg is stale
+    if [ "$changed" = true ] || [ ! -f /boot/grub/grub.cfg ] || [ /etc/default/grub -nt /boot/grub/grub.cfg ]; then
+        log_info "Regenerating GRUB configuration..."
+        if ! grub-mkconfig -o /boot/grub/grub.cfg >/dev/null 2>&1; then
+            log_error "Failed to regenerate GRUB config"
+            return 1
+        fi
+    else
+        log_info "GRUB configuration already up to date"
     fi
 
     log_success "GRUB configured successfully"
@@ -1014,9 +1024,3 @@ configure_grub_arch() {
     # Fix systemd-boot random seed permissions for security (ArchWiki)
     setup_boot_permissions_fix
 }
-
-export -f arch_system_preparation
-export -f arch_configure_bootloader
-export -f arch_configure_locale
-export -f arch_install_kernel_headers
-export -f arch_main_config
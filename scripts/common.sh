@@ -17,14 +17,25 @@
 # separate modules.
 # =============================================================================
 
+# Every module sources this file; only load it (and apply the theme) once
+if [ -n "${LINUXINSTALLER_COMMON_LOADED:-}" ]; then
+    return 0
+fi
+LINUXINSTALLER_COMMON_LOADED=1
+
 # --- UI and Logging ---
 
-# Determine script directory
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+# Determine script directory (reuse the installer's SCRIPTS_DIR; resolve it only when run standalone)
+SCRIPT_DIR="${SCRIPTS_DIR:-$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)}"
 
 # Default log file location (can be overridden by calling script)
 LOG_FILE="${LOG_FILE:-/var/log/linuxinstaller.log}"
 
+# Log size caps: the log is append-only across runs, so keep only the most
+# recent lines and clip pathological single lines (e.g. full build output)
+LOG_MAX_LINES=2000
+LOG_MAX_LINE_LENGTH=4096
+
 # Find gum binary in PATH and common locations, avoiding shell function false positives
 find_gum_bin() {
     # Scan PATH entries for an executable 'gum' and print its path if found.
@@ -51,6 +62,19 @@ find_gum_bin() {
 
 # Check if gum UI helper is available and executable
 supports_gum() {
+    # --yes runs use plain output throughout
+    [ "${ASSUME_YES:-false}" = true ] && return 1
+
+    # Cached binary that still exists: answer without a subshell or PATH walk
+    if [ -n "$GUM_BIN" ] && [ -x "$GUM_BIN" ]; then
+        return 0
+    fi
+
+    # Cached negative result; reset_lookup_caches clears it after installs
+    if [ "$GUM_LOOKUP_DONE" = true ]; then
+        return 1
+    fi
+
     # Fast path using type -P (portable) when it finds a binary
     local candidate
     candidate="$(type -P gum 2>/dev/null || true)"
@@ -68,6 +92,7 @@ supports_gum() {
 
     # Not available
     GUM_BIN=""
+    GUM_LOOKUP_DONE=true
     return 1
 }
 
@@ -90,16 +115,24 @@ GUM_FG="$GUM_PRIMARY_FG"
 
 # Cached path to an external gum binary (populated by supports_gum/find_gum_bin)
 GUM_BIN=""
+GUM_LOOKUP_DONE=false  # true once a lookup found no gum; reset when packages change
 
 # Define ANSI color variables (always available for logging functions)
-RESET='\033[0m'
-RED='\033[0;31m'
-GREEN='\033[0;32m'
-YELLOW='\033[1;33m'
-WHITE='\033[1;37m'     # bright white for body text
-BLUE='\033[1;36m'      # bright cyan for headers/title (primary theme color)
-CYAN='\033[0;36m'      # standard cyan for accents
-LIGHT_CYAN='\033[1;36m' # light cyan for secondary text
+RESET=$'\033[0m'
+RED=$'\033[0;31m'
+GREEN=$'\033[0;32m'
+YELLOW=$'\033[1;33m'
+WHITE=$'\033[1;37m'     # bright white for body text
+BLUE=$'\033[1;36m'      # bright cyan for headers/title (primary theme color)
+CYAN=$'\033[0;36m'      # standard cyan for accents
+LIGHT_CYAN=$'\033[1;36m' # light cyan for secondary text
+
+# gum flags whose value is replaced by a theme color (flag -> color variable name)
+declare -A GUM_THEME_OVERRIDES=(
+    ["--border-foreground"]="GUM_BORDER_FG"
+    ["--cursor.foreground"]="GUM_PRIMARY_FG"
+    ["--selected.foreground"]="GUM_SUCCESS_FG"
+)
 
 # Enhanced wrapper around gum binary for beautiful cyan-themed UI
 gum() {
@@ -128,16 +161,10 @@ gum() {
         fi
 
         # Enforce beautiful cyan theme colors
-        if [ "$arg" = "--border-foreground" ]; then
-            new_args+=("$arg" "$GUM_BORDER_FG")
-            skip_next=true
-            continue
-        elif [ "$arg" = "--cursor.foreground" ]; then
-            new_args+=("$arg" "$GUM_PRIMARY_FG")
-            skip_next=true
-            continue
-        elif [ "$arg" = "--selected.foreground" ]; then
-            new_args+=("$arg" "$GUM_SUCCESS_FG")
+        local theme_var=""
+        [ -n "$arg" ] && theme_var="${GUM_THEME_OVERRIDES[$arg]:-}"
+        if [ -n "$theme_var" ]; then
+            new_args+=("$arg" "${!theme_var}")
             skip_next=true
             continue
         fi
@@ -155,6 +182,16 @@ source "$SCRIPT_DIR/display.sh"
 # Update distro theme after DISTRO_ID is available
 update_distro_theme 2>/dev/null || true
 
+# Forward stdin line by line with a prefix, so output from a background job
+# can be shown live and still be told apart from the foreground step
+# Usage: some_command 2>&1 | prefix_output "[name]"
+prefix_output() {
+    local prefix="$1" line
+    while IFS= read -r line || [ -n "$line" ]; do
+        printf '%s %s\n' "$prefix" "$line"
+    done
+}
+
 # Execute command with spinner for user feedback during long operations
 # Usage: spin "Description of operation" command args...
 spin() {
@@ -176,6 +213,14 @@ spin() {
     fi
 }
 
+# Trim leading/trailing whitespace from the named variable in place
+# Usage: trim_var varname   (avoids an echo | xargs subshell per call)
+trim_var() {
+    local -n trim_ref="$1"
+    trim_ref="${trim_ref#"${trim_ref%%[![:space:]]*}"}"
+    trim_ref="${trim_ref%"${trim_ref##*[![:space:]]}"}"
+}
+
 # Install packages with clean progress indicators
 # install_packages_with_progress moved to display.sh
 
@@ -187,6 +232,8 @@ spin() {
 
 # Save installation summary
 state_finalize() {
+    state_flush
+
     local end_time=$(date +%s)
     local duration=$((end_time - ${INSTALL_STATE["start_time"]:-$end_time}))
 
@@ -235,22 +282,68 @@ state_init() {
 # Mode: ${INSTALL_MODE:-unknown}
 EOF
 
+    # Trim the persistent log so it does not grow without bound across runs
+    if [ -f "$LOG_FILE" ] && [ "$(wc -l < "$LOG_FILE")" -gt "$LOG_MAX_LINES" ]; then
+        local trimmed_log
+        trimmed_log=$(tail -n "$LOG_MAX_LINES" "$LOG_FILE")
+        printf '%s\n' "$trimmed_log" > "$LOG_FILE"
+    fi
+
+    # Keep append descriptors open for the whole run so flushes don't reopen files
+    exec {STATE_FILE_FD}>>"$INSTALL_STATE_FILE"
+    { exec {STATE_LOG_FD}>>"$LOG_FILE"; } 2>/dev/null || STATE_LOG_FD=""
+
     # Initialize state variables
     INSTALL_STATE["stage"]="initialized"
-    INSTALL_STATE["start_time"]="$(date +%s)"
+    printf -v 'INSTALL_STATE[start_time]' '%(%s)T' -1
     INSTALL_STATE["packages_installed"]=""
     INSTALL_STATE["services_enabled"]=""
     INSTALL_STATE["configs_modified"]=""
 }
 
+# Pending state/log lines, written out in batches by state_flush
+STATE_FILE_BUFFER=""
+STATE_LOG_BUFFER=""
+STATE_BUFFER_LINES=0
+STATE_FLUSH_THRESHOLD=32
+STATE_FILE_FD=""
+STATE_LOG_FD=""
+
 # Update installation state
 state_update() {
     local key="$1"
     local value="$2"
 
+    local timestamp
+    printf -v timestamp '%(%Y-%m-%d %H:%M:%S)T' -1
+
     INSTALL_STATE["$key"]="$value"
-    echo "$key=$value" >> "$INSTALL_STATE_FILE"
-    echo "$(date '+%Y-%m-%d %H:%M:%S') [STATE] $key=$value" >> "$LOG_FILE"
+    STATE_FILE_BUFFER+="$key=$value"$'\n'
+    STATE_LOG_BUFFER+="$timestamp [STATE] $key=${value:0:$LOG_MAX_LINE_LENGTH}"$'\n'
+    ((STATE_BUFFER_LINES++))
+
+    if [ "$STATE_BUFFER_LINES" -ge "$STATE_FLUSH_THRESHOLD" ]; then
+        state_flush
+    fi
+}
+
+# Write pending state/log lines to disk in one append per file
+state_flush() {
+    [ "$STATE_BUFFER_LINES" -eq 0 ] && return 0
+
+    if [ -n "$STATE_FILE_FD" ]; then
+        printf '%s' "$STATE_FILE_BUFFER" >&"$STATE_FILE_FD"
+    else
+        printf '%s' "$STATE_FILE_BUFFER" >> "$INSTALL_STATE_FILE"
+    fi
+    if [ -n "$STATE_LOG_FD" ]; then
+        printf '%s' "$STATE_LOG_BUFFER" >&"$STATE_LOG_FD"
+    else
+        printf '%s' "$STATE_LOG_BUFFER" >> "$LOG_FILE"
+    fi
+    STATE_FILE_BUFFER=""
+    STATE_LOG_BUFFER=""
+    STATE_BUFFER_LINES=0
 }
 
 # Check if a component was already installed
@@ -287,9 +380,211 @@ show_resume_menu() {
     :
 }
 
+# Configuration steps whose entry point returned non-zero
+FAILED_STEPS=()
+
+# Successful configuration steps (no error reported, see run_config_step) are
+# stamped with the settings and hardware they ran with.
+# A re-run with the same settings skips them, unless the installer scripts or
+# shipped configs changed since (or --force is given).
+STEP_STAMP_DIR="/var/cache/linuxinstaller/steps"
+
+# Check whether the stamp for a step matches the given fingerprint and is
+# newer than every installer script and config file
+step_is_current() {
+    local stamp="$STEP_STAMP_DIR/$1"
+    local fingerprint="$2"
+    local recorded="" input
+
+    [ "${FORCE_STEPS:-false}" = false ] && [ -f "$stamp" ] || return 1
+    IFS= read -r recorded < "$stamp" 2>/dev/null
+    [ "$recorded" = "$fingerprint" ] || return 1
+
+    for input in "${SCRIPT_PATH:-}" "$SCRIPTS_DIR"/*.sh "${CONFIGS_DIR:-}"/*/*; do
+        [ -e "$input" ] && [ "$input" -nt "$stamp" ] && return 1
+    done
+    return 0
+}
+
+# Settings and hardware a configuration step depends on: distro, mode,
+# desktop, gaming and custom groups, the target user, and the CPU vendor,
+# GPU vendors, VM, laptop, bootloader, btrfs and SSD probes. Computed once
+# and cached in STEP_FINGERPRINT.
+STEP_FINGERPRINT=""
+step_fingerprint() {
+    [ -n "$STEP_FINGERPRINT" ] && return 0
+
+    detect_target_user
+    detect_cpu_vendor
+    detect_bootloader
+
+    local vm=false laptop=false btrfs=false ssd=false
+    detect_virtual_machine && vm=true
+    is_btrfs_system && btrfs=true
+    has_ssd && ssd=true
+    local battery
+    for battery in /sys/class/power_supply/BAT*; do
+        [ -e "$battery" ] && laptop=true && break
+    done
+
+    # PCI display controllers (class 0x03xxxx)
+    local gpu_vendors="" dev class vendor
+    for dev in /sys/bus/pci/devices/*; do
+        [ -r "$dev/class" ] && [ -r "$dev/vendor" ] || continue
+        read -r class < "$dev/class"
+        [[ "$class" == 0x03* ]] || continue
+        read -r vendor < "$dev/vendor"
+        gpu_vendors+="${vendor#0x},"
+    done
+
+    STEP_FINGERPRINT="${DISTRO_ID:-} ${INSTALL_MODE:-} ${XDG_CURRENT_DESKTOP:-} ${INSTALL_GAMING:-false} ${CUSTOM_GROUPS:-}"
+    STEP_FINGERPRINT+=" user=$TARGET_USER cpu=${DETECTED_CPU_VENDOR:-unknown} gpu=${gpu_vendors%,}"
+    STEP_FINGERPRINT+=" vm=$vm laptop=$laptop boot=$DETECTED_BOOTLOADER btrfs=$btrfs ssd=$ssd"
+}
+
+# Run one configuration step and record its result in the state file; a
+# failing step is reported and the remaining independent steps still run.
+# A step fails when it returns non-zero or reports an error on the way
+# (the module entry points log most failures and carry on).
+# Usage: run_config_step <name> <command> [args...]
+run_config_step() {
+    local name="$1"
+    shift
+
+    step_fingerprint
+    local fingerprint="$STEP_FINGERPRINT"
+    if step_is_current "$name" "$fingerprint"; then
+        log_info "Step '$name' already applied with the same settings, skipping (use --force to re-run)"
+        state_update "step_$name" "skipped"
+        return 0
+    fi
+
+    local step_status=0
+    local errors_before=$ERRORS_REPORTED
+    "$@" || step_status=$?
+
+    local step_errors=$((ERRORS_REPORTED - errors_before))
+    if [ $step_status -eq 0 ] && [ $step_errors -gt 0 ]; then
+        step_status=1
+    fi
+
+    if [ $step_status -eq 0 ]; then
+        state_update "step_$name" "ok"
+        { mkdir -p "$STEP_STAMP_DIR" && printf '%s\n' "$fingerprint" > "$STEP_STAMP_DIR/$name"; } 2>/dev/null || true
+    else
+        state_update "step_$name" "failed ($step_status)"
+        FAILED_STEPS+=("$name")
+        log_warn "Step '$name' failed ($step_errors error(s) reported, exit code $step_status), continuing with the next step"
+    fi
+    return $step_status
+}
+
+# Summarize failed configuration steps at the end of the run
+show_failed_steps() {
+    [ ${#FAILED_STEPS[@]} -eq 0 ] && return 0
+    display_warning "Some configuration steps reported errors: ${FAILED_STEPS[*]}" \
+        "Check $LOG_FILE for details; re-running the installer retries them"
+}
+
 
 # --- Package Management Wrappers (ENFORCES NON-INTERACTIVE) ---
 
+# Installed package names, loaded lazily with one package manager query.
+# Invalidated after installs/removals and at each progress step, since
+# modules also call the package manager directly.
+declare -A INSTALLED_PKG_CACHE=()
+INSTALLED_PKG_CACHE_LOADED=false
+
+# Load the installed package set for the current distribution
+load_installed_package_cache() {
+    local names=() name
+
+    case "${DISTRO_ID:-}" in
+        arch)
+            mapfile -t names < <(pacman -Qq 2>/dev/null)
+            ;;
+        fedora)
+            mapfile -t names < <(rpm -qa --qf '%{NAME}\n' 2>/dev/null)
+            ;;
+        debian|ubuntu)
+            mapfile -t names < <(dpkg-query -W -f='${db:Status-Abbrev} ${Package}\n' 2>/dev/null | awk '$1 == "ii" {print $2}')
+            ;;
+        *)
+            return 1
+            ;;
+    esac
+
+    INSTALLED_PKG_CACHE=()
+    for name in "${names[@]}"; do
+        [ -n "$name" ] && INSTALLED_PKG_CACHE["$name"]=1
+    done
+    INSTALLED_PKG_CACHE_LOADED=true
+}
+
+# Repository package names, loaded lazily with one query per distribution
+# instead of one pacman -Si / dnf info / apt-cache show per package
+declare -A AVAILABLE_PKG_CACHE=()
+AVAILABLE_PKG_CACHE_LOADED=false
+
+# Load the set of package names available from the configured repositories
+load_available_package_cache() {
+    local names=() name
+
+    case "${DISTRO_ID:-}" in
+        arch)
+            mapfile -t names < <(pacman -Slq 2>/dev/null)
+            ;;
+        fedora)
+            mapfile -t names < <(dnf repoquery -q --qf '%{name}\n' 2>/dev/null)
+            ;;
+        debian|ubuntu)
+            mapfile -t names < <(apt-cache pkgnames 2>/dev/null)
+            ;;
+        *)
+            return 1
+            ;;
+    esac
+
+    [ ${#names[@]} -gt 0 ] || return 1
+
+    AVAILABLE_PKG_CACHE=()
+    for name in "${names[@]}"; do
+        [ -n "$name" ] && AVAILABLE_PKG_CACHE["$name"]=1
+    done
+    AVAILABLE_PKG_CACHE_LOADED=true
+}
+
+# Drop the installed package cache so the next lookup reloads it
+# Installs can add repositories too (release packages, COPR, docker), so the
+# available package set is reloaded as well
+invalidate_package_cache() {
+    INSTALLED_PKG_CACHE_LOADED=false
+    AVAILABLE_PKG_CACHE_LOADED=false
+}
+
+# Drop every cached lookup a package transaction can change: the package sets,
+# plus the gum lookup (gum may have been installed), the boot loader entries
+# (kernel installs add them) and the command lookups (removals drop commands)
+reset_lookup_caches() {
+    invalidate_package_cache
+    GUM_LOOKUP_DONE=false
+    LOADER_ENTRIES_LOADED=false
+    COMMAND_LOOKUP_CACHE=()
+}
+
+# Commands already found in PATH, so repeated checks skip the PATH walk.
+# Only hits are cached: a missing command may still be installed later.
+declare -A COMMAND_LOOKUP_CACHE=()
+
+# Check if a command is available
+command_exists() {
+    local name="$1"
+    [ -n "$name" ] || return 1
+    [ -n "${COMMAND_LOOKUP_CACHE[$name]:-}" ] && return 0
+    command -v "$name" >/dev/null 2>&1 || return 1
+    COMMAND_LOOKUP_CACHE["$name"]=1
+}
+
 # Check if a package is already installed (secure implementation)
 is_package_installed() {
     local pkg="$1"
@@ -301,6 +596,11 @@ is_package_installed() {
         return 1
     fi
 
+    if [ "$INSTALLED_PKG_CACHE_LOADED" = true ] || load_installed_package_cache; then
+        [ -n "${INSTALLED_PKG_CACHE[$pkg]:-}" ]
+        return
+    fi
+
     case "$distro" in
         arch)
             pacman -Q "$pkg" >/dev/null 2>&1
@@ -317,6 +617,33 @@ is_package_installed() {
     esac
 }
 
+# Fill the array named by $1 with the packages (remaining args) that still
+# need installing. On Arch a single pacman -T call answers for all of them and
+# also accepts packages satisfied through a provider (e.g. wine via
+# wine-staging); elsewhere, or if pacman -T fails, the installed package
+# cache is consulted per package.
+collect_missing_packages() {
+    local -n missing_ref="$1"
+    shift
+    missing_ref=()
+    [ $# -gt 0 ] || return 0
+
+    if [ "${DISTRO_ID:-}" = "arch" ]; then
+        # Exit status 127 means some dependencies are unsatisfied (listed on stdout)
+        local unsatisfied="" deptest_status=0
+        unsatisfied=$(pacman -T "$@" 2>/dev/null) || deptest_status=$?
+        if [ $deptest_status -eq 0 ] || [ $deptest_status -eq 127 ]; then
+            [ -n "$unsatisfied" ] && mapfile -t missing_ref <<< "$unsatisfied"
+            return 0
+        fi
+    fi
+
+    local pkg
+    for pkg in "$@"; do
+        is_package_installed "$pkg" || missing_ref+=("$pkg")
+    done
+}
+
 # Check if a package exists in repository (secure implementation)
 package_exists() {
     local pkg="$1"
@@ -328,6 +655,11 @@ package_exists() {
         return 1
     fi
 
+    if [ "$AVAILABLE_PKG_CACHE_LOADED" = true ] || load_available_package_cache; then
+        [ -n "${AVAILABLE_PKG_CACHE[$pkg]:-}" ]
+        return
+    fi
+
     case "$distro" in
         arch)
             pacman -Si "$pkg" >/dev/null 2>&1
@@ -351,14 +683,15 @@ install_pkg() {
         return 1
     fi
 
-    # Check if packages are already installed
-    local packages_to_install=()
+    # Check if packages are already installed, dropping repeated names
+    local packages_to_install=() unique_packages=()
+    local -A requested=()
     for pkg in "$@"; do
-        if is_package_installed "$pkg"; then
-            continue
-        fi
-        packages_to_install+=("$pkg")
+        [ -n "${requested[$pkg]:-}" ] && continue
+        requested["$pkg"]=1
+        unique_packages+=("$pkg")
     done
+    collect_missing_packages packages_to_install "${unique_packages[@]}"
 
     if [ ${#packages_to_install[@]} -eq 0 ]; then
         return 0
@@ -386,7 +719,7 @@ install_pkg() {
         local native_packages=()
 
         for pkg in "${valid_packages[@]}"; do
-            if ! pacman -Si "$pkg" >/dev/null 2>&1; then
+            if ! package_exists "$pkg"; then
                 # Package not in official repos, try AUR
                 aur_packages+=("$pkg")
             else
@@ -416,8 +749,9 @@ install_pkg() {
 
                 log_info "Building AUR package: $aur_pkg"
                 # Build package as root (necessary for --syncdeps to work without password prompts)
-                local build_output
-                if build_output=$(cd "$pkg_dir" && git clone https://aur.archlinux.org/"$aur_pkg".git . && makepkg --noconfirm --syncdeps --needed 2>&1); then
+                # Stream build output to a log file instead of buffering it in a variable
+                local build_log="${pkg_dir}.log"
+                if (cd "$pkg_dir" && git clone --depth 1 --single-branch https://aur.archlinux.org/"$aur_pkg".git . && makepkg --noconfirm --syncdeps --needed) >"$build_log" 2>&1; then
                     log_info "Build successful for $aur_pkg"
                     # Install built package as root
                     if pacman -U "$pkg_dir"/*.pkg.tar.zst --noconfirm >/dev/null 2>&1; then
@@ -429,12 +763,15 @@ install_pkg() {
                     fi
                 else
                     log_error "Failed to build AUR package: $aur_pkg"
+                    # Only read back the tail of the build log; makepkg can emit megabytes
+                    local build_output
+                    build_output=$(tail -c "$LOG_MAX_LINE_LENGTH" "$build_log" 2>/dev/null)
                     log_error "Build output: $build_output"
                     install_status=1
                 fi
 
-                # Clean up build directory
-                rm -rf "$pkg_dir"
+                # Clean up build directory and log
+                rm -rf "$pkg_dir" "$build_log"
             done
         fi
     else
@@ -442,19 +779,38 @@ install_pkg() {
         install_status=$?
     fi
 
+    # Dependencies may have been pulled in as well; reload on next lookup
+    reset_lookup_caches
+
     if [ $install_status -ne 0 ]; then
         log_error "Failed to install package(s): ${valid_packages[*]}."
         return 1
     else
         log_success "Successfully installed: ${valid_packages[*]}"
-        # Track installed packages in state
+        # Track installed packages in state. Only the per-package line is
+        # written; the full list stays in memory and is saved by state_finalize,
+        # so each install doesn't rewrite the whole (growing) list to disk.
+        # The pkg_<name> keys double as the set of tracked packages, so a
+        # package reinstalled later in the run isn't listed twice.
         for pkg in "${valid_packages[@]}"; do
+            [ "${INSTALL_STATE["pkg_$pkg"]:-}" = "installed" ] && continue
             state_update "pkg_$pkg" "installed"
-            state_update "packages_installed" "${INSTALL_STATE["packages_installed"]}$pkg "
+            INSTALL_STATE["packages_installed"]+="$pkg "
         done
     fi
 }
 
+# Run install_pkg with its output hidden and without counting the errors it
+# logs: callers use it for probing batches and retries, and report the
+# packages that finally failed themselves
+install_pkg_quiet() {
+    local errors_before=$ERRORS_REPORTED
+    local install_status=0
+    install_pkg "$@" >/dev/null 2>&1 || install_status=$?
+    ERRORS_REPORTED=$errors_before
+    return $install_status
+}
+
 # Remove one or more packages silently with improved error handling
 remove_pkg() {
     if [ $# -eq 0 ]; then
@@ -489,6 +845,7 @@ remove_pkg() {
         $PKG_REMOVE $PKG_NOCONFIRM "${valid_packages[@]}"
         remove_status=$?
     fi
+    reset_lookup_caches
 
     if [ $remove_status -ne 0 ]; then
         log_error "Failed to remove package(s): ${valid_packages[*]}."
@@ -501,13 +858,48 @@ remove_pkg() {
 }
 
 # Update system packages silently
+# Refresh the package metadata in the background while the user is still in
+# the mode menu; update_system collects it instead of waiting on its own
+# refresh. Arch is left out: a bare pacman -Sy followed by quitting the menu
+# would leave the system synced but not upgraded.
+DB_REFRESH_PID=""
+start_db_refresh() {
+    [ "$DRY_RUN" = false ] && [ -z "$DB_REFRESH_PID" ] || return 0
+    case "$DISTRO_ID" in
+        fedora)
+            dnf makecache -q >/dev/null 2>&1 &
+            ;;
+        debian|ubuntu)
+            DEBIAN_FRONTEND=noninteractive apt-get update -qq >/dev/null 2>&1 &
+            ;;
+        *)
+            return 0
+            ;;
+    esac
+    DB_REFRESH_PID=$!
+}
+
+# Wait for the background refresh; fails if none ran or it didn't succeed
+finish_db_refresh() {
+    [ -n "$DB_REFRESH_PID" ] || return 1
+    local refresh_status=0
+    wait "$DB_REFRESH_PID" || refresh_status=$?
+    DB_REFRESH_PID=""
+    return $refresh_status
+}
+
 update_system() {
     log_info "Updating system packages..."
     local update_status=0
+    local refreshed=false
+    finish_db_refresh && refreshed=true
 
     if [ "$DISTRO_ID" = "debian" ] || [ "$DISTRO_ID" = "ubuntu" ]; then
-        # Run apt-get update and apt-get upgrade separately
-        DEBIAN_FRONTEND=noninteractive apt-get update -qq || update_status=$?
+        # Run apt-get update and apt-get upgrade separately; the update is
+        # skipped when the background refresh already succeeded
+        if [ "$refreshed" = false ]; then
+            DEBIAN_FRONTEND=noninteractive apt-get update -qq || update_status=$?
+        fi
         if [ $update_status -eq 0 ]; then
             DEBIAN_FRONTEND=noninteractive apt-get upgrade -yq || update_status=$?
         fi
@@ -520,10 +912,59 @@ update_system() {
         log_error "System update failed."
     else
         log_success "System updated successfully."
+        # Lets the distro preparation steps skip a second full upgrade
+        state_update "system_updated" "done"
     fi
 }
 
 
+# Enable and start systemd services that exist on this system
+# Unit files and active units are listed once; services that are already
+# enabled and running are skipped, and the rest are enabled in a single
+# systemctl call. Services are retried individually only if the batch fails.
+enable_services() {
+    local -A unit_files=() active_units=()
+    local unit state _ service
+    while read -r unit state _; do
+        unit_files["$unit"]="$state"
+        unit_files["${unit%.service}"]="$state"
+    done < <(systemctl list-unit-files --no-legend --no-pager 2>/dev/null)
+    while read -r unit _; do
+        active_units["$unit"]=1
+        active_units["${unit%.service}"]=1
+    done < <(systemctl list-units --state=active --no-legend --no-pager --plain 2>/dev/null)
+
+    local available=()
+    for service in "$@"; do
+        [ -n "${unit_files[$service]:-}" ] || continue
+        if [[ "${unit_files[$service]}" == enabled* ]] && [ -n "${active_units[$service]:-}" ]; then
+            log_info "$service already enabled and running"
+            continue
+        fi
+        available+=("$service")
+    done
+
+    [ ${#available[@]} -eq 0 ] && return 0
+
+    if systemctl enable --now "${available[@]}" >/dev/null 2>&1; then
+        for service in "${available[@]}"; do
+            log_success "Enabled and started $service"
+        done
+        return 0
+    fi
+
+    local status=0
+    for service in "${available[@]}"; do
+        if systemctl enable --now "$service" >/dev/null 2>&1; then
+            log_success "Enabled and started $service"
+        else
+            log_warn "Failed to enable $service"
+            status=1
+        fi
+    done
+    return $status
+}
+
 # --- System & Hardware Checks ---
 
 # Check if system is running in UEFI mode
@@ -531,60 +972,369 @@ is_uefi() {
     [ -d /sys/firmware/efi/efivars ]
 }
 
+# Read the first processor entry of /proc/cpuinfo once. Vendor, model and
+# flags are the same for every core, so the remaining entries are never read;
+# the entry is kept in CPUINFO_TEXT and the common fields are cached in
+# DETECTED_CPU_VENDOR (GenuineIntel, AuthenticAMD, ...), DETECTED_CPU_MODEL
+# and DETECTED_CPU_FLAGS for the hardware and bootloader steps.
+CPUINFO_LOADED=false
+CPUINFO_TEXT=""
+DETECTED_CPU_VENDOR=""
+DETECTED_CPU_MODEL=""
+DETECTED_CPU_FLAGS=""
+load_cpuinfo() {
+    [ "$CPUINFO_LOADED" = true ] && return 0
+    CPUINFO_LOADED=true
+    [ -r /proc/cpuinfo ] || return 1
+
+    local line key value
+    while IFS= read -r line; do
+        # A blank line ends the first processor entry
+        if [ -z "$line" ]; then
+            [ -n "$CPUINFO_TEXT" ] && break
+            continue
+        fi
+        CPUINFO_TEXT+="$line"$'\n'
+
+        key="${line%%:*}"
+        value="${line#*:}"
+        trim_var key
+        trim_var value
+        case "$key" in
+            vendor_id) DETECTED_CPU_VENDOR="$value" ;;
+            "model name") DETECTED_CPU_MODEL="$value" ;;
+            flags) DETECTED_CPU_FLAGS="$value" ;;
+        esac
+    done < /proc/cpuinfo
+}
+
+# Set DETECTED_CPU_VENDOR from the cached /proc/cpuinfo entry
+detect_cpu_vendor() {
+    load_cpuinfo
+    [ -n "$DETECTED_CPU_VENDOR" ]
+}
+
+# Detect if running in a virtual machine
+# The cpuinfo entry comes from the shared cache and the DMI strings are read
+# with builtins, so no grep is forked for these checks.
+detect_virtual_machine() {
+    local dmi_value=""
+
+    load_cpuinfo
+    [[ "${CPUINFO_TEXT,,}" =~ hypervisor|vmware|virtualbox|kvm|qemu|xen ]] && return 0
+
+    if [ -r /sys/class/dmi/id/product_name ]; then
+        read -r dmi_value < /sys/class/dmi/id/product_name
+        [[ "${dmi_value,,}" =~ virtual|vmware|virtualbox|kvm|qemu|xen ]] && return 0
+    fi
+    if [ -r /sys/class/dmi/id/sys_vendor ]; then
+        read -r dmi_value < /sys/class/dmi/id/sys_vendor
+        [[ "${dmi_value,,}" =~ vmware|virtualbox|kvm|qemu|xen|innotek ]] && return 0
+    fi
+    if command_exists systemd-detect-virt; then
+        systemd-detect-virt --quiet && return 0
+    fi
+    return 1
+}
+
+# Probe connectivity with a plain TCP connect to port 53 on two independent
+# resolvers in parallel; the first completed handshake wins. This costs one
+# round-trip, needs no DNS lookup and still works where ICMP is filtered.
+tcp_connect() {
+    timeout "$3" bash -c 'exec 3<>"/dev/tcp/$1/$2"' _ "$1" "$2" 2>/dev/null
+}
+
+probe_internet() {
+    local timeout=2
+
+    # The subshell keeps its own job table, so wait -n only sees the probes
+    (
+        tcp_connect 1.1.1.1 53 "$timeout" &
+        tcp_connect 8.8.8.8 53 "$timeout" &
+        if wait -n; then
+            kill $(jobs -p) 2>/dev/null
+            exit 0
+        fi
+        wait -n
+    )
+}
+
+# Start probe_internet in the background so the round-trip overlaps with the
+# rest of startup (distro/DE/VM detection, module loading); check_internet
+# collects the result
+INTERNET_CHECK_PID=""
+start_internet_check() {
+    [ -z "$INTERNET_AVAILABLE" ] && [ -z "$INTERNET_CHECK_PID" ] || return 0
+    probe_internet &
+    INTERNET_CHECK_PID=$!
+}
+
 # Check for active internet connection with improved error handling
+# The result is cached in INTERNET_AVAILABLE for the later bootstrap check and
+# exported, so helper scripts run as child processes (arch_aur_setup.sh)
+# reuse it instead of probing again.
+INTERNET_AVAILABLE="${INTERNET_AVAILABLE:-}"
 check_internet() {
-    local test_host="8.8.8.8"  # Use Google DNS instead of hostname
-    local timeout=10
+    if [ -z "$INTERNET_AVAILABLE" ]; then
+        local probe_status=0
+        if [ -n "$INTERNET_CHECK_PID" ]; then
+            wait "$INTERNET_CHECK_PID" || probe_status=$?
+            INTERNET_CHECK_PID=""
+        else
+            probe_internet || probe_status=$?
+        fi
 
-    if ! ping -c 1 -W "$timeout" "$test_host" &>/dev/null; then
-        return 1
+        if [ $probe_status -eq 0 ]; then
+            INTERNET_AVAILABLE=true
+        else
+            INTERNET_AVAILABLE=false
+        fi
+        export INTERNET_AVAILABLE
     fi
 
-    return 0
+    [ "$INTERNET_AVAILABLE" = true ]
+}
+
+# Resolve the user the installer configures (the one who invoked sudo) and
+# their home directory once; callers read TARGET_USER and TARGET_HOME.
+# TARGET_HOME stays empty when the passwd entry can't be read.
+TARGET_USER=""
+TARGET_HOME=""
+detect_target_user() {
+    [ -n "$TARGET_USER" ] && return 0
+    TARGET_USER="${SUDO_USER:-$USER}"
+    if [ "$TARGET_USER" = "root" ]; then
+        TARGET_HOME="/root"
+    else
+        local _name _pw _uid _gid _gecos
+        IFS=: read -r _name _pw _uid _gid _gecos TARGET_HOME _ < <(getent passwd "$TARGET_USER" 2>/dev/null)
+    fi
+}
+
+# Resolve the unprivileged user that builds AUR packages (never root) once and
+# cache it in BUILD_USER; returns non-zero when no such user exists
+BUILD_USER=""
+detect_build_user() {
+    if [ -z "$BUILD_USER" ]; then
+        if [ "$EUID" -eq 0 ]; then
+            # Fall back to the first real user if SUDO_USER is not set
+            BUILD_USER="${SUDO_USER:-}"
+            [ -n "$BUILD_USER" ] || IFS=: read -r BUILD_USER _ < <(getent passwd 1000)
+        else
+            BUILD_USER="$USER"
+        fi
+    fi
+    [ -n "$BUILD_USER" ]
 }
 
 # Detect the system bootloader (grub or systemd-boot)
+# The result is probed once and cached in DETECTED_BOOTLOADER; callers read the
+# variable instead of capturing output, so no subshell is spawned per lookup.
+DETECTED_BOOTLOADER=""
 detect_bootloader() {
+    [ -n "$DETECTED_BOOTLOADER" ] && return 0
+
     if [ -d /sys/firmware/efi ]; then
         if [ -f /boot/efi/EFI/arch/grubx64.efi ] || [ -f /boot/efi/EFI/BOOT/BOOTX64.EFI ]; then
-            echo "grub"
+            DETECTED_BOOTLOADER="grub"
         elif [ -d /boot/loader ] || [ -d /efi/loader ]; then
-            echo "systemd-boot"
-        else
-            echo "unknown"
-        fi
-    elif [ -t 0 ]; then
-        echo "🔄 System Reboot Required"
-        echo ""
-        echo "$message"
-        echo ""
-        echo "⚠️  Important: Save your work before rebooting"
-        echo ""
-        read -r -p "Reboot now? [Y/n]: " response
-        if [[ ! "$response" =~ ^([nN][oO]|[nN])$ ]]; then
-            echo "Rebooting now..."
-            systemctl reboot
+            DETECTED_BOOTLOADER="systemd-boot"
         else
-            echo "Reboot cancelled. Remember to reboot later to apply changes"
+            DETECTED_BOOTLOADER="unknown"
         fi
     else
-        # Non-interactive environment - just show the message
-        echo "🔄 System Reboot Required"
-        echo ""
-        echo "$message"
-        echo ""
-        echo "⚠️  Important: Save your work before rebooting"
-        echo "Please reboot manually to apply all changes"
+        # Legacy BIOS systems boot through GRUB
+        DETECTED_BOOTLOADER="grub"
     fi
 }
 
+# Write a value to one or more sysfs/procfs files (e.g. every CPU's
+# scaling_governor). The installer runs as root, so a plain redirection does
+# the job without piping through tee; unwritable files are skipped.
+write_sys_value() {
+    local value="$1" file
+    shift
+    for file in "$@"; do
+        { printf '%s\n' "$value" > "$file"; } 2>/dev/null
+    done
+    return 0
+}
+
 # Check if system uses btrfs filesystem
+# The mount table is scanned once; the answer is cached in BTRFS_SYSTEM
+BTRFS_SYSTEM=""
 is_btrfs_system() {
-    if [ -f /proc/mounts ]; then
-        grep -q " btrfs " /proc/mounts
-    else
-        false
+    if [ -z "$BTRFS_SYSTEM" ]; then
+        BTRFS_SYSTEM=false
+        if [ -f /proc/mounts ] && grep -q " btrfs " /proc/mounts; then
+            BTRFS_SYSTEM=true
+        fi
     fi
+    [ "$BTRFS_SYSTEM" = true ]
+}
+
+# Check whether the root filesystem sits on a non-rotational (solid state) disk
+# The backing device comes from /proc/self/mountinfo and its queue/rotational
+# flag from sysfs; anything undeterminable counts as not an SSD.
+# The answer is cached in HAS_SSD
+HAS_SSD=""
+has_ssd() {
+    if [ -z "$HAS_SSD" ]; then
+        HAS_SSD=false
+
+        # mountinfo: id parent major:minor root mountpoint ... - fstype source ...
+        local devno="" source="" _id _parent _devno _root _mnt _rest
+        while read -r _id _parent _devno _root _mnt _rest; do
+            if [ "$_mnt" = "/" ]; then
+                devno="$_devno"
+                read -r _ source _ <<< "${_rest#* - }"
+            fi
+        done < /proc/self/mountinfo
+
+        # btrfs reports an anonymous 0:N device; fall back to the mount source.
+        # /dev/mapper/NAME (LUKS, LVM) is a symlink to the dm-N node sysfs knows.
+        [ -L "$source" ] && source=$(readlink -f "$source")
+        local sys_dev=""
+        if [ -n "$devno" ] && [ "${devno%%:*}" != "0" ] && [ -e "/sys/dev/block/$devno" ]; then
+            sys_dev="/sys/dev/block/$devno"
+        elif [[ "$source" == /dev/* ]] && [ -e "/sys/class/block/${source##*/}" ]; then
+            sys_dev="/sys/class/block/${source##*/}"
+        fi
+
+        # Device-mapper stacks (dm-crypt, LVM) don't reliably report the
+        # disk's rotational flag; follow slaves/ down to the underlying device
+        local slaves depth
+        for ((depth = 0; depth < 8; depth++)); do
+            [ -n "$sys_dev" ] || break
+            slaves=("$sys_dev"/slaves/*)
+            [ -e "${slaves[0]}" ] || break
+            sys_dev="/sys/class/block/${slaves[0]##*/}"
+        done
+
+        # Partitions have no queue/ of their own; use the parent disk's
+        local rotational=""
+        if [ -n "$sys_dev" ]; then
+            if [ -r "$sys_dev/queue/rotational" ]; then
+                read -r rotational < "$sys_dev/queue/rotational"
+            elif [ -r "$sys_dev/../queue/rotational" ]; then
+                read -r rotational < "$sys_dev/../queue/rotational"
+            fi
+        fi
+        [ "$rotational" = "0" ] && HAS_SSD=true
+    fi
+    [ "$HAS_SSD" = true ]
+}
+
+# GPU Vendor IDs
+GPU_AMD="0x1002"
+GPU_INTEL="0x8086"
+GPU_NVIDIA="0x10de"
+
+GPU_DEVICES=()
+GPU_DEVICES_LOADED=false
+
+# Scan sysfs for display controllers (PCI class 0x03xxxx) - same data lspci
+# reads, without forking it. Fills GPU_DEVICES with "slot vendor device";
+# the scan runs once and is shared by the gaming GPU checks and
+# detect_system_info.
+scan_gpu_devices() {
+    [ "$GPU_DEVICES_LOADED" = true ] && return 0
+    GPU_DEVICES_LOADED=true
+    GPU_DEVICES=()
+
+    local dev class vendor device
+    for dev in /sys/bus/pci/devices/*; do
+        [ -r "$dev/class" ] || continue
+        read -r class < "$dev/class" || continue
+        [[ "$class" == 0x03* ]] || continue
+        read -r vendor < "$dev/vendor" || continue
+        device=""
+        [ -r "$dev/device" ] && read -r device < "$dev/device"
+        GPU_DEVICES+=("${dev##*/} $vendor $device")
+    done
+}
+
+# Display controller model names from lspci (pci.ids), keyed by PCI slot,
+# e.g. "GA104 [GeForce RTX 3070]". Only used for user-facing output; vendor
+# detection stays on the sysfs scan. Loaded with one lspci call on first
+# use; stays empty when lspci isn't installed.
+declare -A GPU_MODEL_NAMES=()
+GPU_MODEL_NAMES_LOADED=false
+load_gpu_model_names() {
+    [ "$GPU_MODEL_NAMES_LOADED" = true ] && return 0
+    GPU_MODEL_NAMES_LOADED=true
+    command_exists lspci || return 1
+
+    # lspci -Dmm: slot "class" "vendor" "device" ...
+    local line fields
+    while IFS= read -r line; do
+        IFS='"' read -r -a fields <<< "$line"
+        [[ "${fields[1]:-}" =~ VGA|3D|Display ]] || continue
+        [ -n "${fields[5]:-}" ] && GPU_MODEL_NAMES["${fields[0]%% *}"]="${fields[5]}"
+    done < <(lspci -Dmm 2>/dev/null)
+}
+
+# systemd-boot entry directory and *.conf list, scanned once per run.
+# reset_lookup_caches drops the list because kernel package installs can
+# add entries.
+LOADER_ENTRIES_DIR=""
+LOADER_ENTRIES=()
+LOADER_ENTRIES_LOADED=false
+
+# Locate the loader entries directory and list its entries (cached)
+load_loader_entries() {
+    if [ "$LOADER_ENTRIES_LOADED" != true ]; then
+        LOADER_ENTRIES_DIR=""
+        LOADER_ENTRIES=()
+
+        local dir entry
+        for dir in /boot/loader/entries /efi/loader/entries /boot/efi/loader/entries; do
+            if [ -d "$dir" ]; then
+                LOADER_ENTRIES_DIR="$dir"
+                break
+            fi
+        done
+
+        if [ -n "$LOADER_ENTRIES_DIR" ]; then
+            for entry in "$LOADER_ENTRIES_DIR"/*.conf; do
+                [ -f "$entry" ] && LOADER_ENTRIES+=("$entry")
+            done
+        fi
+        LOADER_ENTRIES_LOADED=true
+    fi
+
+    [ -n "$LOADER_ENTRIES_DIR" ]
+}
+
+# Append kernel parameters to every loader entry that doesn't contain "splash" yet
+# Entries with an options line are edited in one sed call; others get an options line
+# Returns 1 when every entry was already configured
+update_loader_entries() {
+    local params="$1"
+
+    load_loader_entries || return 1
+    [ ${#LOADER_ENTRIES[@]} -gt 0 ] || return 1
+
+    local pending=() with_options=() entry
+    mapfile -t pending < <(grep -L "splash" "${LOADER_ENTRIES[@]}" 2>/dev/null)
+    [ ${#pending[@]} -gt 0 ] || return 1
+
+    mapfile -t with_options < <(grep -l "^options" "${pending[@]}" 2>/dev/null)
+    if [ ${#with_options[@]} -gt 0 ]; then
+        sed -i "/^options/ s/$/ $params/" "${with_options[@]}"
+    fi
+
+    local -A has_options=()
+    for entry in "${with_options[@]}"; do
+        has_options["$entry"]=1
+        log_success "Updated $entry"
+    done
+    for entry in "${pending[@]}"; do
+        if [ -z "${has_options[$entry]:-}" ]; then
+            echo "options $params" >> "$entry"
+            log_success "Updated $entry (added options)"
+        fi
+    done
 }
 
 
@@ -614,7 +1364,7 @@ validate_config() {
             fi
             ;;
         "json")
-            if command -v jq >/dev/null 2>&1; then
+            if command_exists jq; then
                 if ! jq empty "$config_file" 2>/dev/null; then
                     log_error "Configuration file has invalid JSON: $config_file"
                     return 1
@@ -624,7 +1374,7 @@ validate_config() {
             fi
             ;;
         "yaml")
-            if command -v yamllint >/dev/null 2>&1; then
+            if command_exists yamllint; then
                 if ! yamllint "$config_file" >/dev/null 2>&1; then
                     log_error "Configuration file has YAML issues: $config_file"
                     return 1
@@ -659,6 +1409,55 @@ backup_config() {
     return 0
 }
 
+# Check whether a deployed config already matches its source byte-for-byte
+# Lets re-runs skip the copy, chown and chmod when nothing changed
+config_is_current() {
+    local source_file="$1"
+    local dest_file="$2"
+
+    [ -f "$dest_file" ] && cmp -s "$source_file" "$dest_file"
+}
+
+# Uncomment the given locales in locale.gen with a single read and sed pass
+# Usage: enable_locales /etc/locale.gen "el_GR.UTF-8 UTF-8|Greek" "en_US.UTF-8 UTF-8|US English"
+enable_locales() {
+    local locale_file="$1"
+    shift
+
+    # Pad with newlines so every line can be matched as "\n<line>"
+    local locale_gen
+    locale_gen=$'\n'"$(<"$locale_file")"$'\n'
+
+    local sed_args=() entry locale name
+    for entry in "$@"; do
+        locale="${entry%%|*}"
+        name="${entry#*|}"
+        if [[ "$locale_gen" == *$'\n#'"$locale"* ]]; then
+            log_info "Enabling $name locale (${locale%% *})..."
+            sed_args+=(-e "s/^#$locale/$locale/")
+        elif [[ "$locale_gen" == *$'\n'"$locale"* ]]; then
+            log_info "$name locale already enabled"
+        else
+            log_warn "$name locale not found in locale.gen"
+        fi
+    done
+
+    if [ ${#sed_args[@]} -gt 0 ]; then
+        sed -i "${sed_args[@]}" "$locale_file" || return 1
+        log_success "Locales enabled in $locale_file"
+    fi
+}
+
+# Check whether locale-gen has to run: the compiled locale archive is missing
+# or older than locale.gen (enable_locales only rewrites the file when a
+# locale was actually enabled, so an unchanged file keeps its mtime)
+locales_need_generation() {
+    local locale_file="$1"
+    local locale_archive="/usr/lib/locale/locale-archive"
+
+    [ ! -f "$locale_archive" ] || [ "$locale_file" -nt "$locale_archive" ]
+}
+
 # =============================================================================
 # ROLLBACK SYSTEM
 # =============================================================================
@@ -723,7 +1522,7 @@ check_dependencies() {
         if [ "$DISTRO_ID" = "arch" ]; then
             # This is a simplified check - in reality you'd need to parse PKGBUILD
             local aur_deps=""
-            if ! pacman -Si "$pkg" >/dev/null 2>&1; then
+            if ! package_exists "$pkg"; then
                 # Check for common AUR dependency patterns
                 case "$pkg" in
                     *-bin|*-git|*-svn|*-hg)
@@ -736,7 +1535,7 @@ check_dependencies() {
 
                 if [ -n "$aur_deps" ]; then
                     for dep in $aur_deps; do
-                        if ! pacman -Q "$dep" >/dev/null 2>&1 && ! pacman -Si "$dep" >/dev/null 2>&1; then
+                        if ! is_package_installed "$dep" && ! package_exists "$dep"; then
                             missing_deps+=("$dep (dependency of $pkg)")
                         fi
                     done
@@ -780,9 +1579,13 @@ progress_update() {
         echo "✅ $step_name completed ($PROGRESS_CURRENT/$PROGRESS_TOTAL)"
     fi
 
+    # Steps may install packages directly; make the next lookup re-query
+    invalidate_package_cache
+
     # Update state
     state_update "progress" "$PROGRESS_CURRENT/$PROGRESS_TOTAL"
     state_update "last_step" "$step_name"
+    state_flush
 }
 
 # Show final progress summary
@@ -794,11 +1597,10 @@ progress_summary() {
         display_box "🎉 Installation Complete!" "✅ All $PROGRESS_CURRENT steps completed successfully\n⏱️  Total time: ${duration} seconds"
         echo ""
     else
-        echo ""
-        echo "🎉 Installation Complete!"
-        echo "✅ All $PROGRESS_CURRENT steps completed successfully"
-        echo "⏱️  Total time: ${duration} seconds"
-        echo ""
+        printf '\n%s\n%s\n%s\n\n' \
+            "🎉 Installation Complete!" \
+            "✅ All $PROGRESS_CURRENT steps completed successfully" \
+            "⏱️  Total time: ${duration} seconds"
     fi
 }
 
@@ -825,10 +1627,22 @@ performance_report() {
     fi
 }
 
+# Whether the user can be asked questions: not under --yes and with a
+# terminal on stdin. Prompts take their default answer otherwise.
+is_interactive() {
+    [ "${ASSUME_YES:-false}" = false ] && [ -t 0 ]
+}
+
 # Beautiful prompt to reboot the system with enhanced UI
 prompt_reboot() {
     local message="${1:-Reboot your system to apply all changes}"
 
+    # Never reboot unattended; just remind
+    if ! is_interactive; then
+        log_warn "$message"
+        return 0
+    fi
+
     if supports_gum && [ -t 0 ]; then
         echo ""
         local full_message="$message
@@ -843,20 +1657,22 @@ prompt_reboot() {
             display_info "○ Reboot cancelled. Remember to reboot later to apply changes"
         fi
     else
-        echo ""
-        echo "🔄 System Reboot Required"
-        echo ""
-        echo "$message"
-        echo ""
-        echo "⚠️  Important: Save your work before rebooting"
-        echo ""
+        printf '\n%s\n\n%s\n\n%s\n\n' \
+            "🔄 System Reboot Required" \
+            "$message" \
+            "⚠️  Important: Save your work before rebooting"
         read -r -p "Reboot now? [Y/n]: " response
-        if [[ ! "$response" =~ ^([nN][oO]|[nN])$ ]]; then
-            echo "Rebooting now..."
-            systemctl reboot
-        else
-            echo "Reboot cancelled. Remember to reboot later to apply changes"
-        fi
+
+        # Normalize once and dispatch; anything but n/no keeps the Y default
+        case "${response,,}" in
+            n|no)
+                echo "Reboot cancelled. Remember to reboot later to apply changes"
+                ;;
+            *)
+                echo "Rebooting now..."
+                systemctl reboot
+                ;;
+        esac
     fi
 }
 
@@ -4,7 +4,7 @@ set -uo pipefail
 # Debian/Ubuntu Configuration Module for LinuxInstaller
 # Based on debianinstaller best practices
 
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+SCRIPT_DIR="${SCRIPTS_DIR:-$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)}"
 source "$SCRIPT_DIR/common.sh"
 source "$SCRIPT_DIR/distro_check.sh"
 
@@ -72,7 +72,7 @@ debian_enable_nonfree_repos() {
      fi
 
      # Configure terminal font to use Hack Nerd Font
-     if command -v gsettings >/dev/null 2>&1; then
+     if command_exists gsettings; then
          log_info "Configuring GNOME Terminal to use Hack Nerd Font..."
          # Get the default profile UUID
          local default_profile
@@ -250,7 +250,6 @@ distro_get_packages() {
             ;;
     esac
 }
-export -f distro_get_packages
 
 # =============================================================================
 # DEBIAN/UBUNTU CONFIGURATION FUNCTIONS
@@ -266,8 +265,11 @@ debian_system_preparation() {
     # Update package lists
     apt-get update >/dev/null 2>&1 || return 1
 
-    # Upgrade system
-    if supports_gum; then
+    # Upgrade system, unless update_system already upgraded it in this run
+    # (the package lists above are still refreshed for the newly enabled repos)
+    if state_check "system_updated"; then
+        log_info "System already upgraded in this run, skipping second upgrade"
+    elif supports_gum; then
         if spin "Upgrading system"  apt-get upgrade -y >/dev/null 2>&1; then
             display_success "✓ System upgraded"
         fi
@@ -303,7 +305,7 @@ EOF
         add-apt-repository multiverse >/dev/null 2>&1 || true
 
         # Set fastest mirror
-        if command -v netselect-apt >/dev/null 2>&1; then
+        if command_exists netselect-apt; then
             netselect-apt -n ubuntu >/dev/null 2>&1 || true
         fi
     fi
@@ -331,20 +333,31 @@ debian_install_essentials() {
             continue
         fi
 
+        packages+=("$pkg")
+    done
+
+    # Install everything in one apt transaction; retry one package at a time
+    # only if the batch fails so a single bad package doesn't block the rest
+    if [ ${#packages[@]} -gt 0 ]; then
+        local batch_ok=false
         if supports_gum; then
-            if spin "Installing package" apt-get install -y "$pkg" >/dev/null 2>&1; then
-                installed+=("$pkg")
-            else
-                failed+=("$pkg")
-            fi
+            spin "Installing packages" apt-get install -y "${packages[@]}" >/dev/null 2>&1 && batch_ok=true
         else
-            if apt-get install -y "$pkg" >/dev/null 2>&1; then
-                installed+=("$pkg")
-            else
-                failed+=("$pkg")
-            fi
+            apt-get install -y "${packages[@]}" >/dev/null 2>&1 && batch_ok=true
         fi
-    done
+
+        if [ "$batch_ok" = true ]; then
+            installed+=("${packages[@]}")
+        else
+            for pkg in "${packages[@]}"; do
+                if apt-get install -y "$pkg" >/dev/null 2>&1; then
+                    installed+=("$pkg")
+                else
+                    failed+=("$pkg")
+                fi
+            done
+        fi
+    fi
 
     # Show summary
     if [ ${#installed[@]} -gt 0 ]; then
@@ -394,7 +407,8 @@ debian_configure_bootloader() {
     display_step "🔄" "Configuring Debian/Ubuntu Bootloader"
 
     local bootloader
-    bootloader=$(detect_bootloader)
+    detect_bootloader
+    bootloader="$DETECTED_BOOTLOADER"
 
     case "$bootloader" in
         "grub")
@@ -419,20 +433,32 @@ configure_grub_debian() {
         return 1
     fi
 
-    # Set timeout
-    sed -i 's/^GRUB_TIMEOUT=.*/GRUB_TIMEOUT=3/' /etc/default/grub
+    local changed=false
+
+    # Set timeout, skipping the rewrite when it is already in place
+    local grub_defaults
+    grub_defaults=$(</etc/default/grub)
+    # Both edits are queued and applied with a single sed pass below
+    local sed_args=()
+    if ! [[ "$grub_defaults" =~ (^|$'\n')GRUB_TIMEOUT=3($'\n'|$) ]]; then
+        sed_args+=(-e 's/^GRUB_TIMEOUT=.*/GRUB_TIMEOUT=3/')
+        changed=true
+    fi
 
     # Add Debian/Ubuntu-specific kernel parameters
     local debian_params="quiet splash"
-    local current_line=$(grep "^GRUB_CMDLINE_LINUX_DEFAULT=" /etc/default/grub)
-    local current_params=""
-
-    if [ -n "$current_line" ]; then
-        current_params=$(echo "$current_line" | cut -d'=' -f2- | sed "s/^['\"]//;s/['\"]$//")
-    fi
+    local current_params="" line
+    # Take the current value from the copy already read, without grep/cut/sed
+    while IFS= read -r line; do
+        if [[ "$line" == GRUB_CMDLINE_LINUX_DEFAULT=* ]]; then
+            current_params="${line#*=}"
+            current_params="${current_params#[\"\']}"
+            current_params="${current_params%[\"\']}"
+            break
+        fi
+    done <<< "$grub_defaults"
 
     local new_params="$current_params"
-    local changed=false
 
     for param in $debian_params; do
         if [[ ! "$new_params" == *"$param"* ]]; then
@@ -442,15 +468,20 @@ configure_grub_debian() {
     done
 
     if [ "$changed" = true ]; then
-        sed -i "s|^GRUB_CMDLINE_LINUX_DEFAULT=.*|GRUB_CMDLINE_LINUX_DEFAULT=\"$new_params\"|" /etc/default/grub
+        sed_args+=(-e "s|^GRUB_CMDLINE_LINUX_DEFAULT=.*|GRUB_CMDLINE_LINUX_DEFAULT=\"$new_params\"|")
+        sed -i "${sed_args[@]}" /etc/default/grub
         log_success "Updated GRUB kernel parameters"
     fi
 
-    # Regenerate GRUB config
-    log_info "Regenerating GRUB configuration..."
-    if ! update-grub >/dev/null 2>&1; then
-        log_error "Failed to regenerate GRUB config"
-        return 1
+    # Regenerate GRUB config only when the defaults changed or grub.cfg is stale
+    if [ "$changed" = true ] || [ ! -f /boot/grub/grub.cfg ] || [ /etc/default/grub -nt /boot/grub/grub.cfg ]; then
+        log_info "Regenerating GRUB configuration..."
+        if ! update-grub >/dev/null 2>&1; then
+            log_error "Failed to regenerate GRUB config"
+            return 1
+        fi
+    else
+        log_info "GRUB configuration already up to date"
     fi
 
     log_success "GRUB configured successfully"
@@ -460,41 +491,13 @@ configure_grub_debian() {
 configure_systemd_boot_debian() {
     log_info "Configuring systemd-boot for Debian/Ubuntu..."
 
-    local entries_dir=""
-    if [ -d "/boot/loader/entries" ]; then
-        entries_dir="/boot/loader/entries"
-    elif [ -d "/efi/loader/entries" ]; then
-        entries_dir="/efi/loader/entries"
-    elif [ -d "/boot/efi/loader/entries" ]; then
-        entries_dir="/boot/efi/loader/entries"
-    fi
-
-    if [ -z "$entries_dir" ]; then
+    if ! load_loader_entries; then
         log_error "Could not find systemd-boot entries directory"
         return 1
     fi
 
     local debian_params="quiet splash"
-    local updated=false
-
-    for entry in "$entries_dir"/*.conf; do
-        [ -e "$entry" ] || continue
-        if [ -f "$entry" ]; then
-            if ! grep -q "splash" "$entry"; then
-                if grep -q "^options" "$entry"; then
-                    sed -i "/^options/ s/$/ $debian_params/" "$entry"
-                    log_success "Updated $entry"
-                    updated=true
-                else
-                    echo "options $debian_params" | tee -a "$entry" >/dev/null
-                    log_success "Updated $entry (added options)"
-                    updated=true
-                fi
-            fi
-        fi
-    done
-
-    if [ "$updated" = true ]; then
+    if update_loader_entries "$debian_params"; then
         log_success "systemd-boot entries updated"
     else
         log_info "systemd-boot entries already configured"
@@ -513,15 +516,7 @@ debian_enable_system_services() {
         ssh
     )
 
-    for service in "${services[@]}"; do
-        if systemctl list-unit-files | grep -q "^$service"; then
-            if systemctl enable --now "$service" >/dev/null 2>&1; then
-                log_success "Enabled and started $service"
-            else
-                log_warn "Failed to enable $service"
-            fi
-        fi
-    done
+    enable_services "${services[@]}"
 
     # Configure firewall (UFW for Debian/Ubuntu)
     install_packages_with_progress "ufw"
@@ -538,7 +533,7 @@ debian_enable_system_services() {
 debian_setup_flatpak() {
     display_step "📦" "Setting up Flatpak for Debian/Ubuntu"
 
-    if ! command -v flatpak >/dev/null; then
+    if ! command_exists flatpak; then
         log_info "Installing Flatpak..."
         install_packages_with_progress "flatpak"
     fi
@@ -556,13 +551,12 @@ debian_setup_snap() {
         return 0
     fi
 
-    if ! command -v snap >/dev/null; then
+    if ! command_exists snap; then
         log_info "Installing Snap..."
         install_packages_with_progress "snapd"
 
-        # Enable snapd service
-        systemctl enable --now snapd >/dev/null 2>&1
-        systemctl enable --now snapd.socket >/dev/null 2>&1
+        # Enable snapd service and socket
+        systemctl enable --now snapd snapd.socket >/dev/null 2>&1
 
         log_success "Snap configured"
     else
@@ -606,10 +600,13 @@ debian_setup_shell() {
     display_step "🐚" "Setting up ZSH shell environment"
 
     # Set ZSH as default
-    local target_user="${SUDO_USER:-$USER}"
-    if [ "$SHELL" != "$(command -v zsh)" ]; then
+    detect_target_user
+    local target_user="$TARGET_USER"
+    local zsh_path
+    zsh_path=$(command -v zsh 2>/dev/null)
+    if [ "$SHELL" != "$zsh_path" ]; then
         log_info "Changing default shell to ZSH for $target_user..."
-        if chsh -s "$(command -v zsh)" "$target_user" 2>/dev/null; then
+        if chsh -s "$zsh_path" "$target_user" 2>/dev/null; then
             log_success "Default shell changed to ZSH"
         else
             log_warning "Failed to change shell. You may need to do this manually."
@@ -621,25 +618,34 @@ debian_setup_shell() {
 
     # Copy distro-specific .zshrc
     if [ "$DISTRO_ID" == "ubuntu" ] && [ -f "$UBUNTU_CONFIGS_DIR/.zshrc" ]; then
-        cp "$UBUNTU_CONFIGS_DIR/.zshrc" "$HOME/.zshrc" && log_success "Updated config: .zshrc (Ubuntu)"
+        if ! config_is_current "$UBUNTU_CONFIGS_DIR/.zshrc" "$HOME/.zshrc"; then
+            cp "$UBUNTU_CONFIGS_DIR/.zshrc" "$HOME/.zshrc" && log_success "Updated config: .zshrc (Ubuntu)"
+        fi
     elif [ -f "$DEBIAN_CONFIGS_DIR/.zshrc" ]; then
-        cp "$DEBIAN_CONFIGS_DIR/.zshrc" "$HOME/.zshrc" && log_success "Updated config: .zshrc"
+        if ! config_is_current "$DEBIAN_CONFIGS_DIR/.zshrc" "$HOME/.zshrc"; then
+            cp "$DEBIAN_CONFIGS_DIR/.zshrc" "$HOME/.zshrc" && log_success "Updated config: .zshrc"
+        fi
     fi
 
     # Copy Ubuntu-specific .zshrc if exists
-    if [ -f "$DEBIAN_CONFIGS_DIR/.zshrc.ubuntu" ] && [ "$DISTRO_ID" == "ubuntu" ]; then
+    if [ -f "$DEBIAN_CONFIGS_DIR/.zshrc.ubuntu" ] && [ "$DISTRO_ID" == "ubuntu" ] && \
+        ! config_is_current "$DEBIAN_CONFIGS_DIR/.zshrc.ubuntu" "$HOME/.zshrc"; then
         cp "$DEBIAN_CONFIGS_DIR/.zshrc.ubuntu" "$HOME/.zshrc" && log_success "Updated config: .zshrc (Ubuntu)"
     fi
 
     # Copy starship config
     if [ "$DISTRO_ID" == "ubuntu" ] && [ -f "$UBUNTU_CONFIGS_DIR/starship.toml" ]; then
-        cp "$UBUNTU_CONFIGS_DIR/starship.toml" "$HOME/.config/starship.toml" && log_success "Updated config: starship.toml (Ubuntu)"
+        if ! config_is_current "$UBUNTU_CONFIGS_DIR/starship.toml" "$HOME/.config/starship.toml"; then
+            cp "$UBUNTU_CONFIGS_DIR/starship.toml" "$HOME/.config/starship.toml" && log_success "Updated config: starship.toml (Ubuntu)"
+        fi
     elif [ -f "$DEBIAN_CONFIGS_DIR/starship.toml" ]; then
-        cp "$DEBIAN_CONFIGS_DIR/starship.toml" "$HOME/.config/starship.toml" && log_success "Updated config: starship.toml"
+        if ! config_is_current "$DEBIAN_CONFIGS_DIR/starship.toml" "$HOME/.config/starship.toml"; then
+            cp "$DEBIAN_CONFIGS_DIR/starship.toml" "$HOME/.config/starship.toml" && log_success "Updated config: starship.toml"
+        fi
     fi
 
     # Fastfetch setup
-    if command -v fastfetch >/dev/null; then
+    if command_exists fastfetch; then
         mkdir -p "$HOME/.config/fastfetch"
 
         local dest_config="$HOME/.config/fastfetch/config.jsonc"
@@ -697,8 +703,8 @@ debian_setup_solaar() {
     local has_logitech=false
 
     # Check USB devices for Logitech (if lsusb available)
-    if command -v lsusb >/dev/null 2>&1; then
-        if command -v timeout >/dev/null 2>&1; then
+    if command_exists lsusb; then
+        if command_exists timeout; then
             if timeout 3s lsusb 2>/dev/null | grep -i logitech >/dev/null 2>&1; then
                 has_logitech=true
                 log_info "Logitech hardware detected via USB"
@@ -712,9 +718,9 @@ debian_setup_solaar() {
     fi
 
     # Check Bluetooth devices for Logitech (if bluetoothctl available)
-    if command -v bluetoothctl >/dev/null 2>&1; then
+    if command_exists bluetoothctl; then
         # ensure the call cannot hang by using timeout where available and redirecting stdin
-        if command -v timeout >/dev/null 2>&1; then
+        if command_exists timeout; then
             if timeout 3s bluetoothctl devices </dev/null | grep -i logitech >/dev/null 2>&1; then
                 has_logitech=true
                 log_info "Logitech Bluetooth device detected"
@@ -731,7 +737,7 @@ debian_setup_solaar() {
     for hid in /dev/hidraw*; do
         [ -e "$hid" ] || continue
         hid_base=$(basename "$hid")
-        if grep -qi logitech "/sys/class/hidraw/$hid_base/device/uevent" 2>/dev/null; then
+        if LC_ALL=C grep -aqi logitech "/sys/class/hidraw/$hid_base/device/uevent" 2>/dev/null; then
             has_logitech=true
             log_info "Logitech HID device detected: $hid"
             break
@@ -777,30 +783,19 @@ debian_configure_locale() {
     local locale_file="/etc/locale.gen"
 
     if [ -f "$locale_file" ]; then
-        # Uncomment Greek locale
-        if grep -q "^#el_GR.UTF-8 UTF-8" "$locale_file"; then
-            log_info "Enabling Greek locale (el_GR.UTF-8)..."
-            sed -i 's/^#el_GR.UTF-8 UTF-8/el_GR.UTF-8 UTF-8/' "$locale_file"
-            log_success "Greek locale enabled"
-        elif grep -q "^el_GR.UTF-8 UTF-8" "$locale_file"; then
-            log_info "Greek locale already enabled"
-        fi
-
-        # Uncomment US English locale
-        if grep -q "^#en_US.UTF-8 UTF-8" "$locale_file"; then
-            log_info "Enabling US English locale (en_US.UTF-8)..."
-            sed -i 's/^#en_US.UTF-8 UTF-8/en_US.UTF-8 UTF-8/' "$locale_file"
-            log_success "US English locale enabled"
-        elif grep -q "^en_US.UTF-8 UTF-8" "$locale_file"; then
-            log_info "US English locale already enabled"
-        fi
+        # Uncomment Greek and US English locales
+        enable_locales "$locale_file" "el_GR.UTF-8 UTF-8|Greek" "en_US.UTF-8 UTF-8|US English"
 
-        # Generate locales
-        log_info "Generating locales..."
-        if locale-gen >/dev/null 2>&1; then
-            log_success "Locales generated successfully"
+        # Generate locales, unless the archive is already current
+        if ! locales_need_generation "$locale_file"; then
+            log_info "Locales already generated"
         else
-            log_warn "Failed to generate locales"
+            log_info "Generating locales..."
+            if locale-gen >/dev/null 2>&1; then
+                log_success "Locales generated successfully"
+            else
+                log_warn "Failed to generate locales"
+            fi
         fi
     fi
 
@@ -812,7 +807,7 @@ debian_configure_locale() {
 
     # Set LANG to Greek
     log_info "Setting default locale to Greek (el_GR.UTF-8)..."
-    if bash -c "echo 'LANG=el_GR.UTF-8' > '$locale_conf'"; then
+    if echo 'LANG=el_GR.UTF-8' > "$locale_conf"; then
         log_success "Default locale set to el_GR.UTF-8"
     else
         log_warn "Failed to set default locale"
@@ -830,7 +825,10 @@ debian_configure_locale() {
 debian_main_config() {
     log_info "Starting Debian/Ubuntu configuration..."
 
-    debian_system_preparation
+    # The main installer runs preparation (apt update/upgrade) before packages
+    if ! state_check "system_preparation"; then
+        debian_system_preparation
+    fi
 
     if [ "$INSTALL_MODE" != "server" ]; then
         debian_install_essentials
@@ -856,7 +854,8 @@ debian_main_config() {
 
     # Add user to docker group if docker is installed
     if is_package_installed "docker-ce"; then
-        local target_user="${SUDO_USER:-$USER}"
+        detect_target_user
+        local target_user="$TARGET_USER"
         if [ "$target_user" != "root" ]; then
             usermod -aG docker "$target_user" 2>/dev/null && log_info "Added $target_user to docker group"
         fi
@@ -869,18 +868,3 @@ debian_main_config() {
 ubuntu_system_preparation() {
     debian_system_preparation
 }
-
-# Export functions for use by main installer
-export -f debian_main_config
-export -f debian_system_preparation
-export -f debian_enable_nonfree_repos
-export -f debian_install_essentials
-export -f debian_configure_bootloader
-export -f debian_enable_system_services
-export -f debian_setup_flatpak
-export -f debian_setup_snap
-export -f debian_setup_shell
-export -f debian_setup_solaar
-export -f debian_configure_locale
-export -f debian_setup_docker_repo
-export -f ubuntu_system_preparation
@@ -25,88 +25,88 @@ update_distro_theme() {
             "arch")
                 # Arch Linux: Blue theme
                 THEME_PRIMARY="blue"
-                THEME_PRIMARY_ANSI='\033[0;34m'  # Blue
+                THEME_PRIMARY_ANSI=$'\033[0;34m'  # Blue
                 GUM_PRIMARY_FG=39      # Blue
                 GUM_SUCCESS_FG=48      # Bright green-cyan
                 GUM_ERROR_FG=196       # Red
                 GUM_WARNING_FG=226     # Yellow
                 GUM_INFO_FG=39         # Blue
                 GUM_BODY_FG=87         # Light cyan
-                RED='\033[0;31m'
-                GREEN='\033[0;32m'
-                YELLOW='\033[0;33m'
-                BLUE='\033[0;34m'
-                CYAN='\033[0;34m'      # Blue for accents
-                LIGHT_CYAN='\033[1;34m' # Light blue
+                RED=$'\033[0;31m'
+                GREEN=$'\033[0;32m'
+                YELLOW=$'\033[0;33m'
+                BLUE=$'\033[0;34m'
+                CYAN=$'\033[0;34m'      # Blue for accents
+                LIGHT_CYAN=$'\033[1;34m' # Light blue
                 ;;
             "fedora")
                 # Fedora: Blue theme
                 THEME_PRIMARY="blue"
-                THEME_PRIMARY_ANSI='\033[0;34m'  # Blue
+                THEME_PRIMARY_ANSI=$'\033[0;34m'  # Blue
                 GUM_PRIMARY_FG=39      # Blue
                 GUM_SUCCESS_FG=48      # Bright green-cyan
                 GUM_ERROR_FG=196       # Red
                 GUM_WARNING_FG=226     # Yellow
                 GUM_INFO_FG=39         # Blue
                 GUM_BODY_FG=87         # Light cyan
-                RED='\033[0;31m'
-                GREEN='\033[0;32m'
-                YELLOW='\033[0;33m'
-                BLUE='\033[0;34m'
-                CYAN='\033[0;34m'      # Blue for accents
-                LIGHT_CYAN='\033[1;34m' # Light blue
+                RED=$'\033[0;31m'
+                GREEN=$'\033[0;32m'
+                YELLOW=$'\033[0;33m'
+                BLUE=$'\033[0;34m'
+                CYAN=$'\033[0;34m'      # Blue for accents
+                LIGHT_CYAN=$'\033[1;34m' # Light blue
                 ;;
             "debian")
                 # Debian: Red theme
                 THEME_PRIMARY="red"
-                THEME_PRIMARY_ANSI='\033[0;31m'  # Red
+                THEME_PRIMARY_ANSI=$'\033[0;31m'  # Red
                 GUM_PRIMARY_FG=196     # Red
                 GUM_SUCCESS_FG=48      # Bright green-cyan
                 GUM_ERROR_FG=196       # Red
                 GUM_WARNING_FG=226     # Yellow
                 GUM_INFO_FG=196        # Red
                 GUM_BODY_FG=87         # Light cyan
-                RED='\033[0;31m'
-                GREEN='\033[0;32m'
-                YELLOW='\033[0;33m'
-                BLUE='\033[0;34m'
-                CYAN='\033[0;31m'      # Red for accents
-                LIGHT_CYAN='\033[1;31m' # Light red
+                RED=$'\033[0;31m'
+                GREEN=$'\033[0;32m'
+                YELLOW=$'\033[0;33m'
+                BLUE=$'\033[0;34m'
+                CYAN=$'\033[0;31m'      # Red for accents
+                LIGHT_CYAN=$'\033[1;31m' # Light red
                 ;;
             "ubuntu")
                 # Ubuntu: Orange theme
                 THEME_PRIMARY="yellow"  # Closest to orange
-                THEME_PRIMARY_ANSI='\033[0;33m'  # Yellow/Orange
+                THEME_PRIMARY_ANSI=$'\033[0;33m'  # Yellow/Orange
                 GUM_PRIMARY_FG=214     # Orange
                 GUM_SUCCESS_FG=48      # Bright green-cyan
                 GUM_ERROR_FG=196       # Red
                 GUM_WARNING_FG=226     # Yellow
                 GUM_INFO_FG=214        # Orange
                 GUM_BODY_FG=87         # Light cyan
-                RED='\033[0;31m'
-                GREEN='\033[0;32m'
-                YELLOW='\033[0;33m'
-                BLUE='\033[0;34m'
-                ORANGE='\033[0;33m'    # Yellow as orange
-                CYAN='\033[0;33m'      # Orange for accents
-                LIGHT_CYAN='\033[1;33m' # Light orange
+                RED=$'\033[0;31m'
+                GREEN=$'\033[0;32m'
+                YELLOW=$'\033[0;33m'
+                BLUE=$'\033[0;34m'
+                ORANGE=$'\033[0;33m'    # Yellow as orange
+                CYAN=$'\033[0;33m'      # Orange for accents
+                LIGHT_CYAN=$'\033[1;33m' # Light orange
                 ;;
             *)
                 # Default: Cyan theme (original)
                 THEME_PRIMARY="cyan"
-                THEME_PRIMARY_ANSI='\033[0;36m'  # Cyan
+                THEME_PRIMARY_ANSI=$'\033[0;36m'  # Cyan
                 GUM_PRIMARY_FG="cyan"
                 GUM_SUCCESS_FG=48
                 GUM_ERROR_FG=196
                 GUM_WARNING_FG=226
                 GUM_INFO_FG="cyan"
                 GUM_BODY_FG=87
-                RED='\033[0;31m'
-                GREEN='\033[0;32m'
-                YELLOW='\033[0;33m'
-                BLUE='\033[0;34m'
-                CYAN='\033[0;36m'
-                LIGHT_CYAN='\033[1;36m'
+                RED=$'\033[0;31m'
+                GREEN=$'\033[0;32m'
+                YELLOW=$'\033[0;33m'
+                BLUE=$'\033[0;34m'
+                CYAN=$'\033[0;36m'
+                LIGHT_CYAN=$'\033[1;36m'
                 ;;
         esac
     fi
@@ -168,10 +168,16 @@ display_success() {
     fi
 }
 
+# Number of errors reported through display_error/log_error; run_config_step
+# compares it before and after a step, since the steps report most failures
+# instead of returning non-zero
+ERRORS_REPORTED=0
+
 # Display error message
 display_error() {
     local message="$1"
     local details="${2:-}"
+    ERRORS_REPORTED=$((ERRORS_REPORTED + 1))
 
     if supports_gum; then
         gum style "$message" --foreground "$THEME_ERROR" --margin "0 2"
@@ -210,6 +216,26 @@ display_info() {
     fi
 }
 
+# Display several success messages as one block
+# gum style joins its arguments with newlines, so the block costs one gum call
+# (and the fallback one printf) instead of one per line
+display_success_list() {
+    if supports_gum; then
+        gum style "$@" --foreground "$THEME_SUCCESS" --margin "0 2"
+    else
+        printf "${GREEN}✓ %s${RESET}\n" "$@"
+    fi
+}
+
+# Display several info messages as one block
+display_info_list() {
+    if supports_gum; then
+        gum style "$@" --foreground "$THEME_INFO" --margin "0 2"
+    else
+        printf "${CYAN}ℹ %s${RESET}\n" "$@"
+    fi
+}
+
 # Display a bordered information box
 display_box() {
     local title="$1"
@@ -262,44 +288,62 @@ step() {
     display_step "❯" "$1"
 }
 
+# Log lines are append-only status output, so they are written as plain ANSI
+# text instead of being rendered through a gum process for every line.
+# Colors hold prebuilt escape bytes, so printf '%s' emits them without
+# re-parsing backslash escapes in the color or the message on each call.
 log_info() {
-    display_info "$1"
+    printf '%s\n' "${CYAN}ℹ $1${RESET}"
 }
 
 log_success() {
-    display_success "$1"
+    printf '%s\n' "${GREEN}✓ $1${RESET}"
 }
 
 log_warn() {
-    display_warning "$1"
+    printf '%s\n' "${YELLOW}⚠ $1${RESET}"
 }
 
 log_error() {
-    display_error "$1"
+    ERRORS_REPORTED=$((ERRORS_REPORTED + 1))
+    printf '%s\n' "${RED}✗ $1${RESET}"
 }
 
 # Package installation with clean final summary (no intermediate progress)
+# Returns non-zero when any package failed to install
 install_packages_with_progress() {
-    local packages=("$@")
+    local packages=()
     local installed_packages=()
     local failed_packages=()
+    local package
+
+    for package in "$@"; do
+        [ -n "$package" ] && packages+=("$package")
+    done
+    [ ${#packages[@]} -eq 0 ] && return 0
 
-    for package in "${packages[@]}"; do
-        if [ -n "$package" ]; then
-            if install_pkg "$package" >/dev/null 2>&1; then
+    # Install all packages in one transaction; only fall back to one call per
+    # package when the batch fails, to find out which packages are at fault
+    if install_pkg_quiet "${packages[@]}"; then
+        installed_packages=("${packages[@]}")
+    else
+        for package in "${packages[@]}"; do
+            if install_pkg_quiet "$package"; then
                 installed_packages+=("$package")
             else
                 failed_packages+=("$package")
             fi
-        fi
-    done
+        done
+    fi
 
     if [ ${#installed_packages[@]} -gt 0 ]; then
         display_success "Successfully installed packages: ${installed_packages[*]}"
     fi
     if [ ${#failed_packages[@]} -gt 0 ]; then
         display_error "Failed packages: ${failed_packages[*]}"
+        return 1
     fi
+    return 0
 }
 
 # Functions are available after sourcing this file
\ No newline at end of file
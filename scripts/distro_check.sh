@@ -64,17 +64,10 @@ detect_distro() {
 detect_de() {
     # Detect Desktop Environment
     if [ "${XDG_CURRENT_DESKTOP:-}" = "" ]; then
-        # Try to detect via installed packages or other env vars if not set
-        if [ "$DISTRO_ID" = "arch" ]; then
-             if pacman -Qq plasma-desktop >/dev/null 2>&1; then XDG_CURRENT_DESKTOP="KDE"; fi
-             if pacman -Qq gnome-shell >/dev/null 2>&1; then XDG_CURRENT_DESKTOP="GNOME"; fi
-        elif [ "$DISTRO_ID" = "fedora" ]; then
-             if rpm -q plasma-desktop >/dev/null 2>&1; then XDG_CURRENT_DESKTOP="KDE"; fi
-             if rpm -q gnome-shell >/dev/null 2>&1; then XDG_CURRENT_DESKTOP="GNOME"; fi
-        elif [ "$DISTRO_ID" = "debian" ] || [ "$DISTRO_ID" = "ubuntu" ]; then
-             if dpkg -l | grep -q plasma-desktop; then XDG_CURRENT_DESKTOP="KDE"; fi
-             if dpkg -l | grep -q gnome-shell; then XDG_CURRENT_DESKTOP="GNOME"; fi
-        fi
+        # Try to detect via installed packages if not set; is_package_installed
+        # answers from one cached package manager query for every distro
+        if is_package_installed plasma-desktop; then XDG_CURRENT_DESKTOP="KDE"; fi
+        if is_package_installed gnome-shell; then XDG_CURRENT_DESKTOP="GNOME"; fi
     fi
     export XDG_CURRENT_DESKTOP
 }
@@ -4,7 +4,7 @@ set -uo pipefail
 # Fedora Configuration Module for LinuxInstaller
 # Based on fedorainstaller best practices
 
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+SCRIPT_DIR="${SCRIPTS_DIR:-$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)}"
 source "$SCRIPT_DIR/common.sh"
 source "$SCRIPT_DIR/distro_check.sh"
 
@@ -155,7 +155,6 @@ distro_get_packages() {
             ;;
     esac
 }
-export -f distro_get_packages
 
 # =============================================================================
 # FEDORA CONFIGURATION FUNCTIONS
@@ -171,8 +170,10 @@ fedora_system_preparation() {
     # Configure DNF for optimal performance
     fedora_configure_dnf
 
-    # Update system
-    if supports_gum; then
+    # Update system, unless update_system already upgraded it in this run
+    if state_check "system_updated"; then
+        log_info "System already upgraded in this run, skipping second upgrade"
+    elif supports_gum; then
         if spin "Updating system"  dnf update -y >/dev/null 2>&1; then
             display_success "✓ System updated"
         fi
@@ -215,15 +216,30 @@ fedora_configure_dnf() {
         "install_weak_deps=False"
     )
 
+    # Read dnf.conf once, then apply every rewrite in a single sed pass and
+    # append the missing options together; options already set are left alone
+    local dnf_conf="" opt key
+    [ -f "$FEDORA_REPOS_FILE" ] && dnf_conf=$(<"$FEDORA_REPOS_FILE")
+
+    local sed_args=() missing=()
     for opt in "${optimizations[@]}"; do
-        local key=$(echo "$opt" | cut -d= -f1)
-        if grep -q "^$key" "$FEDORA_REPOS_FILE"; then
-            sed -i "s/^$key=.*/$opt/" "$FEDORA_REPOS_FILE"
+        key="${opt%%=*}"
+        if [[ "$dnf_conf" =~ (^|$'\n')$opt($'\n'|$) ]]; then
+            continue
+        elif [[ "$dnf_conf" =~ (^|$'\n')$key ]]; then
+            sed_args+=(-e "s/^$key=.*/$opt/")
         else
-            echo "$opt" | tee -a "$FEDORA_REPOS_FILE" >/dev/null
+            missing+=("$opt")
         fi
     done
 
+    if [ ${#sed_args[@]} -gt 0 ]; then
+        sed -i "${sed_args[@]}" "$FEDORA_REPOS_FILE"
+    fi
+    if [ ${#missing[@]} -gt 0 ]; then
+        printf '%s\n' "${missing[@]}" >> "$FEDORA_REPOS_FILE"
+    fi
+
     # Enable PowerTools repository for additional packages
     if [ -f /etc/yum.repos.d/fedora-cisco-openh264.repo ]; then
         dnf config-manager --set-enabled fedora-cisco-openh264 >/dev/null 2>&1 || true
@@ -236,26 +252,17 @@ fedora_configure_dnf() {
 fedora_install_essentials() {
     display_step "📦" "Installing Fedora Essential Packages"
 
-    log_info "Installing essential packages..."
-    for package in "${FEDORA_ESSENTIALS[@]}"; do
-        if ! install_pkg "$package" >/dev/null 2>&1; then
-            log_warn "Failed to install essential package: $package"
-        else
-            log_success "Installed essential package: $package"
-        fi
-    done
-
-    # Install desktop packages if not server mode
+    # Essential and (outside server mode) desktop packages go through one
+    # dnf transaction instead of one per package
+    local packages=("${FEDORA_ESSENTIALS[@]}")
     if [ "$INSTALL_MODE" != "server" ]; then
-        log_info "Installing desktop packages..."
-        for package in "${FEDORA_DESKTOP[@]}"; do
-        if ! install_pkg "$package" >/dev/null 2>&1; then
-                log_warn "Failed to install desktop package: $package"
-            else
-                log_success "Installed desktop package: $package"
-            fi
-        done
+        log_info "Installing essential and desktop packages..."
+        packages+=("${FEDORA_DESKTOP[@]}")
+    else
+        log_info "Installing essential packages..."
     fi
+
+    install_packages_with_progress "${packages[@]}"
 }
 
 # Configure bootloader (GRUB or systemd-boot) for Fedora
@@ -263,7 +270,8 @@ fedora_configure_bootloader() {
     display_step "🔄" "Configuring Fedora Bootloader"
 
     local bootloader
-    bootloader=$(detect_bootloader)
+    detect_bootloader
+    bootloader="$DETECTED_BOOTLOADER"
 
     case "$bootloader" in
         "grub")
@@ -288,20 +296,32 @@ configure_grub_fedora() {
         return 1
     fi
 
-    # Set timeout
-    sed -i 's/^GRUB_TIMEOUT=.*/GRUB_TIMEOUT=3/' /etc/default/grub
+    local changed=false
+
+    # Set timeout, skipping the rewrite when it is already in place
+    local grub_defaults
+    grub_defaults=$(</etc/default/grub)
+    # Both edits are queued and applied with a single sed pass below
+    local sed_args=()
+    if ! [[ "$grub_defaults" =~ (^|$'\n')GRUB_TIMEOUT=3($'\n'|$) ]]; then
+        sed_args+=(-e 's/^GRUB_TIMEOUT=.*/GRUB_TIMEOUT=3/')
+        changed=true
+    fi
 
     # Add Fedora-specific kernel parameters
     local fedora_params="quiet splash"
-    local current_line=$(grep "^GRUB_CMDLINE_LINUX_DEFAULT=" /etc/default/grub)
-    local current_params=""
-
-    if [ -n "$current_line" ]; then
-        current_params=$(echo "$current_line" | cut -d'=' -f2- | sed "s/^['\"]//;s/['\"]$//")
-    fi
+    local current_params="" line
+    # Take the current value from the copy already read, without grep/cut/sed
+    while IFS= read -r line; do
+        if [[ "$line" == GRUB_CMDLINE_LINUX_DEFAULT=* ]]; then
+            current_params="${line#*=}"
+            current_params="${current_params#[\"\']}"
+            current_params="${current_params%[\"\']}"
+            break
+        fi
+    done <<< "$grub_defaults"
 
     local new_params="$current_params"
-    local changed=false
 
     for param in $fedora_params; do
         if [[ ! "$new_params" == *"$param"* ]]; then
@@ -311,22 +331,25 @@ configure_grub_fedora() {
     done
 
     if [ "$changed" = true ]; then
-        sed -i "s|^GRUB_CMDLINE_LINUX_DEFAULT=.*|GRUB_CMDLINE_LINUX_DEFAULT=\"$new_params\"|" /etc/default/grub
+        sed_args+=(-e "s|^GRUB_CMDLINE_LINUX_DEFAULT=.*|GRUB_CMDLINE_LINUX_DEFAULT=\"$new_params\"|")
+        sed -i "${sed_args[@]}" /etc/default/grub
         log_success "Updated GRUB kernel parameters"
     fi
 
-    # Regenerate GRUB config
-    log_info "Regenerating GRUB configuration..."
+    local grub_cfg="/boot/grub2/grub.cfg"
     if [ -d /sys/firmware/efi ]; then
-        if ! grub2-mkconfig -o /boot/efi/EFI/fedora/grub.cfg >/dev/null 2>&1; then
+        grub_cfg="/boot/efi/EFI/fedora/grub.cfg"
+    fi
+
+    # Regenerate GRUB config only when the defaults changed or grub.cfg is stale
+    if [ "$changed" = true ] || [ ! -f "$grub_cfg" ] || [ /etc/default/grub -nt "$grub_cfg" ]; then
+        log_info "Regenerating GRUB configuration..."
+        if ! grub2-mkconfig -o "$grub_cfg" >/dev/null 2>&1; then
             log_error "Failed to regenerate GRUB config"
             return 1
         fi
     else
-        if ! grub2-mkconfig -o /boot/grub2/grub.cfg >/dev/null 2>&1; then
-            log_error "Failed to regenerate GRUB config"
-            return 1
-        fi
+        log_info "GRUB configuration already up to date"
     fi
 
     log_success "GRUB configured successfully"
@@ -336,41 +359,13 @@ configure_grub_fedora() {
 configure_systemd_boot_fedora() {
     log_info "Configuring systemd-boot for Fedora..."
 
-    local entries_dir=""
-    if [ -d "/boot/loader/entries" ]; then
-        entries_dir="/boot/loader/entries"
-    elif [ -d "/efi/loader/entries" ]; then
-        entries_dir="/efi/loader/entries"
-    elif [ -d "/boot/efi/loader/entries" ]; then
-        entries_dir="/boot/efi/loader/entries"
-    fi
-
-    if [ -z "$entries_dir" ]; then
+    if ! load_loader_entries; then
         log_error "Could not find systemd-boot entries directory"
         return 1
     fi
 
     local fedora_params="quiet splash"
-    local updated=false
-
-    for entry in "$entries_dir"/*.conf; do
-        [ -e "$entry" ] || continue
-        if [ -f "$entry" ]; then
-            if ! grep -q "splash" "$entry"; then
-                if grep -q "^options" "$entry"; then
-                    sed -i "/^options/ s/$/ $fedora_params/" "$entry"
-                    log_success "Updated $entry"
-                    updated=true
-                else
-                    echo "options $fedora_params" | tee -a "$entry" >/dev/null
-                    log_success "Updated $entry (added options)"
-                    updated=true
-                fi
-            fi
-        fi
-    done
-
-    if [ "$updated" = true ]; then
+    if update_loader_entries "$fedora_params"; then
         log_success "systemd-boot entries updated"
     else
         log_info "systemd-boot entries already configured"
@@ -389,18 +384,10 @@ fedora_enable_system_services() {
         sshd
     )
 
-    for service in "${services[@]}"; do
-        if systemctl list-unit-files | grep -q "^$service"; then
-            if systemctl enable --now "$service" >/dev/null 2>&1; then
-                log_success "Enabled and started $service"
-            else
-                log_warn "Failed to enable $service"
-            fi
-        fi
-    done
+    enable_services "${services[@]}"
 
     # Configure firewall (firewalld for Fedora)
-    if ! install_pkg firewalld >/dev/null 2>&1; then
+    if ! install_pkg_quiet firewalld; then
         log_warn "Failed to install firewalld"
         return
     fi
@@ -420,9 +407,9 @@ fedora_enable_system_services() {
 fedora_setup_flatpak() {
     display_step "📦" "Setting up Flatpak for Fedora"
 
-    if ! command -v flatpak >/dev/null; then
+    if ! command_exists flatpak; then
         log_info "Installing Flatpak..."
-        if ! install_pkg flatpak >/dev/null 2>&1; then
+        if ! install_pkg_quiet flatpak; then
             log_warn "Failed to install Flatpak"
             return
         fi
@@ -443,7 +430,7 @@ fedora_setup_copr() {
 
     if [ "${#FEDORA_COPR_REPOS[@]}" -gt 0 ]; then
         # Ensure dnf-plugins-core is available (required for 'dnf copr')
-        if ! install_pkg dnf-plugins-core >/dev/null 2>&1; then
+        if ! install_pkg_quiet dnf-plugins-core; then
             log_warn "Failed to install dnf-plugins-core; COPR setup may fail"
         fi
 
@@ -457,14 +444,14 @@ fedora_setup_copr() {
                     # Install packages from this COPR repo
                     case "$repo" in
                         "atim/starship")
-                            if ! install_pkg starship >/dev/null 2>&1; then
+                            if ! install_pkg_quiet starship; then
                                 log_warn "Failed to install starship from COPR"
                             else
                                 log_success "Installed starship from COPR"
                             fi
                             ;;
                         "alternateved/eza")
-                            if ! install_pkg eza >/dev/null 2>&1; then
+                            if ! install_pkg_quiet eza; then
                                 log_warn "Failed to install eza from COPR"
                             else
                                 log_success "Installed eza from COPR"
@@ -483,10 +470,13 @@ fedora_setup_copr() {
 fedora_setup_shell() {
     display_step "🐚" "Setting up ZSH shell environment"
 
-    local target_user="${SUDO_USER:-$USER}"
-    if [ "$SHELL" != "$(command -v zsh)" ]; then
+    detect_target_user
+    local target_user="$TARGET_USER"
+    local zsh_path
+    zsh_path=$(command -v zsh 2>/dev/null)
+    if [ "$SHELL" != "$zsh_path" ]; then
         log_info "Changing default shell to ZSH for $target_user..."
-        if chsh -s "$(command -v zsh)" "$target_user" 2>/dev/null; then
+        if chsh -s "$zsh_path" "$target_user" 2>/dev/null; then
             log_success "Default shell changed to ZSH"
         else
             log_warning "Failed to change shell. You may need to do this manually."
@@ -495,20 +485,22 @@ fedora_setup_shell() {
 
     mkdir -p "$HOME/.config"
 
-    if [ -f "$FEDORA_CONFIGS_DIR/.zshrc" ]; then
+    if [ -f "$FEDORA_CONFIGS_DIR/.zshrc" ] && ! config_is_current "$FEDORA_CONFIGS_DIR/.zshrc" "$HOME/.zshrc"; then
         cp "$FEDORA_CONFIGS_DIR/.zshrc" "$HOME/.zshrc" && log_success "Updated config: .zshrc"
     fi
 
-    if [ -f "$FEDORA_CONFIGS_DIR/starship.toml" ]; then
+    if [ -f "$FEDORA_CONFIGS_DIR/starship.toml" ] && ! config_is_current "$FEDORA_CONFIGS_DIR/starship.toml" "$HOME/.config/starship.toml"; then
         cp "$FEDORA_CONFIGS_DIR/starship.toml" "$HOME/.config/starship.toml" && log_success "Updated config: starship.toml"
     fi
 
-    if command -v fastfetch >/dev/null 2>&1; then
+    if command_exists fastfetch; then
         mkdir -p "$HOME/.config/fastfetch"
         local dest_config="$HOME/.config/fastfetch/config.jsonc"
         if [ -f "$FEDORA_CONFIGS_DIR/config.jsonc" ]; then
-            cp "$FEDORA_CONFIGS_DIR/config.jsonc" "$dest_config"
-            log_success "Applied custom fastfetch config"
+            if ! config_is_current "$FEDORA_CONFIGS_DIR/config.jsonc" "$dest_config"; then
+                cp "$FEDORA_CONFIGS_DIR/config.jsonc" "$dest_config"
+                log_success "Applied custom fastfetch config"
+            fi
         else
             if [ ! -f "$dest_config" ]; then
                 fastfetch --gen-config &>/dev/null
@@ -541,9 +533,9 @@ fedora_setup_solaar() {
     fi
 
     # Check for Logitech Bluetooth devices with timeout and better error handling
-    if command -v bluetoothctl >/dev/null 2>&1; then
+    if command_exists bluetoothctl; then
         # Use timeout to prevent hanging on Bluetooth issues
-        if timeout 10 bash -c "bluetoothctl --timeout 5 devices 2>/dev/null | grep -i logitech >/dev/null 2>&1"; then
+        if timeout 10 bluetoothctl --timeout 5 devices </dev/null 2>/dev/null | grep -qi logitech; then
             has_logitech=true
             log_info "Logitech Bluetooth device detected"
         fi
@@ -582,7 +574,7 @@ fedora_configure_locale() {
 
     # Set LANG to Greek
     log_info "Setting default locale to Greek (el_GR.UTF-8)..."
-    if bash -c "echo 'LANG=el_GR.UTF-8' > '$locale_conf'"; then
+    if echo 'LANG=el_GR.UTF-8' > "$locale_conf"; then
         log_success "Default locale set to el_GR.UTF-8"
     else
         log_warn "Failed to set default locale"
@@ -604,6 +596,11 @@ fedora_configure_hostname() {
     local current_hostname
     current_hostname=$(hostname)
 
+    if ! is_interactive; then
+        log_info "Keeping hostname: $current_hostname"
+        return 0
+    fi
+
     if supports_gum; then
         display_step "🏠" "Current hostname: $current_hostname"
         display_info "Do you want to change the hostname?" "Hostname identifies your system on the network.\nChoose wisely as it will be used by:"
@@ -619,7 +616,7 @@ fedora_configure_hostname() {
                 echo ""
 
                 if gum confirm "Yes, change hostname to: $new_hostname"; then
-                    if echo "$new_hostname" | tee /etc/hostname >/dev/null; then
+                    if echo "$new_hostname" > /etc/hostname; then
                         hostnamectl set-hostname "$new_hostname"
                         log_success "Hostname changed to: $new_hostname"
                         log_info "Reboot required for changes to take effect"
@@ -645,7 +642,7 @@ fedora_configure_hostname() {
                 display_warning "You are about to change hostname to: $new_hostname" "This will:\n  • Update /etc/hostname\n  • Require a reboot to take effect"
                 read -r -p "Yes, change hostname to: $new_hostname? [y/N]: " confirm
                 if [[ "$confirm" =~ ^([yY][eE][sS]|[yY])$ ]]; then
-                    if echo "$new_hostname" | tee /etc/hostname >/dev/null; then
+                    if echo "$new_hostname" > /etc/hostname; then
                         hostnamectl set-hostname "$new_hostname"
                         log_success "Hostname changed to: $new_hostname"
                         log_info "Reboot required for changes to take effect"
@@ -673,11 +670,12 @@ fedora_main_config() {
 
     fedora_configure_hostname
 
-    fedora_system_preparation
-
-    fedora_configure_dnf
-
-    fedora_enable_rpmfusion
+    # The main installer runs preparation (RPM Fusion, dnf.conf, dnf update)
+    # before packages; it already covers fedora_configure_dnf and
+    # fedora_enable_rpmfusion
+    if ! state_check "system_preparation"; then
+        fedora_system_preparation
+    fi
 
     fedora_setup_copr
 
@@ -699,7 +697,8 @@ fedora_main_config() {
 
     # Add user to docker group if docker is installed
     if is_package_installed "docker"; then
-        local target_user="${SUDO_USER:-$USER}"
+        detect_target_user
+        local target_user="$TARGET_USER"
         if [ "$target_user" != "root" ]; then
             usermod -aG docker "$target_user" 2>/dev/null && log_info "Added $target_user to docker group"
         fi
@@ -707,18 +706,3 @@ fedora_main_config() {
 
     log_success "Fedora configuration completed"
 }
-
-# Export functions for use by main installer
-export -f fedora_main_config
-export -f fedora_system_preparation
-export -f fedora_configure_dnf
-export -f fedora_enable_rpmfusion
-export -f fedora_install_essentials
-export -f fedora_configure_bootloader
-export -f fedora_enable_system_services
-export -f fedora_setup_flatpak
-export -f fedora_setup_copr
-export -f fedora_setup_shell
-export -f fedora_setup_solaar
-export -f fedora_configure_locale
-export -f fedora_configure_hostname
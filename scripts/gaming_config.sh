@@ -4,15 +4,10 @@ set -uo pipefail
 # Gaming Configuration Module for LinuxInstaller
 # Based on best practices from all installers
 
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+SCRIPT_DIR="${SCRIPTS_DIR:-$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)}"
 source "$SCRIPT_DIR/common.sh"
 source "$SCRIPT_DIR/distro_check.sh"
 
-# GPU Vendor IDs
-GPU_AMD="0x1002"
-GPU_INTEL="0x8086"
-GPU_NVIDIA="0x10de"
-
 # Gaming packages by distribution
 ARCH_GAMING=(
     gamemode
@@ -57,31 +52,44 @@ GAMING_FLATPAKS=(
 # GPU DETECTION FUNCTIONS
 # =============================================================================
 
+# Return 0 if a display controller from any of the given vendor IDs is present
+has_gpu_vendor() {
+    scan_gpu_devices
+
+    local entry slot vendor device id
+    for entry in "${GPU_DEVICES[@]}"; do
+        read -r slot vendor device <<< "$entry"
+        for id in "$@"; do
+            [ "$vendor" = "$id" ] && return 0
+        done
+    done
+    return 1
+}
+
 detect_gpu() {
     display_step "🔍" "Detecting GPU Hardware"
 
     local detected_gpus=()
-    local gpu_info
-
-    # Use lspci to detect GPUs
-    while IFS= read -r line; do
-        if [ -n "$line" ]; then
-            local vendor_id=$(echo "$line" | grep -oP '\[\K[0-9a-fA-F]{4}(?=:)' | head -1)
-            local device_name=$(echo "$line" | grep -oP '(?<=\]: ).*(?= \[\d{4}:)' | sed 's/^ *//')
-
-            case "$vendor_id" in
-                1002)
-                    detected_gpus+=("AMD: $device_name")
-                    ;;
-                8086)
-                    detected_gpus+=("Intel: $device_name")
-                    ;;
-                10de)
-                    detected_gpus+=("NVIDIA: $device_name")
-                    ;;
-            esac
-        fi
-    done < <(lspci -nn | grep -iE "vga|3d|display")
+    local entry slot vendor device model
+
+    scan_gpu_devices
+    load_gpu_model_names
+    for entry in "${GPU_DEVICES[@]}"; do
+        read -r slot vendor device <<< "$entry"
+        # Readable model name from lspci; PCI IDs only when lspci is missing
+        model="${GPU_MODEL_NAMES[$slot]:-[${vendor#0x}:${device#0x}] at $slot}"
+        case "$vendor" in
+            "$GPU_AMD")
+                detected_gpus+=("AMD: $model")
+                ;;
+            "$GPU_INTEL")
+                detected_gpus+=("Intel: $model")
+                ;;
+            "$GPU_NVIDIA")
+                detected_gpus+=("NVIDIA: $model")
+                ;;
+        esac
+    done
 
     if [ ${#detected_gpus[@]} -eq 0 ]; then
         log_warn "No GPU detected"
@@ -97,37 +105,20 @@ detect_gpu() {
 }
 
 has_amd_gpu() {
-    lspci -nn | grep -qi "vga.*1002\|3d.*1002\|display.*1002"
+    has_gpu_vendor "$GPU_AMD"
 }
 
 has_intel_gpu() {
-    lspci -nn | grep -qi "vga.*8086\|3d.*8086\|display.*8086"
+    has_gpu_vendor "$GPU_INTEL"
 }
 
 has_nvidia_gpu() {
-    lspci -nn | grep -qi "vga.*10de\|3d.*10de\|display.*10de"
+    has_gpu_vendor "$GPU_NVIDIA"
 }
 
 has_virtual_gpu() {
-    # Detect virtual GPUs (Virtio, VMware, VirtualBox, etc.)
-    lspci -nn | grep -qi "vga.*1af4\|3d.*1af4\|display.*1af4" ||  # Virtio
-    lspci -nn | grep -qi "vga.*15ad\|3d.*15ad\|display.*15ad" ||  # VMware
-    lspci -nn | grep -qi "vga.*80ee\|3d.*80ee\|display.*80ee" ||  # VirtualBox
-    lspci -nn | grep -qi "vga.*1234\|3d.*1234\|display.*1234"     # Bochs/QEMU standard VGA
-}
-
-is_virtual_machine() {
-    # Detect if running in a virtual machine
-    if [ -f /proc/cpuinfo ]; then
-        grep -qi "hypervisor\|vmware\|virtualbox\|kvm\|qemu\|xen" /proc/cpuinfo && return 0
-    fi
-    if [ -f /sys/class/dmi/id/product_name ]; then
-        grep -qi "virtual\|vmware\|virtualbox\|kvm\|qemu\|xen" /sys/class/dmi/id/product_name && return 0
-    fi
-    if command -v systemd-detect-virt >/dev/null 2>&1; then
-        systemd-detect-virt --quiet && return 0
-    fi
-    return 1
+    # Detect virtual GPUs (Virtio, VMware, VirtualBox, Bochs/QEMU standard VGA)
+    has_gpu_vendor 0x1af4 0x15ad 0x80ee 0x1234
 }
 
 # Robust Flatpak package installation function (same as main installer)
@@ -136,23 +127,29 @@ is_virtual_machine() {
 install_gpu_drivers() {
     display_step "🎮" "Installing GPU Drivers"
 
-    local amd_detected=false
-    local intel_detected=false
-    local nvidia_detected=false
-    local virtual_detected=false
-
-    has_amd_gpu && amd_detected=true
-    has_intel_gpu && intel_detected=true
-    has_nvidia_gpu && nvidia_detected=true
-    has_virtual_gpu && virtual_detected=true
-
     # Skip GPU driver installation in virtual machines
-    if is_virtual_machine; then
+    if detect_virtual_machine; then
         log_info "Virtual machine detected - skipping physical GPU driver installation"
         log_info "Virtual GPU drivers are handled by the hypervisor"
         return 0
     fi
 
+    local amd_detected=false
+    local intel_detected=false
+    local nvidia_detected=false
+
+    # Classify every display controller in one pass over the scan
+    local entry slot vendor device
+    scan_gpu_devices
+    for entry in "${GPU_DEVICES[@]}"; do
+        read -r slot vendor device <<< "$entry"
+        case "$vendor" in
+            "$GPU_AMD") amd_detected=true ;;
+            "$GPU_INTEL") intel_detected=true ;;
+            "$GPU_NVIDIA") nvidia_detected=true ;;
+        esac
+    done
+
     if [ "$amd_detected" = true ]; then
         log_info "AMD GPU detected - installing AMD drivers"
         case "$DISTRO_ID" in
@@ -229,51 +226,47 @@ gaming_install_packages() {
 
     log_info "Installing gaming packages for $DISTRO_ID..."
 
-        # Install packages in batch like main installation
-        local installed_packages=()
-        local failed_packages=()
-
-        if supports_gum; then
-            for package in "${gaming_packages[@]}"; do
-                if [ -n "$package" ]; then
-                    echo "• Installing $package"
-                    if install_pkg "$package" >/dev/null 2>&1; then
-                        installed_packages+=("$package")
-                    else
-                        failed_packages+=("$package")
-                    fi
-                fi
-            done
-
-            # Show summary
-            if [ ${#installed_packages[@]} -gt 0 ]; then
-                echo ""
-                display_success "✓ Gaming packages installed: ${installed_packages[*]}"
-            fi
-            if [ ${#failed_packages[@]} -gt 0 ]; then
-                echo ""
-                display_error "✗ Failed gaming packages: ${failed_packages[*]}"
-            fi
-        else
-            # Plain text mode - install quietly
-            for package in "${gaming_packages[@]}"; do
-                if [ -n "$package" ]; then
-                    if install_pkg "$package" >/dev/null 2>&1; then
-                        installed_packages+=("$package")
-                    else
-                        failed_packages+=("$package")
-                    fi
-                fi
-            done
-
-            # Show summary
-            if [ ${#installed_packages[@]} -gt 0 ]; then
-                echo "✓ Gaming packages installed: ${installed_packages[*]}"
-            fi
-            if [ ${#failed_packages[@]} -gt 0 ]; then
-                echo "✗ Failed gaming packages: ${failed_packages[*]}"
+    # Install all gaming packages in one transaction like the main installation;
+    # only fall back to one call per package when the batch fails
+    local pending=() installed_packages=() failed_packages=() package
+    for package in "${gaming_packages[@]}"; do
+        [ -n "$package" ] && pending+=("$package")
+    done
+
+    if supports_gum; then
+        printf '• Installing %s\n' "${pending[@]}"
+    fi
+
+    if install_pkg_quiet "${pending[@]}"; then
+        installed_packages=("${pending[@]}")
+    else
+        for package in "${pending[@]}"; do
+            if install_pkg_quiet "$package"; then
+                installed_packages+=("$package")
+            else
+                failed_packages+=("$package")
             fi
+        done
+    fi
+
+    # Show summary
+    if supports_gum; then
+        if [ ${#installed_packages[@]} -gt 0 ]; then
+            echo ""
+            display_success "✓ Gaming packages installed: ${installed_packages[*]}"
+        fi
+        if [ ${#failed_packages[@]} -gt 0 ]; then
+            echo ""
+            display_error "✗ Failed gaming packages: ${failed_packages[*]}"
+        fi
+    else
+        if [ ${#installed_packages[@]} -gt 0 ]; then
+            echo "✓ Gaming packages installed: ${installed_packages[*]}"
+        fi
+        if [ ${#failed_packages[@]} -gt 0 ]; then
+            echo "✗ Failed gaming packages: ${failed_packages[*]}"
         fi
+    fi
 }
 
 # Configure system settings for optimal gaming performance
@@ -282,25 +275,18 @@ gaming_configure_performance() {
 
     # Enable performance governor
     if [ -f /sys/devices/system/cpu/cpu0/cpufreq/scaling_governor ]; then
-        echo performance | tee /sys/devices/system/cpu/cpu*/cpufreq/scaling_governor >/dev/null 2>&1
+        write_sys_value performance /sys/devices/system/cpu/cpu*/cpufreq/scaling_governor
         log_success "Set CPU governor to performance"
     fi
 
     # Configure swappiness for gaming
     if [ -f /proc/sys/vm/swappiness ]; then
-        echo 10 | tee /proc/sys/vm/swappiness >/dev/null 2>&1
+        write_sys_value 10 /proc/sys/vm/swappiness
         log_success "Optimized swappiness for gaming (set to 10)"
     fi
 
     # Enable TRIM for SSDs
-    local has_ssd=false
-    for discard_file in /sys/block/*/queue/discard_max_bytes; do
-        if [ -f "$discard_file" ]; then
-            has_ssd=true
-            break
-        fi
-    done
-    if [ "$has_ssd" = true ]; then
+    if has_ssd; then
         systemctl enable --now fstrim.timer >/dev/null 2>&1
         log_success "Enabled TRIM for SSD optimization"
     fi
@@ -310,7 +296,7 @@ gaming_configure_performance() {
 gaming_configure_mangohud() {
     display_step "📊" "Configuring MangoHud"
 
-    if ! command -v mangohud >/dev/null 2>&1; then
+    if ! command_exists mangohud; then
         log_warn "MangoHud not found. Install it via the distro's gaming packages."
         return
     fi
@@ -324,7 +310,7 @@ gaming_configure_mangohud() {
 gaming_configure_gamemode() {
     display_step "🎯" "Configuring GameMode"
 
-    if command -v gamemoded >/dev/null 2>&1; then
+    if command_exists gamemoded; then
         log_info "GameMode already installed"
 
         # Enable and start GameMode service
@@ -343,7 +329,7 @@ gaming_configure_steam() {
     display_step "🎮" "Configuring Steam"
 
     # Install Steam if not present
-    if ! command -v steam >/dev/null 2>&1; then
+    if ! command_exists steam; then
         install_packages_with_progress "steam" || {
             log_warn "Failed to install Steam"
             return
@@ -384,7 +370,7 @@ gaming_install_flatpak_packages() {
         local failed=()
 
         # Use the same robust installation logic as the main installer
-        install_flatpak_packages "flatpak install flathub -y" gaming_flatpak_packages installed skipped failed
+        install_flatpak_packages "flatpak install flathub -y --noninteractive" gaming_flatpak_packages installed skipped failed
 
         # Report results
         if [ ${#installed[@]} -gt 0 ]; then
@@ -403,7 +389,7 @@ install_faugus_flatpak() {
     display_step "🎨" "Installing Faugus (flatpak)"
 
     # Ensure Flatpak is available
-    if ! command -v flatpak >/dev/null 2>&1; then
+    if ! command_exists flatpak; then
         log_info "Installing Flatpak package manager..."
         if ! install_pkg flatpak; then
             log_error "Failed to install Flatpak - cannot install Faugus"
@@ -428,7 +414,7 @@ install_faugus_flatpak() {
     local failed=()
 
     # Use the same robust installation logic as the main installer
-    install_flatpak_packages "flatpak install flathub -y" faugus_packages installed skipped failed
+    install_flatpak_packages "flatpak install flathub -y --noninteractive" faugus_packages installed skipped failed
 
     # Check results
     if [ ${#installed[@]} -gt 0 ]; then
@@ -445,8 +431,37 @@ install_faugus_flatpak() {
         return 1
     fi
 }
+# The gaming Flatpaks don't touch the native package manager, so when Flatpak
+# is already present they are installed in the background while the GPU
+# drivers and gaming packages are installed and configured. The background
+# job is a plain flatpak install with its output streamed as it happens,
+# prefixed so it stays attributable next to the foreground steps; it never
+# calls the state or display helpers, which only run in this shell.
+GAMING_FLATPAK_PID=""
+gaming_start_flatpak_install() {
+    command_exists flatpak || return 0
+
+    # Piped rather than redirected into a process substitution, so waiting on
+    # the job (the last pipeline member) also covers the prefixed output
+    {
+        flatpak install flathub -y --noninteractive "${GAMING_FLATPAKS[@]}"
+    } 2>&1 | prefix_output "[flatpak]" &
+    GAMING_FLATPAK_PID=$!
+}
 
+# Wait for the background install, then run the regular install steps, which
+# report and record what is installed and retry anything the background job
+# didn't get (or install everything in order when there was no background job,
+# since Flatpak may only come with the gaming packages)
+gaming_finish_flatpak_install() {
+    if [ -n "$GAMING_FLATPAK_PID" ]; then
+        wait "$GAMING_FLATPAK_PID"
+        GAMING_FLATPAK_PID=""
+    fi
 
+    gaming_install_flatpak_packages
+    install_faugus_flatpak
+}
 
 # =============================================================================
 # MAIN GAMING CONFIGURATION FUNCTION
@@ -461,6 +476,10 @@ gaming_main_config() {
         return 0
     fi
 
+    # Install gaming Flatpak packages (Heroic Launcher, ProtonPlus, Faugus)
+    # alongside the native steps below
+    gaming_start_flatpak_install
+
     # Detect GPU hardware
     detect_gpu
 
@@ -482,29 +501,9 @@ gaming_main_config() {
     # Configure Steam
     gaming_configure_steam
 
-    # Install gaming Flatpak packages (Heroic Launcher, ProtonPlus, Faugus)
-    gaming_install_flatpak_packages
-
-    # Install Faugus (Flatpak) - kept for backwards compatibility
-    install_faugus_flatpak
+    # Collect the gaming Flatpak installs (Faugus is kept for backwards
+    # compatibility)
+    gaming_finish_flatpak_install
 
     log_success "Gaming configuration completed"
 }
-
-# Export functions for use by main installer
-export -f gaming_main_config
-export -f detect_gpu
-export -f has_amd_gpu
-export -f has_intel_gpu
-export -f has_nvidia_gpu
-export -f has_virtual_gpu
-export -f is_virtual_machine
-export -f install_gpu_drivers
-# install_flatpak_packages export is in install.sh
-export -f gaming_install_packages
-export -f gaming_install_flatpak_packages
-export -f gaming_configure_performance
-export -f gaming_configure_mangohud
-export -f gaming_configure_gamemode
-export -f gaming_configure_steam
-export -f install_faugus_flatpak
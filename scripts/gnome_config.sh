@@ -4,7 +4,7 @@ set -uo pipefail
 # GNOME Configuration Module for LinuxInstaller
 # Based on best practices from all installers
 
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+SCRIPT_DIR="${SCRIPTS_DIR:-$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)}"
 source "$SCRIPT_DIR/common.sh"
 source "$SCRIPT_DIR/distro_check.sh"
 
@@ -92,20 +92,26 @@ gnome_install_packages() {
 
     # Remove unnecessary GNOME packages
     log_info "Removing unnecessary GNOME packages..."
-    for package in "${GNOME_REMOVALS[@]}"; do
-        if remove_pkg "$package"; then
-            log_success "Removed GNOME package: $package"
-        else
-            log_warn "Failed to remove GNOME package: $package (may not be installed)"
-        fi
-    done
+    # One transaction for the whole list; remove_pkg skips packages that aren't installed
+    if remove_pkg "${GNOME_REMOVALS[@]}"; then
+        log_success "Removed unnecessary GNOME packages"
+    else
+        # A single package with dependents fails the whole transaction; retry individually
+        for package in "${GNOME_REMOVALS[@]}"; do
+            if remove_pkg "$package"; then
+                log_success "Removed GNOME package: $package"
+            else
+                log_warn "Failed to remove GNOME package: $package (may not be installed)"
+            fi
+        done
+    fi
 }
 
 # Configure GNOME shell extensions
 gnome_configure_extensions() {
     display_step "🖥️" "Configuring GNOME Extensions"
 
-    if ! command -v gnome-extensions >/dev/null 2>&1; then
+    if ! command_exists gnome-extensions; then
         log_warn "GNOME extensions command not found"
         return
     fi
@@ -137,7 +143,7 @@ gnome_configure_extensions() {
 gnome_configure_theme() {
     display_step "🎨" "Configuring GNOME Theme"
 
-    if ! command -v gsettings >/dev/null 2>&1; then
+    if ! command_exists gsettings; then
         log_error "gsettings command not found. Cannot configure GNOME theme."
         return 1
     fi
@@ -162,7 +168,7 @@ gnome_configure_theme() {
 gnome_configure_shortcuts() {
     display_step "⌨️" "Configuring GNOME Shortcuts"
 
-    if ! command -v gsettings >/dev/null 2>&1; then
+    if ! command_exists gsettings; then
         log_error "gsettings command not found. Cannot configure GNOME shortcuts."
         return 1
     fi
@@ -174,7 +180,8 @@ gnome_configure_shortcuts() {
     current_close_bindings=$(gsettings get $close_key 2>/dev/null || echo "['<Alt>F4']")
     if [[ "$current_close_bindings" != *"'<Super>q'"* ]]; then
         local new_bindings
-        new_bindings=$(echo "$current_close_bindings" | sed "s/]$/, '<Super>q']/")
+        new_bindings="$current_close_bindings"
+        [[ "$new_bindings" == *"]" ]] && new_bindings="${new_bindings%]}, '<Super>q']"
         gsettings set $close_key "$new_bindings" || true
         log_success "Shortcut 'Meta+Q' added for closing windows."
     else
@@ -188,13 +195,13 @@ gnome_configure_shortcuts() {
 
     # Detect default terminal emulator
     local terminal_cmd=""
-    if command -v kgx >/dev/null 2>&1; then
+    if command_exists kgx; then
         terminal_cmd="kgx"
-    elif command -v gnome-terminal >/dev/null 2>&1; then
+    elif command_exists gnome-terminal; then
         terminal_cmd="gnome-terminal"
-    elif command -v ptyxis >/dev/null 2>&1; then
+    elif command_exists ptyxis; then
         terminal_cmd="ptyxis"
-    elif command -v x-terminal-emulator >/dev/null 2>&1; then
+    elif command_exists x-terminal-emulator; then
         terminal_cmd="x-terminal-emulator"
     else
         log_warn "No terminal emulator found, using default fallback"
@@ -212,7 +219,8 @@ gnome_configure_shortcuts() {
         if [[ "$current_bindings_str" == "[]" || "$current_bindings_str" == "@as []" ]]; then
             new_list="['$custom_key']"
         else
-            new_list=$(echo "$current_bindings_str" | sed "s/]$/, '$custom_key']/")
+            new_list="$current_bindings_str"
+            [[ "$new_list" == *"]" ]] && new_list="${new_list%]}, '$custom_key']"
         fi
         gsettings set "$keybinding_path" custom-keybindings "$new_list" || true
     fi
@@ -228,7 +236,7 @@ gnome_configure_shortcuts() {
 gnome_configure_desktop() {
     display_step "🖥️" "Configuring GNOME Desktop"
 
-    if ! command -v gsettings >/dev/null 2>&1; then
+    if ! command_exists gsettings; then
         log_error "gsettings command not found. Cannot configure GNOME desktop."
         return 1
     fi
@@ -269,7 +277,7 @@ gnome_configure_network() {
     fi
 
     # Configure network settings
-    if command -v gsettings >/dev/null 2>&1; then
+    if command_exists gsettings; then
         gsettings set org.gnome.system.proxy mode 'none' 2>/dev/null || true
         gsettings set org.gnome.system.proxy ignore-hosts "['localhost', '127.0.0.0/8', '::1']" 2>/dev/null || true
     fi
@@ -282,7 +290,7 @@ gnome_install_flatpak_packages() {
     display_step "📦" "Installing GNOME Flatpak Applications"
 
     # Ensure Flatpak is available
-    if ! command -v flatpak >/dev/null 2>&1; then
+    if ! command_exists flatpak; then
         log_warn "Flatpak not available, skipping GNOME Flatpak installations"
         return
     fi
@@ -292,15 +300,22 @@ gnome_install_flatpak_packages() {
         com.mattjakeman.ExtensionManager
     )
 
-    # Install GNOME Flatpak packages
-    for package in "${gnome_flatpak_packages[@]}"; do
-        log_info "Installing GNOME Flatpak: $package"
-        if flatpak install -y flathub "$package" >/dev/null 2>&1; then
-            log_success "Installed GNOME Flatpak: $package"
-        else
-            log_warn "Failed to install GNOME Flatpak: $package"
-        fi
-    done
+    local installed=()
+    local skipped=()
+    local failed=()
+
+    # Install all GNOME Flatpaks in one transaction; flatpak downloads refs in parallel
+    install_flatpak_packages "flatpak install flathub -y --noninteractive" gnome_flatpak_packages installed skipped failed
+
+    if [ ${#installed[@]} -gt 0 ]; then
+        log_success "Installed GNOME Flatpak applications: ${installed[*]}"
+    fi
+    if [ ${#skipped[@]} -gt 0 ]; then
+        log_info "GNOME Flatpak applications already installed: ${skipped[*]}"
+    fi
+    if [ ${#failed[@]} -gt 0 ]; then
+        log_warn "Failed to install GNOME Flatpak applications: ${failed[*]}"
+    fi
 }
 
 # Install and configure GNOME Software application
@@ -308,12 +323,12 @@ gnome_install_gnome_software() {
     display_step "📦" "Installing and Configuring GNOME Software"
 
     # Install GNOME Software if not present
-    if ! command -v gnome-software >/dev/null 2>&1; then
+    if ! command_exists gnome-software; then
         install_packages_with_progress "gnome-software" || log_warn "Failed to install GNOME Software"
     fi
 
     # Configure GNOME Software
-    if command -v gsettings >/dev/null 2>&1; then
+    if command_exists gsettings; then
         gsettings set org.gnome.software allow-updates true 2>/dev/null || true
         gsettings set org.gnome.software install-bundles-system-wide true 2>/dev/null || true
         gsettings set org.gnome.software download-updates true 2>/dev/null || true
@@ -347,14 +362,3 @@ gnome_main_config() {
 
     log_success "GNOME configuration completed"
 }
-
-# Export functions for use by main installer
-export -f gnome_main_config
-export -f gnome_install_packages
-export -f gnome_install_flatpak_packages
-export -f gnome_configure_extensions
-export -f gnome_configure_theme
-export -f gnome_configure_shortcuts
-export -f gnome_configure_desktop
-export -f gnome_configure_network
-export -f gnome_install_gnome_software
@@ -4,7 +4,7 @@ set -uo pipefail
 # KDE Configuration Module for LinuxInstaller
 # Based on best practices from all installers
 
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+SCRIPT_DIR="${SCRIPTS_DIR:-$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)}"
 source "$SCRIPT_DIR/common.sh"
 source "$SCRIPT_DIR/distro_check.sh"
 
@@ -108,13 +108,19 @@ kde_install_packages() {
 
     # Remove unnecessary KDE packages
     log_info "Removing unnecessary KDE packages..."
-    for package in "${KDE_REMOVALS[@]}"; do
-        if remove_pkg "$package"; then
-            log_success "Removed KDE package: $package"
-        else
-            log_warn "Failed to remove KDE package: $package"
-        fi
-    done
+    # One transaction for the whole list; remove_pkg skips packages that aren't installed
+    if remove_pkg "${KDE_REMOVALS[@]}"; then
+        log_success "Removed unnecessary KDE packages"
+    else
+        # A single package with dependents fails the whole transaction; retry individually
+        for package in "${KDE_REMOVALS[@]}"; do
+            if remove_pkg "$package"; then
+                log_success "Removed KDE package: $package"
+            else
+                log_warn "Failed to remove KDE package: $package"
+            fi
+        done
+    fi
 }
 
 # Configure KDE global keyboard shortcuts (Plasma 6.5+ compatible)
@@ -122,18 +128,9 @@ kde_configure_shortcuts() {
     display_step "⌨️" "Configuring KDE Shortcuts"
 
     # Determine target user for shortcuts
-    local target_user="${SUDO_USER:-$USER}"
-    local user_home
-
-    # Get the target user's home directory
-    if [ "$target_user" = "root" ]; then
-        user_home="/root"
-    else
-        user_home=$(getent passwd "$target_user" 2>/dev/null | cut -d: -f6)
-        if [ -z "$user_home" ]; then
-            user_home="/home/$target_user"
-        fi
-    fi
+    detect_target_user
+    local target_user="$TARGET_USER"
+    local user_home="${TARGET_HOME:-/home/$target_user}"
 
     local config_file="$user_home/.config/kglobalshortcutsrc"
 
@@ -142,15 +139,15 @@ kde_configure_shortcuts() {
     local plasma_major=""
     local plasma_minor=""
 
-    if command -v plasmashell >/dev/null 2>&1; then
+    if command_exists plasmashell; then
         plasma_version=$(plasmashell --version 2>/dev/null | grep -oP 'plasmashell \K[0-9]+\.[0-9]+' || echo "")
         if [ -z "$plasma_version" ]; then
             plasma_version=$(pacman -Q plasma-desktop 2>/dev/null | grep -oP '\d+\.\d+' || echo "")
         fi
         if [ -z "$plasma_version" ]; then
-            if pacman -Q kf6 2>/dev/null >/dev/null; then
+            if is_package_installed kf6; then
                 plasma_version="6.0"
-            elif pacman -Q kf5 2>/dev/null >/dev/null; then
+            elif is_package_installed kf5; then
                 plasma_version="5.27"
             fi
         fi
@@ -165,7 +162,7 @@ kde_configure_shortcuts() {
     log_info "Detected KDE Plasma version: ${plasma_version:-unknown} (major: ${plasma_major:-?}, minor: ${plasma_minor:-?})"
 
     # Check for KDE config tools
-    if ! command -v kwriteconfig5 >/dev/null 2>&1 && ! command -v kwriteconfig6 >/dev/null 2>&1; then
+    if ! command_exists kwriteconfig5 && ! command_exists kwriteconfig6; then
         log_error "kwriteconfig command not found. Cannot configure KDE shortcuts."
         log_info "Make sure KDE Plasma is properly installed."
         return 1
@@ -176,7 +173,7 @@ kde_configure_shortcuts() {
     local kbuild="kbuildsycoca5"
 
     # Use KDE 6 tools if available (Plasma 6.0+)
-    if command -v kwriteconfig6 >/dev/null 2>&1; then
+    if command_exists kwriteconfig6; then
         kwrite="kwriteconfig6"
         kread="kreadconfig6"
         kbuild="kbuildsycoca6"
@@ -350,30 +347,25 @@ EOF
 
     if [ "$target_user" != "root" ]; then
         # Rebuild system configuration cache
-        su - "$target_user" -c "$kbuild --noincremental >/dev/null 2>&1" 2>/dev/null || true
+        local reload_cmds="$kbuild --noincremental >/dev/null 2>&1;"
 
-        # Restart kglobalaccel to reload shortcuts
+        # Restart kglobalaccel to reload shortcuts, reconfigure kwin and restart khotkeys
         if [[ "$plasma_major" -ge 6 ]]; then
             # Plasma 6+ methods
-            su - "$target_user" -c "kquitapp6 kglobalaccel5 2>/dev/null; sleep 1" 2>/dev/null || true
-            su - "$target_user" -c "kglobalaccel6 2>/dev/null &" 2>/dev/null || true
-
-            # Reconfigure kwin
-            su - "$target_user" -c "qdbus org.kde.KWin /KWin reconfigure 2>/dev/null" 2>/dev/null || true
-
-            # Restart khotkeys if exists
-            su - "$target_user" -c "kquitapp6 khotkeys 2>/dev/null; sleep 1; kstart6 khotkeys 2>/dev/null &" 2>/dev/null || true
+            reload_cmds+=" kquitapp6 kglobalaccel5 2>/dev/null; sleep 1;"
+            reload_cmds+=" kglobalaccel6 2>/dev/null &"
+            reload_cmds+=" qdbus org.kde.KWin /KWin reconfigure 2>/dev/null;"
+            reload_cmds+=" kquitapp6 khotkeys 2>/dev/null; sleep 1; kstart6 khotkeys 2>/dev/null &"
         else
             # Plasma 5 methods
-            su - "$target_user" -c "kquitapp5 kglobalaccel 2>/dev/null; sleep 1" 2>/dev/null || true
-            su - "$target_user" -c "kglobalaccel5 2>/dev/null &" 2>/dev/null || true
-
-            # Reconfigure kwin
-            su - "$target_user" -c "qdbus org.kde.KWin /KWin reconfigure 2>/dev/null" 2>/dev/null || true
-
-            # Restart khotkeys
-            su - "$target_user" -c "kquitapp5 khotkeys 2>/dev/null; sleep 1; kstart5 khotkeys 2>/dev/null &" 2>/dev/null || true
+            reload_cmds+=" kquitapp5 kglobalaccel 2>/dev/null; sleep 1;"
+            reload_cmds+=" kglobalaccel5 2>/dev/null &"
+            reload_cmds+=" qdbus org.kde.KWin /KWin reconfigure 2>/dev/null;"
+            reload_cmds+=" kquitapp5 khotkeys 2>/dev/null; sleep 1; kstart5 khotkeys 2>/dev/null &"
         fi
+
+        # Run the whole reload in a single login session instead of one per command
+        su - "$target_user" -c "$reload_cmds" 2>/dev/null || true
     fi
 
     log_success "KDE shortcuts configured and reloaded."
@@ -393,7 +385,7 @@ kde_configure_wallpaper() {
     if [ -f "$KDE_CONFIGS_DIR/kde_wallpaper.jpg" ]; then
         log_info "Setting KDE wallpaper..."
         local kwrite="kwriteconfig5"
-        if command -v kwriteconfig6 >/dev/null 2>&1; then kwrite="kwriteconfig6"; fi
+        if command_exists kwriteconfig6; then kwrite="kwriteconfig6"; fi
 
         $kwrite --file kscreenlockerrc --group "Greeter" --key "WallpaperPlugin" "org.kde.image" || true
         $kwrite --file plasmarc --group "Theme" --key "name" "breeze" || true
@@ -409,7 +401,7 @@ kde_configure_theme() {
     display_step "🎨" "Configuring KDE Theme"
 
     local kwrite="kwriteconfig5"
-    if command -v kwriteconfig6 >/dev/null 2>&1; then kwrite="kwriteconfig6"; fi
+    if command_exists kwriteconfig6; then kwrite="kwriteconfig6"; fi
 
     # Set theme to Breeze
     $kwrite --file kdeglobals --group "General" --key "ColorScheme" "Breeze" || true
@@ -442,7 +434,7 @@ kde_configure_network() {
 
     # Configure plasma-nm
     local kwrite="kwriteconfig5"
-    if command -v kwriteconfig6 >/dev/null 2>&1; then kwrite="kwriteconfig6"; fi
+    if command_exists kwriteconfig6; then kwrite="kwriteconfig6"; fi
 
     $kwrite --file plasma-nm --group "General" --key "RememberPasswords" "true" || true
     $kwrite --file plasma-nm --group "General" --key "EnableOfflineMode" "true" || true
@@ -456,7 +448,7 @@ kde_setup_plasma() {
 
     # Configure Plasma desktop settings
     local kwrite="kwriteconfig5"
-    if command -v kwriteconfig6 >/dev/null 2>&1; then kwrite="kwriteconfig6"; fi
+    if command_exists kwriteconfig6; then kwrite="kwriteconfig6"; fi
 
     # Disable desktop effects for better performance
     $kwrite --file kwinrc --group "Compositing" --key "Enabled" "true" || true
@@ -481,7 +473,7 @@ kde_install_kdeconnect() {
 
     # Configure KDE Connect
     local kwrite="kwriteconfig5"
-    if command -v kwriteconfig6 >/dev/null 2>&1; then kwrite="kwriteconfig6"; fi
+    if command_exists kwriteconfig6; then kwrite="kwriteconfig6"; fi
 
     $kwrite --file kdeconnectrc --group "Daemon" --key "AutoAcceptPair" "true" || true
     $kwrite --file kdeconnectrc --group "Daemon" --key "RunDaemonOnStartup" "true" || true
@@ -526,13 +518,4 @@ kde_main_config() {
     # The static kglobalshortcutsrc file is no longer used
 }
 
-# Export functions for use by main installer
-export -f kde_main_config
-export -f kde_install_packages
-export -f kde_configure_shortcuts
-export -f kde_configure_wallpaper
-export -f kde_configure_theme
-export -f kde_configure_network
-export -f kde_setup_plasma
-export -f kde_install_kdeconnect
 # is_package_installed() function is available from common.sh
@@ -4,7 +4,7 @@ set -uo pipefail
 # Maintenance Configuration Module for LinuxInstaller
 # Based on best practices from all installers
 
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+SCRIPT_DIR="${SCRIPTS_DIR:-$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)}"
 source "$SCRIPT_DIR/common.sh"
 source "$SCRIPT_DIR/distro_check.sh"
 
@@ -92,7 +92,7 @@ maintenance_install_basic_packages() {
             fi
         else
             log_info "Installing $pkg: $desc"
-            if install_pkg "$pkg" >/dev/null 2>&1; then
+            if install_pkg_quiet "$pkg"; then
                 installed+=("$pkg")
                 log_success "✓ $pkg installed"
             else
@@ -149,7 +149,7 @@ maintenance_install_packages() {
                 )
 
                 # Only add grub-btrfs if using GRUB bootloader
-                if [ "$(detect_bootloader)" = "grub" ]; then
+                if detect_bootloader && [ "$DETECTED_BOOTLOADER" = "grub" ]; then
                     packages+=("grub-btrfs")
                     descriptions+=("grub-btrfs: GRUB integration for booting from snapshots")
                 fi
@@ -162,7 +162,7 @@ maintenance_install_packages() {
                 descriptions=(
                     "timeshift: System backup and restore tool"
                 )
-                if [ "$(detect_bootloader)" = "grub" ]; then
+                if detect_bootloader && [ "$DETECTED_BOOTLOADER" = "grub" ]; then
                     packages+=("grub-btrfs")
                     descriptions+=("grub-btrfs: GRUB integration for booting from snapshots")
                 fi
@@ -175,7 +175,7 @@ maintenance_install_packages() {
                 descriptions=(
                     "timeshift: System backup and restore tool"
                 )
-                if [ "$(detect_bootloader)" = "grub" ]; then
+                if detect_bootloader && [ "$DETECTED_BOOTLOADER" = "grub" ]; then
                     packages+=("grub-btrfs")
                     descriptions+=("grub-btrfs: GRUB integration for booting from snapshots")
                 fi
@@ -219,7 +219,7 @@ maintenance_install_packages() {
 maintenance_configure_timeshift() {
     display_step "💾" "Configuring TimeShift"
 
-    if ! command -v timeshift >/dev/null 2>&1; then
+    if ! command_exists timeshift; then
         if supports_gum; then
             display_info "○ TimeShift not installed, skipping configuration"
         fi
@@ -279,7 +279,7 @@ maintenance_configure_snapper_settings() {
         return
     fi
 
-    if ! command -v snapper >/dev/null 2>&1; then
+    if ! command_exists snapper; then
         if supports_gum; then
             display_info "○ Snapper not installed, skipping configuration"
         else
@@ -319,24 +319,24 @@ maintenance_configure_snapper_settings() {
     # Configure Snapper settings for automatic snapshots
     local config_file="/etc/snapper/configs/root"
     if [ -f "$config_file" ]; then
-        # Disable timeline snapshots (only manual snapshots)
-        sed -i 's/^TIMELINE_CREATE=.*/TIMELINE_CREATE="no"/' "$config_file"
-        sed -i 's/^TIMELINE_CLEANUP=.*/TIMELINE_CLEANUP="no"/' "$config_file"
-
-        # Enable cleanup by number and empty snapshots
-        sed -i 's/^NUMBER_CLEANUP=.*/NUMBER_CLEANUP="yes"/' "$config_file"
-        sed -i 's/^EMPTY_CLEANUP=.*/EMPTY_CLEANUP="yes"/' "$config_file"
-
-        # Set snapshot limits
-        sed -i 's/^NUMBER_LIMIT=.*/NUMBER_LIMIT="10"/' "$config_file"
-        sed -i 's/^NUMBER_LIMIT_IMPORTANT=.*/NUMBER_LIMIT_IMPORTANT="10"/' "$config_file"
-
-        # Disable timeline limits since timeline is disabled
-        sed -i 's/^TIMELINE_LIMIT_HOURLY=.*/TIMELINE_LIMIT_HOURLY="0"/' "$config_file"
-        sed -i 's/^TIMELINE_LIMIT_DAILY=.*/TIMELINE_LIMIT_DAILY="0"/' "$config_file"
-        sed -i 's/^TIMELINE_LIMIT_WEEKLY=.*/TIMELINE_LIMIT_WEEKLY="0"/' "$config_file"
-        sed -i 's/^TIMELINE_LIMIT_MONTHLY=.*/TIMELINE_LIMIT_MONTHLY="0"/' "$config_file"
-        sed -i 's/^TIMELINE_LIMIT_YEARLY=.*/TIMELINE_LIMIT_YEARLY="0"/' "$config_file"
+        # Single sed pass over the config:
+        # - disable timeline snapshots (only manual snapshots)
+        # - enable cleanup by number and empty snapshots
+        # - set snapshot limits
+        # - disable timeline limits since timeline is disabled
+        sed -i \
+            -e 's/^TIMELINE_CREATE=.*/TIMELINE_CREATE="no"/' \
+            -e 's/^TIMELINE_CLEANUP=.*/TIMELINE_CLEANUP="no"/' \
+            -e 's/^NUMBER_CLEANUP=.*/NUMBER_CLEANUP="yes"/' \
+            -e 's/^EMPTY_CLEANUP=.*/EMPTY_CLEANUP="yes"/' \
+            -e 's/^NUMBER_LIMIT=.*/NUMBER_LIMIT="10"/' \
+            -e 's/^NUMBER_LIMIT_IMPORTANT=.*/NUMBER_LIMIT_IMPORTANT="10"/' \
+            -e 's/^TIMELINE_LIMIT_HOURLY=.*/TIMELINE_LIMIT_HOURLY="0"/' \
+            -e 's/^TIMELINE_LIMIT_DAILY=.*/TIMELINE_LIMIT_DAILY="0"/' \
+            -e 's/^TIMELINE_LIMIT_WEEKLY=.*/TIMELINE_LIMIT_WEEKLY="0"/' \
+            -e 's/^TIMELINE_LIMIT_MONTHLY=.*/TIMELINE_LIMIT_MONTHLY="0"/' \
+            -e 's/^TIMELINE_LIMIT_YEARLY=.*/TIMELINE_LIMIT_YEARLY="0"/' \
+            "$config_file"
 
         log_success "Snapper configuration updated"
     else
@@ -348,21 +348,19 @@ maintenance_configure_snapper_settings() {
     log_info "Enabling Snapper services"
     local services_enabled=true
 
-    # Enable and start the services
-    if ! systemctl enable snapper-cleanup.timer >/dev/null 2>&1; then
-        log_warn "Failed to enable snapper-cleanup.timer"
-        services_enabled=false
-    fi
-
-    if ! systemctl enable snapper-boot.timer >/dev/null 2>&1; then
-        log_warn "Failed to enable snapper-boot.timer"
-        services_enabled=false
+    # Enable and start both timers in a single systemctl call; the timers
+    # are only retried individually to find which one failed
+    local timers=(snapper-cleanup.timer snapper-boot.timer)
+    local timer
+    if ! systemctl enable --now "${timers[@]}" >/dev/null 2>&1; then
+        for timer in "${timers[@]}"; do
+            if ! systemctl enable --now "$timer" >/dev/null 2>&1; then
+                log_warn "Failed to enable $timer"
+                services_enabled=false
+            fi
+        done
     fi
 
-    # Start the timers
-    systemctl start snapper-cleanup.timer >/dev/null 2>&1 || true
-    systemctl start snapper-boot.timer >/dev/null 2>&1 || true
-
     if supports_gum; then
         if [ "$services_enabled" = true ]; then
             display_success "✓ Snapper services enabled" "Timeline snapshots: Disabled\nAutomatic cleanup: Enabled (keeps 10 snapshots)"
@@ -380,7 +378,7 @@ maintenance_configure_snapper_settings() {
     fi
 
     # Verify snap-pac hook is available if snap-pac is installed
-    if command -v snap-pac >/dev/null 2>&1; then
+    if command_exists snap-pac; then
         if [ -f "/usr/share/libalpm/hooks/50-snap-pac-pre.hook" ] && [ -f "/usr/share/libalpm/hooks/50-snap-pac-post.hook" ]; then
             log_info "snap-pac hooks are properly installed"
         else
@@ -406,7 +404,7 @@ maintenance_setup_pre_update_snapshots() {
     fi
 
     if [ "$DISTRO_ID" = "arch" ]; then
-        if ! command -v snapper >/dev/null 2>&1; then
+        if ! command_exists snapper; then
             if supports_gum; then
                 display_info "○ Snapper not available, skipping pre-update snapshots"
             fi
@@ -419,7 +417,7 @@ maintenance_setup_pre_update_snapshots() {
 
         mkdir -p "$HOOK_DIR"
 
-        cat << 'EOF' | tee "$HOOK_DIR/$HOOK_SCRIPT" >/dev/null
+        cat > "$HOOK_DIR/$HOOK_SCRIPT" << 'EOF'
 [Trigger]
 Operation = Upgrade
 Operation = Install
@@ -445,14 +443,14 @@ EOF
         fi
 
     else
-        if ! command -v timeshift >/dev/null 2>&1; then
+        if ! command_exists timeshift; then
             if supports_gum; then
                 display_info "○ TimeShift not available, skipping pre-update snapshots"
             fi
             return
         fi
 
-        cat << 'EOF' | tee /usr/local/bin/system-update-snapshot >/dev/null
+        cat > /usr/local/bin/system-update-snapshot << 'EOF'
 #!/bin/bash
 DESCRIPTION="${1:-Pre-update}"
 
@@ -489,7 +487,8 @@ maintenance_configure_grub_snapshots() {
     fi
 
     local bootloader
-    bootloader=$(detect_bootloader)
+    detect_bootloader
+    bootloader="$DETECTED_BOOTLOADER"
 
     local grub_update_command=""
 
@@ -501,7 +500,7 @@ maintenance_configure_grub_snapshots() {
     fi
 
     if [ "$DISTRO_ID" = "arch" ]; then
-        if ! pacman -Q grub-btrfs >/dev/null 2>&1; then
+        if ! is_package_installed grub-btrfs; then
             if supports_gum; then
                 display_progress "installing" "grub-btrfs"
                 install_packages_with_progress "grub-btrfs"
@@ -510,8 +509,10 @@ maintenance_configure_grub_snapshots() {
             fi
         fi
 
-        if command -v grub-btrfsd >/dev/null 2>&1; then
-            systemctl enable --now grub-btrfsd.service >/dev/null 2>&1
+        if command_exists grub-btrfsd; then
+            if ! systemctl enable --now grub-btrfsd.service >/dev/null 2>&1; then
+                log_warn "Failed to enable grub-btrfsd.service, snapshots won't be added to the GRUB menu automatically"
+            fi
         fi
 
         grub_update_command="grub-mkconfig"
@@ -522,9 +523,9 @@ maintenance_configure_grub_snapshots() {
             fi
         fi
 
-        if command -v grub-mkconfig >/dev/null 2>&1; then
+        if command_exists grub-mkconfig; then
             grub_update_command="grub-mkconfig"
-        elif command -v update-grub >/dev/null 2>&1; then
+        elif command_exists update-grub; then
             grub_update_command="update-grub"
         fi
     fi
@@ -546,7 +547,7 @@ maintenance_configure_grub_snapshots() {
 maintenance_configure_btrfs_assistant() {
     display_step "💾" "Configuring Btrfs Assistant"
 
-    if ! command -v btrfs-assistant >/dev/null 2>&1; then
+    if ! command_exists btrfs-assistant; then
         if supports_gum; then
             display_info "○ Btrfs Assistant not installed, skipping configuration"
         fi
@@ -564,7 +565,7 @@ maintenance_configure_btrfs_assistant() {
     mkdir -p "$config_dir"
 
     # Create Btrfs Assistant configuration with disabled timeline snapshots
-    cat << 'EOF' | tee "$config_file" >/dev/null
+    cat > "$config_file" << 'EOF'
 [General]
 Number Save=5
 
@@ -616,8 +617,12 @@ maintenance_configure_btrfs_snapshots() {
     # Setup pre/post-update snapshot hooks for all distros
     maintenance_setup_pre_update_snapshots
 
-    # Configure GRUB for snapshots (only if GRUB bootloader)
-    maintenance_configure_grub_snapshots
+    # Configure GRUB for snapshots; the step is left out entirely on
+    # systemd-boot and other bootloaders, where it has nothing to do
+    detect_bootloader
+    if [ "$DETECTED_BOOTLOADER" = "grub" ]; then
+        maintenance_configure_grub_snapshots
+    fi
 
     # Configure comprehensive Btrfs maintenance timers
     maintenance_configure_btrfs_maintenance
@@ -632,7 +637,7 @@ maintenance_configure_btrfs_snapshots() {
             fi
         fi
     else
-        if command -v timeshift >/dev/null 2>&1; then
+        if command_exists timeshift; then
             if timeshift --create --description "Initial snapshot after setup" >/dev/null 2>&1; then
                 if supports_gum; then
                 display_success "✓ Initial snapshot created"
@@ -655,8 +660,10 @@ maintenance_configure_automatic_updates() {
             fi
             # Configure dnf-automatic
             if [ -f /etc/dnf/automatic.conf ]; then
-                sed -i 's/^apply_updates = no/apply_updates = yes/' /etc/dnf/automatic.conf 2>/dev/null || true
-                sed -i 's/^upgrade_type = default/upgrade_type = security/' /etc/dnf/automatic.conf 2>/dev/null || true
+                sed -i \
+                    -e 's/^apply_updates = no/apply_updates = yes/' \
+                    -e 's/^upgrade_type = default/upgrade_type = security/' \
+                    /etc/dnf/automatic.conf 2>/dev/null || true
                 if systemctl enable --now dnf-automatic-install.timer >/dev/null 2>&1; then
                     if supports_gum; then
                         display_success "✓ dnf-automatic configured and enabled"
@@ -674,15 +681,19 @@ maintenance_configure_automatic_updates() {
             fi
             # Configure unattended-upgrades
             if [ -f /etc/apt/apt.conf.d/50unattended-upgrades ]; then
-                sed -i 's|//\("o=Debian,a=stable"\)|"\${distro_id}:\${distro_codename}-security"|' /etc/apt/apt.conf.d/50unattended-upgrades 2>/dev/null || true
-                sed -i 's|//Unattended-Upgrade::AutoFixInterruptedDpkg|Unattended-Upgrade::AutoFixInterruptedDpkg|' /etc/apt/apt.conf.d/50unattended-upgrades 2>/dev/null || true
-                sed -i 's|//Unattended-Upgrade::MinimalSteps|Unattended-Upgrade::MinimalSteps|' /etc/apt/apt.conf.d/50unattended-upgrades 2>/dev/null || true
-                sed -i 's|//Unattended-Upgrade::Remove-Unused-Dependencies|Unattended-Upgrade::Remove-Unused-Dependencies|' /etc/apt/apt.conf.d/50unattended-upgrades 2>/dev/null || true
+                sed -i \
+                    -e 's|//\("o=Debian,a=stable"\)|"\${distro_id}:\${distro_codename}-security"|' \
+                    -e 's|//Unattended-Upgrade::AutoFixInterruptedDpkg|Unattended-Upgrade::AutoFixInterruptedDpkg|' \
+                    -e 's|//Unattended-Upgrade::MinimalSteps|Unattended-Upgrade::MinimalSteps|' \
+                    -e 's|//Unattended-Upgrade::Remove-Unused-Dependencies|Unattended-Upgrade::Remove-Unused-Dependencies|' \
+                    /etc/apt/apt.conf.d/50unattended-upgrades 2>/dev/null || true
             fi
 
             if [ -f /etc/apt/apt.conf.d/20auto-upgrades ]; then
-                sed -i 's|APT::Periodic::Update-Package-Lists "0"|APT::Periodic::Update-Package-Lists "1"|' /etc/apt/apt.conf.d/20auto-upgrades 2>/dev/null || true
-                sed -i 's|APT::Periodic::Unattended-Upgrade "0"|APT::Periodic::Unattended-Upgrade "1"|' /etc/apt/apt.conf.d/20auto-upgrades 2>/dev/null || true
+                sed -i \
+                    -e 's|APT::Periodic::Update-Package-Lists "0"|APT::Periodic::Update-Package-Lists "1"|' \
+                    -e 's|APT::Periodic::Unattended-Upgrade "0"|APT::Periodic::Unattended-Upgrade "1"|' \
+                    /etc/apt/apt.conf.d/20auto-upgrades 2>/dev/null || true
             fi
 
             if systemctl enable --now unattended-upgrades >/dev/null 2>&1; then
@@ -740,10 +751,11 @@ maintenance_prompt_btrfs_snapshots() {
     else
         display_box "🗂️  Btrfs Snapshot Tools" "Your system uses Btrfs filesystem, which supports advanced snapshot features.\nSnapshots can protect your system from updates that break things."
         display_warning "Note: Snapshots use disk space and add complexity"
-        if [ "$INSTALL_BTRFS_SNAPSHOTS" = true ]; then
+        if [ "${INSTALL_BTRFS_SNAPSHOTS:-false}" = true ]; then
             display_success "✓ Btrfs snapshot tools will be installed and configured"
         else
             display_info "○ Skipping Btrfs snapshot tools"
+            return 1
         fi
     fi
 }
@@ -754,8 +766,8 @@ maintenance_main_config() {
     # Interactive prompt for Btrfs snapshot tools (only on Btrfs systems)
     if maintenance_prompt_btrfs_snapshots; then
         maintenance_install_packages
+        # Also sets up the pre-update snapshot hooks
         maintenance_configure_btrfs_snapshots
-        maintenance_setup_pre_update_snapshots
     else
         # Install only non-Btrfs maintenance packages
         maintenance_install_basic_packages
@@ -770,14 +782,17 @@ maintenance_main_config() {
         display_box "Maintenance Configuration Complete" "Your system is now configured for safety and maintenance:"
 
         if [ "${INSTALL_BTRFS_SNAPSHOTS:-false}" = "true" ]; then
-            display_success "✓ Snapshots: Protect against broken updates"
-            display_success "✓ Btrfs maintenance: Scheduled scrub and balance"
+            display_success_list \
+                "✓ Snapshots: Protect against broken updates" \
+                "✓ Btrfs maintenance: Scheduled scrub and balance"
             if [ "$DISTRO_ID" = "arch" ]; then
-                display_info "• View snapshots: snapper list"
-                display_info "• Restore snapshot: Select from boot menu"
+                display_info_list \
+                    "• View snapshots: snapper list" \
+                    "• Restore snapshot: Select from boot menu"
             else
-                display_info "• View snapshots: timeshift --list"
-                display_info "• Restore snapshot: timeshift --restore"
+                display_info_list \
+                    "• View snapshots: timeshift --list" \
+                    "• Restore snapshot: timeshift --restore"
             fi
         else
             display_info "○ Btrfs snapshots: Not configured (user choice)"
@@ -796,21 +811,27 @@ maintenance_configure_btrfs_maintenance() {
         display_info "Setting up comprehensive Btrfs maintenance schedules" "Weekly balance: /, /home, /var/log\nMonthly scrub: /, /home, /var/log\nWeekly defrag: /, /home"
     fi
 
+    # Timers are collected and enabled with a single daemon-reload and a
+    # single systemctl call once all unit files and overrides are written
+    local timers=()
+
     # Weekly balance for /, /home, and /var/log (Sundays at 1:00 AM)
-    if [ -f /etc/systemd/system/btrfs-balance@.timer ] || command -v btrfs-balance >/dev/null 2>&1; then
+    if [ -f /etc/systemd/system/btrfs-balance@.timer ] || command_exists btrfs-balance; then
         local mounts=("/" "/home" "/var/log")
         for mount in "${mounts[@]}"; do
             if mountpoint -q "$mount" 2>/dev/null; then
                 local mount_name
-                mount_name=$(echo "$mount" | sed 's|^/||; s|/|-|g; s|^$|root|')
+                mount_name="${mount#/}"
+                mount_name="${mount_name//\//-}"
+                mount_name="${mount_name:-root}"
                 mkdir -p "/etc/systemd/system/btrfs-balance@${mount_name}.timer.d"
 
-                cat << EOF | tee "/etc/systemd/system/btrfs-balance@${mount_name}.timer.d/override.conf" >/dev/null
+                cat > "/etc/systemd/system/btrfs-balance@${mount_name}.timer.d/override.conf" << EOF
 [Timer]
 OnCalendar=Sun *-*-* 01:00:00
 Persistent=true
 EOF
-                systemctl enable --now "btrfs-balance@${mount_name}.timer" >/dev/null 2>&1
+                timers+=("btrfs-balance@${mount_name}.timer")
             fi
         done
         if supports_gum; then
@@ -819,20 +840,22 @@ EOF
     fi
 
     # Monthly scrub for /, /home, and /var/log (1st of month at 2:00 AM)
-    if [ -f /etc/systemd/system/btrfs-scrub@.timer ] || command -v btrfs-scrub >/dev/null 2>&1; then
+    if [ -f /etc/systemd/system/btrfs-scrub@.timer ] || command_exists btrfs-scrub; then
         local mounts=("/" "/home" "/var/log")
         for mount in "${mounts[@]}"; do
             if mountpoint -q "$mount" 2>/dev/null; then
                 local mount_name
-                mount_name=$(echo "$mount" | sed 's|^/||; s|/|-|g; s|^$|root|')
+                mount_name="${mount#/}"
+                mount_name="${mount_name//\//-}"
+                mount_name="${mount_name:-root}"
                 mkdir -p "/etc/systemd/system/btrfs-scrub@${mount_name}.timer.d"
 
-                cat << EOF | tee "/etc/systemd/system/btrfs-scrub@${mount_name}.timer.d/override.conf" >/dev/null
+                cat > "/etc/systemd/system/btrfs-scrub@${mount_name}.timer.d/override.conf" << EOF
 [Timer]
 OnCalendar=*-*-01 02:00:00
 Persistent=true
 EOF
-                systemctl enable --now "btrfs-scrub@${mount_name}.timer" >/dev/null 2>&1
+                timers+=("btrfs-scrub@${mount_name}.timer")
             fi
         done
         if supports_gum; then
@@ -842,9 +865,9 @@ EOF
 
     # Weekly defrag for / and /home (Saturdays at 3:00 AM)
     # Note: Btrfs defrag is typically done via a custom service since systemd doesn't have a built-in defrag timer
-    if command -v btrfs >/dev/null 2>&1; then
+    if command_exists btrfs; then
         # Create custom defrag service
-        cat << 'EOF' | tee /etc/systemd/system/btrfs-defrag.service >/dev/null
+        cat > /etc/systemd/system/btrfs-defrag.service << 'EOF'
 [Unit]
 Description=Btrfs defragmentation
 ConditionPathIsMountPoint=/
@@ -855,7 +878,7 @@ Type=oneshot
 ExecStart=/usr/bin/bash -c 'for mount in / /home; do if mountpoint -q "$mount"; then echo "Defragmenting $mount..."; btrfs filesystem defrag -r "$mount"; fi; done'
 EOF
 
-        cat << 'EOF' | tee /etc/systemd/system/btrfs-defrag.timer >/dev/null
+        cat > /etc/systemd/system/btrfs-defrag.timer << 'EOF'
 [Unit]
 Description=Weekly Btrfs defragmentation
 Requires=btrfs-defrag.service
@@ -868,31 +891,37 @@ Persistent=true
 WantedBy=timers.target
 EOF
 
-        systemctl daemon-reload >/dev/null 2>&1
-        systemctl enable --now btrfs-defrag.timer >/dev/null 2>&1
+        timers+=("btrfs-defrag.timer")
 
         if supports_gum; then
             display_success "✓ Weekly defrag scheduled for /, /home (Saturdays 3:00 AM)"
         fi
     fi
 
+    # The timers are only retried individually to find which one failed
+    if [ ${#timers[@]} -gt 0 ]; then
+        systemctl daemon-reload >/dev/null 2>&1
+        if ! systemctl enable --now "${timers[@]}" >/dev/null 2>&1; then
+            local timer timers_enabled=true
+            for timer in "${timers[@]}"; do
+                if ! systemctl enable --now "$timer" >/dev/null 2>&1; then
+                    log_warn "Failed to enable $timer"
+                    timers_enabled=false
+                fi
+            done
+            if [ "$timers_enabled" = false ]; then
+                if supports_gum; then
+                    display_error "✗ Some Btrfs maintenance timers failed to enable"
+                else
+                    log_error "Some Btrfs maintenance timers failed to enable"
+                fi
+            fi
+        fi
+    fi
+
     if supports_gum; then
         echo ""
         display_info "Btrfs maintenance schedules configured:" "• Balance: Weekly (Sun 1:00) - / /home /var/log\n• Scrub: Monthly (1st 2:00) - / /home /var/log\n• Defrag: Weekly (Sat 3:00) - / /home"
         echo ""
     fi
 }
-
-# Export functions for use by main installer
-export -f maintenance_main_config
-export -f maintenance_prompt_btrfs_snapshots
-export -f maintenance_install_packages
-export -f maintenance_install_basic_packages
-export -f maintenance_configure_btrfs_snapshots
-export -f maintenance_configure_btrfs_assistant
-export -f maintenance_configure_btrfs_maintenance
-export -f maintenance_configure_automatic_updates
-export -f maintenance_configure_timeshift
-export -f maintenance_configure_snapper_settings
-export -f maintenance_setup_pre_update_snapshots
-export -f maintenance_configure_grub_snapshots
@@ -4,7 +4,7 @@ set -uo pipefail
 # Performance Optimization Module for LinuxInstaller
 # Based on best practices from all installers
 
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+SCRIPT_DIR="${SCRIPTS_DIR:-$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)}"
 source "$SCRIPT_DIR/common.sh"
 source "$SCRIPT_DIR/distro_check.sh"
 
@@ -40,7 +40,7 @@ performance_configure_swappiness() {
 
     # Optimize swappiness for performance
     if [ -f /proc/sys/vm/swappiness ]; then
-        echo 10 | tee /proc/sys/vm/swappiness >/dev/null 2>&1
+        write_sys_value 10 /proc/sys/vm/swappiness
         log_success "Optimized swappiness for performance (set to 10)"
     fi
 
@@ -62,7 +62,7 @@ performance_configure_swappiness() {
 
     # Check if setting already exists
     if ! grep -q "vm.swappiness" "$sysctl_file" 2>/dev/null; then
-        echo "vm.swappiness=10" | tee -a "$sysctl_file" >/dev/null 2>&1
+        { echo "vm.swappiness=10" >> "$sysctl_file"; } 2>/dev/null
         log_info "Made swappiness setting persistent in $sysctl_file"
     else
         log_info "Swappiness setting already configured in $sysctl_file"
@@ -75,7 +75,7 @@ performance_configure_cpu_governor() {
 
     # Enable performance governor for better performance
     if [ -f /sys/devices/system/cpu/cpu0/cpufreq/scaling_governor ]; then
-        echo performance | tee /sys/devices/system/cpu/cpu*/cpufreq/scaling_governor >/dev/null 2>&1
+        write_sys_value performance /sys/devices/system/cpu/cpu*/cpufreq/scaling_governor
         log_success "Set CPU governor to performance"
     fi
 
@@ -103,7 +103,7 @@ performance_configure_filesystem() {
     display_step "💾" "Configuring Filesystem Performance"
 
     # Enable TRIM for SSDs
-    if ls /sys/block/*/queue/discard_max_bytes >/dev/null 2>&1; then
+    if has_ssd; then
         systemctl enable --now fstrim.timer >/dev/null 2>&1
         log_success "Enabled TRIM for SSD optimization"
     fi
@@ -174,18 +174,23 @@ performance_configure_services() {
 performance_configure_microcode() {
     display_step "🔧" "Configuring CPU Microcode Updates"
 
-    # Detect CPU vendor
+    # Detect CPU vendor from the vendor_id field (flags like amd_lbr_v2 can appear on Intel)
     local cpu_vendor=""
-    if grep -qi "amd" /proc/cpuinfo; then
-        cpu_vendor="amd"
-        log_info "AMD CPU detected"
-    elif grep -qi "intel" /proc/cpuinfo; then
-        cpu_vendor="intel"
-        log_info "Intel CPU detected"
-    else
-        log_warn "Unknown CPU vendor - skipping microcode installation"
-        return 0
-    fi
+    detect_cpu_vendor
+    case "$DETECTED_CPU_VENDOR" in
+        AuthenticAMD)
+            cpu_vendor="amd"
+            log_info "AMD CPU detected"
+            ;;
+        GenuineIntel)
+            cpu_vendor="intel"
+            log_info "Intel CPU detected"
+            ;;
+        *)
+            log_warn "Unknown CPU vendor - skipping microcode installation"
+            return 0
+            ;;
+    esac
 
     # Determine correct package name based on distro and CPU vendor
     local microcode_package=""
@@ -237,29 +242,24 @@ performance_configure_microcode() {
 performance_install_performance_packages() {
     display_step "📦" "Installing Performance Packages"
 
-    # Install performance essential packages
-    if [ ${#PERFORMANCE_ESSENTIALS[@]} -gt 0 ]; then
-        install_packages_with_progress "${PERFORMANCE_ESSENTIALS[@]}"
-    fi
-
-    # Install distribution-specific performance packages
+    # Essential and distribution-specific performance packages are installed
+    # together in one package manager transaction
+    local packages=("${PERFORMANCE_ESSENTIALS[@]}")
     case "$DISTRO_ID" in
         "arch")
-            if [ ${#PERFORMANCE_ARCH[@]} -gt 0 ]; then
-                install_packages_with_progress "${PERFORMANCE_ARCH[@]}"
-            fi
+            packages+=("${PERFORMANCE_ARCH[@]}")
             ;;
         "fedora")
-            if [ ${#PERFORMANCE_FEDORA[@]} -gt 0 ]; then
-                install_packages_with_progress "${PERFORMANCE_FEDORA[@]}"
-            fi
+            packages+=("${PERFORMANCE_FEDORA[@]}")
             ;;
         "debian"|"ubuntu")
-            if [ ${#PERFORMANCE_DEBIAN[@]} -gt 0 ]; then
-                install_packages_with_progress "${PERFORMANCE_DEBIAN[@]}"
-            fi
+            packages+=("${PERFORMANCE_DEBIAN[@]}")
             ;;
     esac
+
+    if [ ${#packages[@]} -gt 0 ]; then
+        install_packages_with_progress "${packages[@]}"
+    fi
 }
 
 # Configure Btrfs filesystem performance optimizations
@@ -281,10 +281,25 @@ performance_configure_btrfs() {
 
         # Configure Btrfs maintenance
         if [ -f /usr/bin/btrfs ]; then
-            systemctl enable --now btrfs-scrub@-.timer >/dev/null 2>&1
-            systemctl enable --now btrfs-balance@-.timer >/dev/null 2>&1
-            systemctl enable --now btrfs-defrag@-.timer >/dev/null 2>&1
-            log_success "Btrfs maintenance services enabled"
+            # systemctl enable rejects the whole batch if one unit is missing
+            # (not every distro ships all three templates), so a failed batch
+            # is retried per unit and only the enabled ones are reported
+            local timers=(btrfs-scrub@-.timer btrfs-balance@-.timer btrfs-defrag@-.timer)
+            local enabled_timers=() timer
+            if systemctl enable --now "${timers[@]}" >/dev/null 2>&1; then
+                enabled_timers=("${timers[@]}")
+            else
+                for timer in "${timers[@]}"; do
+                    if systemctl enable --now "$timer" >/dev/null 2>&1; then
+                        enabled_timers+=("$timer")
+                    else
+                        log_warn "Failed to enable $timer"
+                    fi
+                done
+            fi
+            if [ ${#enabled_timers[@]} -gt 0 ]; then
+                log_success "Btrfs maintenance services enabled: ${enabled_timers[*]}"
+            fi
         fi
     else
         log_info "Btrfs filesystem not detected, skipping Btrfs optimizations"
@@ -298,14 +313,16 @@ performance_configure_gaming() {
     if [ "$INSTALL_MODE" == "gaming" ] || [ "$INSTALL_MODE" == "standard" ]; then
         # Enable performance governor for gaming
         if [ -f /sys/devices/system/cpu/cpu0/cpufreq/scaling_governor ]; then
-            echo performance | tee /sys/devices/system/cpu/cpu*/cpufreq/scaling_governor >/dev/null 2>&1
+            write_sys_value performance /sys/devices/system/cpu/cpu*/cpufreq/scaling_governor
             log_success "Set CPU governor to performance for gaming"
         fi
 
         # Configure audio latency
         if [ -f /etc/pulse/daemon.conf ]; then
-            sed -i 's/^;default-fragments = 4/default-fragments = 2/' /etc/pulse/daemon.conf 2>/dev/null || true
-            sed -i 's/^;default-fragment-size-msec = 25/default-fragment-size-msec = 10/' /etc/pulse/daemon.conf 2>/dev/null || true
+            sed -i \
+                -e 's/^;default-fragments = 4/default-fragments = 2/' \
+                -e 's/^;default-fragment-size-msec = 25/default-fragment-size-msec = 10/' \
+                /etc/pulse/daemon.conf 2>/dev/null || true
             log_success "Audio latency optimized for gaming"
         fi
     fi
@@ -334,16 +351,3 @@ performance_main_config() {
 
     performance_configure_gaming
 }
-
-# Export functions for use by main installer
-export -f performance_main_config
-export -f performance_configure_microcode
-export -f performance_configure_swappiness
-export -f performance_configure_cpu_governor
-export -f performance_configure_filesystem
-export -f performance_configure_network
-export -f performance_configure_kernel
-export -f performance_configure_services
-
-export -f performance_configure_btrfs
-export -f performance_configure_gaming
@@ -8,7 +8,7 @@
 # Designed to be sourced by the main installer (install.sh).
 set -uo pipefail
 
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+SCRIPT_DIR="${SCRIPTS_DIR:-$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)}"
 # Common helpers (log_* , step, install_pkg, supports_gum, etc.)
 # These are present in the main install environment; sourcing here if available.
 if [ -f "$SCRIPT_DIR/common.sh" ]; then
@@ -31,22 +31,43 @@ detect_system_info() {
     # - DETECTED_RAM
     DETECTED_OS="${PRETTY_NAME:-$(uname -srv)}"
 
-    # CPU (prefer lscpu)
-    if command -v lscpu >/dev/null 2>&1; then
+    # CPU: model name from the shared /proc/cpuinfo cache; lscpu is only
+    # needed where cpuinfo has no model name (e.g. many ARM boards)
+    load_cpuinfo
+    DETECTED_CPU="$DETECTED_CPU_MODEL"
+    if [ -z "$DETECTED_CPU" ] && command_exists lscpu; then
         DETECTED_CPU="$(lscpu 2>/dev/null | awk -F: '/^Model name:/ {print $2; exit}' | xargs || true)"
-    else
-        # Fallback to /proc/cpuinfo
-        DETECTED_CPU="$(awk -F: '/model name/{print $2; exit}' /proc/cpuinfo | xargs || true)"
-        [ -z "$DETECTED_CPU" ] && DETECTED_CPU="$(uname -m)"
     fi
-
-    # GPU (prefer lspci)
-    if command -v lspci >/dev/null 2>&1; then
-        # pick first VGA or 3D controller entry
-        DETECTED_GPU="$(lspci 2>/dev/null | grep -E 'VGA|3D' | head -n1 | sed -E 's/^.*: //; s/\\s*\\[.*\\]$//' | xargs || true)"
+    [ -z "$DETECTED_CPU" ] && DETECTED_CPU="$(uname -m)"
+
+    # GPU: first display controller from the sysfs PCI scan, shown with its
+    # lspci model name, or by kernel driver and PCI IDs without lspci
+    DETECTED_GPU=""
+    scan_gpu_devices
+    load_gpu_model_names
+    if [ ${#GPU_DEVICES[@]} -gt 0 ]; then
+        local gpu_slot gpu_vendor gpu_device gpu_name line driver=""
+        read -r gpu_slot gpu_vendor gpu_device <<< "${GPU_DEVICES[0]}"
+        case "$gpu_vendor" in
+            "$GPU_AMD") gpu_name="AMD" ;;
+            "$GPU_INTEL") gpu_name="Intel" ;;
+            "$GPU_NVIDIA") gpu_name="NVIDIA" ;;
+            *) gpu_name="Display controller" ;;
+        esac
+        if [ -n "${GPU_MODEL_NAMES[$gpu_slot]:-}" ]; then
+            DETECTED_GPU="$gpu_name ${GPU_MODEL_NAMES[$gpu_slot]}"
+        else
+            if [ -r "/sys/bus/pci/devices/$gpu_slot/uevent" ]; then
+                while IFS= read -r line; do
+                    [[ "$line" == DRIVER=* ]] && driver="${line#DRIVER=}"
+                done < "/sys/bus/pci/devices/$gpu_slot/uevent"
+            fi
+            [ -n "$driver" ] && gpu_name+=" ($driver)"
+            DETECTED_GPU="$gpu_name [${gpu_vendor#0x}:${gpu_device#0x}]"
+        fi
     else
         # Use glxinfo if available
-        if command -v glxinfo >/dev/null 2>&1; then
+        if command_exists glxinfo; then
             DETECTED_GPU="$(glxinfo -B 2>/dev/null | awk -F: '/Device:/ {print $2; exit}' | xargs || true)"
         else
             DETECTED_GPU="Unknown"
@@ -54,23 +75,24 @@ detect_system_info() {
     fi
     [ -z "$DETECTED_GPU" ] && DETECTED_GPU="Unknown"
 
-    # RAM (human friendly)
-    if command -v free >/dev/null 2>&1; then
-        DETECTED_RAM="$(free -h | awk '/Mem:/ {print $2}' | xargs || true)"
-    else
-        # Fallback to /proc/meminfo in KB -> convert to MiB
-        memkb="$(awk '/MemTotal/ {print $2; exit}' /proc/meminfo || true)"
-        if [ -n "$memkb" ]; then
-            DETECTED_RAM="$(awk -v kb="$memkb" 'BEGIN{ printf \"%.0fM\", kb/1024 }')"
+    # RAM (human friendly): MemTotal is the first line of /proc/meminfo, so a
+    # single read replaces the free/awk/xargs pipeline
+    local mem_key="" memkb=""
+    read -r mem_key memkb _ < /proc/meminfo 2>/dev/null || true
+    if [ "$mem_key" = "MemTotal:" ] && [[ "$memkb" =~ ^[0-9]+$ ]]; then
+        if [ "$memkb" -ge 1048576 ]; then
+            local ram_tenths=$(( (memkb * 10 + 524288) / 1048576 ))
+            DETECTED_RAM="$(( ram_tenths / 10 )).$(( ram_tenths % 10 ))Gi"
         else
-            DETECTED_RAM="Unknown"
+            DETECTED_RAM="$(( memkb >> 10 ))Mi"
         fi
+    else
+        DETECTED_RAM="Unknown"
     fi
 
     # Expose short CPU vendor detection
-    CPU_VENDOR="$(awk -F: '/^vendor_id/ {print $2; exit}' /proc/cpuinfo || true)"
-    [ -z "$CPU_VENDOR" ] && CPU_VENDOR="$(awk -F: '/^vendor_id/ {print $2; exit}' /proc/cpuinfo || true)"
-    CPU_VENDOR="${CPU_VENDOR:-Unknown}"
+    detect_cpu_vendor
+    CPU_VENDOR="${DETECTED_CPU_VENDOR:-Unknown}"
 
     # Provide global variables for other scripts
     export DETECTED_OS DETECTED_CPU DETECTED_GPU DETECTED_RAM CPU_VENDOR
@@ -112,11 +134,11 @@ _try_install() {
                 return 0
             fi
             display_progress "installing" "$pkg"
-            if command -v apt-get >/dev/null 2>&1; then
+            if command_exists apt-get; then
                 apt-get install -y "$pkg" >/dev/null 2>&1 && display_success "✓ $pkg installed" && return 0
-            elif command -v dnf >/dev/null 2>&1; then
+            elif command_exists dnf; then
                 dnf install -y "$pkg" >/dev/null 2>&1 && display_success "✓ $pkg installed" && return 0
-            elif command -v pacman >/dev/null 2>&1; then
+            elif command_exists pacman; then
                 pacman -S --noconfirm "$pkg" >/dev/null 2>&1 && display_success "✓ $pkg installed" && return 0
             fi
             display_error "✗ Failed to install $pkg"
@@ -135,7 +157,7 @@ configure_power_management() {
     fi
 
     # 1) Prefer power-profiles-daemon (modern desktops)
-    if command -v powerprofilesctl >/dev/null 2>&1; then
+    if command_exists powerprofilesctl; then
         log_info "power-profiles-daemon detected"
         if systemctl enable --now power-profiles-daemon >/dev/null 2>&1; then
             log_success "power-profiles-daemon enabled"
@@ -158,7 +180,7 @@ configure_power_management() {
 
     # Try to install power-profiles-daemon first (user preference)
     if _try_install power-profiles-daemon; then
-        if command -v powerprofilesctl >/dev/null 2>&1; then
+        if command_exists powerprofilesctl; then
             log_success "power-profiles-daemon installed"
             if systemctl enable --now power-profiles-daemon >/dev/null 2>&1; then
                 log_success "power-profiles-daemon enabled"
@@ -176,7 +198,8 @@ configure_power_management() {
     fi
 
     # 2) If cpufreq exists on this system, prefer cpupower (governor etc.)
-    if [ -d /sys/devices/system/cpu/cpu0/cpufreq ] || grep -q -i 'cpufreq' /proc/cpuinfo 2>/dev/null; then
+    load_cpuinfo
+    if [ -d /sys/devices/system/cpu/cpu0/cpufreq ] || [[ "${CPUINFO_TEXT,,}" == *cpufreq* ]]; then
         log_info "cpufreq subsystem detected; attempting cpupower install"
         # Try common package names in order
         if _try_install cpupower linux-cpupower cpufrequtils; then
@@ -188,7 +211,7 @@ configure_power_management() {
             fi
 
             # Try to set governor to performance for gaming
-            if command -v cpupower >/dev/null 2>&1; then
+            if command_exists cpupower; then
                 if [ "${INSTALL_GAMING:-false}" = "true" ]; then
                     cpupower frequency-set -g performance >/dev/null 2>&1 || true
                 fi
@@ -202,7 +225,7 @@ configure_power_management() {
     fi
 
     # 3) Fallback to tuned (legacy / older systems)
-    if command -v tuned-adm >/dev/null 2>&1; then
+    if command_exists tuned-adm; then
         log_info "tuned already installed"
         if systemctl enable --now tuned >/dev/null 2>&1; then
             log_success "tuned enabled"
@@ -223,8 +246,3 @@ configure_power_management() {
     log_warn "No suitable power management tool was installed. You can try installing 'power-profiles-daemon', 'cpupower' or 'tuned' manually."
     return 1
 }
-
-# Export the main helpers so the installer can call them if the file is sourced.
-export -f detect_system_info
-export -f show_system_info
-export -f configure_power_management
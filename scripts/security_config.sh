@@ -4,7 +4,7 @@ set -uo pipefail
 # Security Configuration Module for LinuxInstaller
 # Based on best practices from all installers
 
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+SCRIPT_DIR="${SCRIPTS_DIR:-$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)}"
 source "$SCRIPT_DIR/common.sh"
 source "$SCRIPT_DIR/distro_check.sh"
 
@@ -38,29 +38,24 @@ SECURITY_DEBIAN=(
 security_install_packages() {
     display_step "🔒" "Installing Security Packages"
 
-    # Install security essential packages
-    if [ ${#SECURITY_ESSENTIALS[@]} -gt 0 ]; then
-        install_packages_with_progress "${SECURITY_ESSENTIALS[@]}"
-    fi
-
-    # Install distribution-specific security packages
+    # Essential and distribution-specific security packages are installed
+    # together in one package manager transaction
+    local packages=("${SECURITY_ESSENTIALS[@]}")
     case "$DISTRO_ID" in
         "arch")
-            if [ ${#SECURITY_ARCH[@]} -gt 0 ]; then
-                install_packages_with_progress "${SECURITY_ARCH[@]}"
-            fi
+            packages+=("${SECURITY_ARCH[@]}")
             ;;
         "fedora")
-            if [ ${#SECURITY_FEDORA[@]} -gt 0 ]; then
-                install_packages_with_progress "${SECURITY_FEDORA[@]}"
-            fi
+            packages+=("${SECURITY_FEDORA[@]}")
             ;;
         "debian"|"ubuntu")
-            if [ ${#SECURITY_DEBIAN[@]} -gt 0 ]; then
-                install_packages_with_progress "${SECURITY_DEBIAN[@]}"
-            fi
+            packages+=("${SECURITY_DEBIAN[@]}")
             ;;
     esac
+
+    if [ ${#packages[@]} -gt 0 ]; then
+        install_packages_with_progress "${packages[@]}"
+    fi
 }
 
 # Configure Fail2ban intrusion prevention system
@@ -76,14 +71,14 @@ security_configure_fail2ban() {
             cp /etc/fail2ban/jail.conf /etc/fail2ban/jail.local
         fi
 
-        # Configure fail2ban settings
-        sed -i 's/^backend = auto/backend = systemd/' /etc/fail2ban/jail.local 2>/dev/null || true
-        sed -i 's/^bantime  = 10m/bantime = 1h/' /etc/fail2ban/jail.local 2>/dev/null || true
-        sed -i 's/^findtime  = 10m/findtime = 10m/' /etc/fail2ban/jail.local 2>/dev/null || true
-        sed -i 's/^maxretry = 5/maxretry = 3/' /etc/fail2ban/jail.local 2>/dev/null || true
-
-        # Enable SSH jail
-        sed -i 's/^enabled = false/enabled = true/' /etc/fail2ban/jail.local 2>/dev/null || true
+        # Configure fail2ban settings and enable the SSH jail in one pass
+        sed -i \
+            -e 's/^backend = auto/backend = systemd/' \
+            -e 's/^bantime  = 10m/bantime = 1h/' \
+            -e 's/^findtime  = 10m/findtime = 10m/' \
+            -e 's/^maxretry = 5/maxretry = 3/' \
+            -e 's/^enabled = false/enabled = true/' \
+            /etc/fail2ban/jail.local 2>/dev/null || true
     fi
 
     # Enable and start fail2ban service
@@ -99,8 +94,8 @@ security_configure_firewall() {
     display_step "🔥" "Configuring Firewall"
 
     case "$DISTRO_ID" in
-        "arch")
-            # Configure UFW for Arch
+        "arch"|"debian"|"ubuntu")
+            # Configure UFW for Arch/Debian/Ubuntu
             ufw default deny incoming >/dev/null 2>&1
             ufw default allow outgoing >/dev/null 2>&1
             ufw limit ssh >/dev/null 2>&1
@@ -113,8 +108,8 @@ security_configure_firewall() {
             fi
 
             # Force enable without prompt, and ensure the ufw systemd service is enabled so rules persist across reboot
-            echo "y" | ufw enable >/dev/null 2>&1 || true
-            if command -v systemctl >/dev/null 2>&1; then
+            ufw --force enable >/dev/null 2>&1 || true
+            if command_exists systemctl; then
                 if systemctl enable --now ufw >/dev/null 2>&1; then
                     log_success "UFW enabled and will start on boot"
                 else
@@ -125,7 +120,7 @@ security_configure_firewall() {
             ;;
         "fedora")
             # Configure firewalld for Fedora
-            if command -v firewall-cmd >/dev/null 2>&1; then
+            if command_exists firewall-cmd; then
                 if systemctl enable --now firewalld >/dev/null 2>&1; then
                     firewall-cmd --set-default-zone=public >/dev/null 2>&1
                     firewall-cmd --permanent --add-service=ssh >/dev/null 2>&1
@@ -136,8 +131,7 @@ security_configure_firewall() {
                             log_success "KDE Connect service allowed in firewall"
                         else
                             # Fallback: manually allow KDE Connect ports
-                            firewall-cmd --permanent --add-port=1714-1764/udp >/dev/null 2>&1
-                            firewall-cmd --permanent --add-port=1714-1764/tcp >/dev/null 2>&1
+                            firewall-cmd --permanent --add-port=1714-1764/udp --add-port=1714-1764/tcp >/dev/null 2>&1
                             log_success "KDE Connect ports (1714-1764) allowed in firewall"
                         fi
                     fi
@@ -149,30 +143,6 @@ security_configure_firewall() {
                 fi
             fi
             ;;
-        "debian"|"ubuntu")
-            # Configure UFW for Debian/Ubuntu
-            ufw default deny incoming >/dev/null 2>&1
-            ufw default allow outgoing >/dev/null 2>&1
-            ufw limit ssh >/dev/null 2>&1
-
-            # Allow KDE Connect if KDE is detected
-            if [ "${XDG_CURRENT_DESKTOP:-}" = "KDE" ]; then
-                ufw allow 1714:1764/udp >/dev/null 2>&1
-                ufw allow 1714:1764/tcp >/dev/null 2>&1
-                log_success "KDE Connect ports (1714-1764 UDP/TCP) allowed in UFW"
-            fi
-
-            # Force enable without prompt, and ensure the ufw systemd service is enabled so rules persist across reboot
-            echo "y" | ufw enable >/dev/null 2>&1 || true
-            if command -v systemctl >/dev/null 2>&1; then
-                if systemctl enable --now ufw >/dev/null 2>&1; then
-                    log_success "UFW enabled and will start on boot"
-                else
-                    log_warn "Failed to enable ufw.service; firewall may not persist across reboot"
-                fi
-            fi
-            log_success "UFW configured with SSH and KDE Connect (if applicable)"
-            ;;
     esac
 }
 
@@ -181,7 +151,7 @@ security_configure_apparmor() {
     display_step "🛡️" "Configuring AppArmor"
 
     if [ "$DISTRO_ID" == "arch" ] || [ "$DISTRO_ID" == "debian" ] || [ "$DISTRO_ID" == "ubuntu" ]; then
-        if command -v apparmor_parser >/dev/null 2>&1; then
+        if command_exists apparmor_parser; then
             # Enable AppArmor
             if systemctl enable --now apparmor >/dev/null 2>&1; then
                 log_success "AppArmor enabled and started"
@@ -201,7 +171,7 @@ security_configure_selinux() {
     display_step "🛡️" "Configuring SELinux"
 
     if [ "$DISTRO_ID" == "fedora" ]; then
-        if command -v sestatus >/dev/null 2>&1; then
+        if command_exists sestatus; then
             # Check SELinux status
             local selinux_status=$(sestatus | grep "SELinux status" | awk '{print $3}')
             if [ "$selinux_status" == "enabled" ]; then
@@ -223,12 +193,14 @@ security_configure_ssh() {
         log_info "Configuring SSH security settings..."
 
         # Apply security settings
-        sed -i 's/^#PermitRootLogin yes/PermitRootLogin no/' /etc/ssh/sshd_config 2>/dev/null || true
-        sed -i 's/^#PasswordAuthentication yes/PasswordAuthentication yes/' /etc/ssh/sshd_config 2>/dev/null || true
-        sed -i 's/^#PubkeyAuthentication yes/PubkeyAuthentication yes/' /etc/ssh/sshd_config 2>/dev/null || true
-        sed -i 's/^#MaxAuthTries 6/MaxAuthTries 3/' /etc/ssh/sshd_config 2>/dev/null || true
-        sed -i 's/^#ClientAliveInterval 0/ClientAliveInterval 300/' /etc/ssh/sshd_config 2>/dev/null || true
-        sed -i 's/^#ClientAliveCountMax 3/ClientAliveCountMax 2/' /etc/ssh/sshd_config 2>/dev/null || true
+        sed -i \
+            -e 's/^#PermitRootLogin yes/PermitRootLogin no/' \
+            -e 's/^#PasswordAuthentication yes/PasswordAuthentication yes/' \
+            -e 's/^#PubkeyAuthentication yes/PubkeyAuthentication yes/' \
+            -e 's/^#MaxAuthTries 6/MaxAuthTries 3/' \
+            -e 's/^#ClientAliveInterval 0/ClientAliveInterval 300/' \
+            -e 's/^#ClientAliveCountMax 3/ClientAliveCountMax 2/' \
+            /etc/ssh/sshd_config 2>/dev/null || true
 
         # Restart SSH service
         if systemctl restart sshd >/dev/null 2>&1; then
@@ -254,7 +226,7 @@ security_configure_user_groups() {
     fi
 
     # Docker group check
-    if command -v docker >/dev/null; then groups+=("docker"); fi
+    if command_exists docker; then groups+=("docker"); fi
 
     log_info "Adding user to groups: ${groups[*]}"
     for group in "${groups[@]}"; do
@@ -296,13 +268,3 @@ security_main_config() {
 
     log_success "Security configuration completed"
 }
-
-# Export functions for use by main installer
-export -f security_main_config
-export -f security_install_packages
-export -f security_configure_fail2ban
-export -f security_configure_firewall
-export -f security_configure_apparmor
-export -f security_configure_selinux
-export -f security_configure_ssh
-export -f security_configure_user_groups
@@ -17,7 +17,7 @@ set -uo pipefail
 # - Exposes function `wakeonlan_main_config` which linuxinstaller can call
 # =============================================================================
 
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+SCRIPT_DIR="${SCRIPTS_DIR:-$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)}"
 
 # Load common helpers and distro detection (required for install_pkg, logging, state)
 if [ -f "$SCRIPT_DIR/common.sh" ]; then
@@ -56,7 +56,7 @@ is_wifi_interface() {
     
     # Method 3: Check if it's a wireless device via uevent
     if [ -f "/sys/class/net/$iface/device/uevent" ]; then
-        if grep -qi "wifi\|wlan\|wireless" "/sys/class/net/$iface/device/uevent" 2>/dev/null; then
+        if LC_ALL=C grep -aqi "wifi\|wlan\|wireless" "/sys/class/net/$iface/device/uevent" 2>/dev/null; then
             return 0
         fi
     fi
@@ -71,7 +71,7 @@ is_wifi_interface() {
     fi
     
     # Method 5: Use iwconfig if available (legacy but reliable)
-    if command -v iwconfig >/dev/null 2>&1; then
+    if command_exists iwconfig; then
         if iwconfig "$iface" 2>/dev/null | grep -q "no wireless extensions\|IEEE 802.11"; then
             # If it has wireless extensions or mentions 802.11, it's wireless
             if ! iwconfig "$iface" 2>/dev/null | grep -q "no wireless extensions"; then
@@ -104,7 +104,7 @@ is_virtual_interface() {
     
     # Check if device is virtual via uevent
     if [ -f "/sys/class/net/$iface/device/uevent" ]; then
-        if grep -qi "virtual\|bridge\|tunnel" "/sys/class/net/$iface/device/uevent" 2>/dev/null; then
+        if LC_ALL=C grep -aqi "virtual\|bridge\|tunnel" "/sys/class/net/$iface/device/uevent" 2>/dev/null; then
             return 0
         fi
     fi
@@ -156,22 +156,27 @@ is_lan_interface() {
 detect_wired_interfaces() {
     local lan_interfaces=()
     
-    # Get all network interfaces
-    local all_interfaces=()
-    while IFS= read -r iface; do
-        # Skip empty lines
-        [ -n "$iface" ] && all_interfaces+=("$iface")
-    done < <(ip -o link show 2>/dev/null | awk -F': ' '{print $2}' || true)
-    
+    # Get all network interfaces (mapfile reads the pipe in blocks, not byte by byte)
+    local ip_interfaces=()
+    mapfile -t ip_interfaces < <(ip -o link show 2>/dev/null | awk -F': ' '{print $2}' || true)
+
     # Also check /sys/class/net for completeness
-    while IFS= read -r iface; do
-        # Skip if already in list
-        if [[ " ${all_interfaces[*]} " =~ " $iface " ]]; then
-            continue
-        fi
-        [ -n "$iface" ] && all_interfaces+=("$iface")
-    done < <(ls /sys/class/net/ 2>/dev/null || true)
-    
+    local sys_interfaces=()
+    local iface_path
+    for iface_path in /sys/class/net/*; do
+        [ -e "$iface_path" ] && sys_interfaces+=("${iface_path##*/}")
+    done
+
+    local all_interfaces=()
+    local -A seen_interfaces=()
+    for iface in "${ip_interfaces[@]}" "${sys_interfaces[@]}"; do
+        # Skip empty lines and interfaces already in the list
+        [ -n "$iface" ] || continue
+        [ -n "${seen_interfaces[$iface]:-}" ] && continue
+        seen_interfaces["$iface"]=1
+        all_interfaces+=("$iface")
+    done
+
     # Filter for LAN interfaces only
     for iface in "${all_interfaces[@]}"; do
         if is_lan_interface "$iface"; then
@@ -254,7 +259,7 @@ wakeonlan_supports_wol() {
 wakeonlan_create_systemd_service() {
     local iface="$1"
     local safe_iface
-    safe_iface="$(printf '%s' "$iface" | sed 's/[^A-Za-z0-9_-]/_/g')"
+    safe_iface="${iface//[^A-Za-z0-9_-]/_}"
     local svc_file="/etc/systemd/system/wol-${safe_iface}.service"
     local ethtool_bin
     ethtool_bin="$(command -v ethtool || echo /sbin/ethtool)"
@@ -356,7 +361,7 @@ wakeonlan_enable_iface() {
 wakeonlan_disable_iface() {
     local iface="$1"
     local safe_iface
-    safe_iface="$(printf '%s' "$iface" | sed 's/[^A-Za-z0-9_-]/_/g')"
+    safe_iface="${iface//[^A-Za-z0-9_-]/_}"
     local svc_file="/etc/systemd/system/wol-${safe_iface}.service"
 
     if [ "${DRY_RUN:-false}" = "true" ]; then
@@ -425,7 +430,7 @@ wakeonlan_status() {
             fi
         fi
         local safe_iface
-        safe_iface="$(printf '%s' "$iface" | sed 's/[^A-Za-z0-9_-]/_/g')"
+        safe_iface="${iface//[^A-Za-z0-9_-]/_}"
         if [ -f "/etc/systemd/system/wol-${safe_iface}.service" ]; then
             log_info "   Persisted (systemd): wol-${safe_iface}.service present"
         fi
@@ -547,6 +552,15 @@ wakeonlan_prompt_configuration() {
         return 1
     fi
     
+    # Unattended runs only enable it when requested up front
+    if ! is_interactive; then
+        if [ "${INSTALL_WAKEONLAN:-false}" = true ]; then
+            return 0
+        fi
+        export INSTALL_WAKEONLAN=false
+        return 1
+    fi
+
     # Interactive prompt using gum if available
     if supports_gum; then
         echo ""
@@ -580,7 +594,7 @@ wakeonlan_prompt_configuration() {
                 return 1
             }
             
-            case "$(echo "$choice" | tr '[:upper:]' '[:lower:]')" in
+            case "${choice,,}" in
                 y|yes)
                     export INSTALL_WAKEONLAN=true
                     echo "✓ Wake-on-LAN will be configured for: ${supported_devs[*]}"
@@ -636,15 +650,3 @@ if [ "${BASH_SOURCE[0]}" = "$0" ]; then
         *) echo "Usage: $0 {enable|disable|status}" ; exit 2 ;;
     esac
 fi
-
-# Export public functions
-export -f wakeonlan_main_config
-export -f wakeonlan_prompt_configuration
-export -f is_wifi_interface
-export -f is_virtual_interface
-export -f is_lan_interface
-export -f detect_wired_interfaces
-export -f wakeonlan_enable_all
-export -f wakeonlan_disable_all
-export -f wakeonlan_show_status
-export -f wakeonlan_show_info